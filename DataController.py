@@ -1,60 +1,237 @@
 # "Static class" that manages data sources and maintains conference data.
+# Startup is kept light: the network stack (requests) is imported and the API key read only when a request
+# is actually made, and the engines (which pull in numpy) are imported on first use.
 
-import os
-import requests
-import json, copy
+import os, sys
+import json, time, copy
+import importlib.util
 from model import *
+from responsecache import ResponseCache
+from snapshot import writeSnapshot, Snapshot, LazyConference
+from tiebreakers import Tiebreaker, LiveStandings
+from kernel import SeasonKernel
+import instrumentation
+from results import ResultAggregator, checkpointFilename
+from ratings import loadRatings, saveRatings
+import scenarios
+import jobs
 
-KEY = os.environ['CFBD_API']
-REQ_HEADERS = {"accept": "application/json", "Authorization": f"Bearer {KEY}"}
-API_URL = "https://api.collegefootballdata.com"
-YEAR = "2024"
+# Returns a module that is only executed once one of its attributes is used
+def lazyImport(name: str):
+    if name in sys.modules: return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+simulation = lazyImport("simulation")
+enumeration = lazyImport("enumeration")
+distribution = lazyImport("distribution")
+outcomestore = lazyImport("outcomestore")
+leverage = lazyImport("leverage")
+
+API_KEY_VARIABLE = 'CFBD_API'
+API_URL = os.environ.get('CFBD_API_URL', "https://api.collegefootballdata.com") # Override to point at a local stand-in server
+YEAR = "2024" # Season the REPL and batch runs load; past seasons are kept in the history store, see history.py
+
+REQUEST_TIMEOUT = 10 # seconds
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5 # seconds, doubled after each retry
+MAX_CONCURRENT_REQUESTS = 8
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+session: 'requests.Session' = None
+responseCache = ResponseCache()
+offline = bool(os.environ.get('CFBD_OFFLINE')) # Serve every request from the response cache, fresh or not
 
 loadedConferences = {}
-focusedConference: Conference = None
-standingsResults = {}
+focusedConference: Conference | Scenario = None # Becomes a Scenario over the conference once a game is set
+focusedStandings: LiveStandings = None # Built on first use, then updated one game at a time by setGame()
+standingsResults: dict[str, ResultAggregator] = {} # Latest simulate/fullmap results by conference
+standingsUpdates: dict[str, 'StandingsUpdate'] = {} # Changes made by the latest update of each conference
+recordOutcomes = False # Record per-outcome results of simulate/fullmap runs for what-if queries
+outcomeStores: dict[str, 'outcomestore.OutcomeStore'] = {} # Latest recorded outcomes by conference
+gameLeverage: dict[str, tuple[str, 'leverage.GameLeverage']] = {} # (signature, tally) of the latest simulate/fullmap run by conference
+backgroundJobs: jobs.JobManager = None # simulate/fullmap runs started from the REPL, created with the first job
 
 # Returns a loaded conference by name, if it exists; else returns None
+# A conference opened lazily from a snapshot is built here, on first use
 def getConference(abbrName: str) -> Conference | None:
-    return loadedConferences[abbrName] if abbrName in loadedConferences \
+    conference = loadedConferences[abbrName] if abbrName in loadedConferences \
         else None
+    if isinstance(conference, LazyConference):
+        conference = loadedConferences[abbrName] = conference.materialize()
+    return conference
 
-# Makes API request and processes JSON
+class APIError(Exception):
+    pass
+
+# API key from the environment, read when the first request is made
+# Raises APIError if it isn't set (saved conferences and cached responses don't need it)
+def apiKey() -> str:
+    key = os.environ.get(API_KEY_VARIABLE)
+    if not key: raise APIError(f"{API_KEY_VARIABLE} is not set")
+    return key
+
+# Shared session so connections are pooled and reused across requests (and threads)
+def getSession() -> 'requests.Session':
+    global session
+    if session is None:
+        import requests
+        headers = {"accept": "application/json", "Authorization": f"Bearer {apiKey()}"}
+        session = requests.Session()
+        session.headers.update(headers)
+        adapter = requests.adapters.HTTPAdapter(pool_connections = MAX_CONCURRENT_REQUESTS, pool_maxsize = MAX_CONCURRENT_REQUESTS)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    return session
+
+# Makes API request and processes JSON, through the response cache
+# Fresh cached responses are returned without a request; stale ones are revalidated with a conditional request
+# If the API can't be reached, a stale cached response is returned rather than failing
 def makeRequest(directory: str, params: dict) -> list:
-    r = requests.get(f"{API_URL}/{directory}", params = params, headers = REQ_HEADERS)
-    # TODO: error handling
-    content = r.content.decode('utf-8')
-    return json.loads(content)
+    entry = responseCache.get(directory, params)
+    if entry is not None and (offline or responseCache.isFresh(entry)):
+        return entry['body']
+    if offline:
+        raise APIError(f"{directory}: not cached (offline)")
+    
+    try:
+        return fetch(directory, params, entry)
+    except APIError:
+        if entry is None: raise
+        return entry['body']
+
+# Makes API request, revalidating the cache entry if given
+# Connection errors, timeouts and retryable statuses are retried with exponential backoff
+# Raises APIError once retries are exhausted or on any other error status
+def fetch(directory: str, params: dict, entry: dict = None) -> list:
+    import requests
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            r = getSession().get(f"{API_URL}/{directory}", params = params, timeout = REQUEST_TIMEOUT,
+                                 headers = responseCache.validators(entry))
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = APIError(f"{directory}: {e}")
+        else:
+            if r.status_code == 304 and entry is not None:
+                responseCache.revalidate(entry)
+                return entry['body']
+            if r.ok:
+                try:
+                    body = json.loads(r.content.decode('utf-8'))
+                except ValueError as e:
+                    raise APIError(f"{directory}: invalid response ({e})")
+                responseCache.put(directory, params, body, r.headers)
+                return body
+            error = APIError(f"{directory}: HTTP {r.status_code}")
+            if r.status_code not in RETRY_STATUSES: raise error
+        
+        if attempt < MAX_RETRIES: time.sleep(RETRY_BACKOFF * 2 ** attempt)
+    raise error
+
+# Makes many API requests concurrently, at most MAX_CONCURRENT_REQUESTS at once
+# Returns results in request order; a failed request's result is its APIError
+def makeRequests(requestList: list[tuple[str, dict]]) -> list[list | APIError]:
+    from concurrent.futures import ThreadPoolExecutor
+    def request(req: tuple[str, dict]) -> list | APIError:
+        try:
+            return makeRequest(*req)
+        except APIError as e:
+            return e
+    
+    with ThreadPoolExecutor(max_workers = min(MAX_CONCURRENT_REQUESTS, max(1, len(requestList)))) as pool:
+        return list(pool.map(request, requestList))
 
 # Returns the filename for the associated conference
 # Creates any necessary directories
-def confFilename(abbrName: str) -> str:
+# Conferences are saved as binary snapshots (.ccs); JSON (.json) is the import/export format
+def confFilename(abbrName: str, extension: str = "ccs") -> str:
     path = "conferences"
     try:
         os.mkdir(path)
     except FileExistsError:
         pass
-    return f"{path}/{abbrName}.json"
+    return f"{path}/{abbrName}.{extension}"
     
+def gamesParams(abbrName: str, year: str = None) -> dict:
+    return {"year": YEAR if year is None else str(year),
+            "seasonType": "regular",
+            "conference": abbrName}
+
+# Teams of a conference in a past season; the current season's request has no year (the API's latest membership)
+def teamsParams(abbrName: str, year: str = None) -> dict:
+    if year is None or str(year) == YEAR: return {"conference": abbrName}
+    return {"conference": abbrName, "year": str(year)}
+
 # Constructs a conference and its teams via API call
 def conferenceFromAPI(abbrName: str) -> Conference:
-    teams = makeRequest("teams", {"conference":abbrName})
+    conferences, errors = conferencesFromAPI([abbrName])
+    if abbrName in errors: raise errors[abbrName]
+    return conferences[abbrName]
+
+# Constructs conferences via API calls, with every conference's teams and games requested at once
+# Conferences already loaded are updated in place from their games alone, see updateStandings()
+# Returns (conferences by name, errors by name for conferences that could not be fetched)
+def conferencesFromAPI(abbrNames: list[str]) -> tuple[dict[str, Conference], dict[str, APIError]]:
+    loaded = {abbrName: getConference(abbrName) for abbrName in abbrNames if abbrName in loadedConferences}
+    requestList = []
+    for abbrName in abbrNames:
+        if abbrName not in loaded: requestList.append(("teams", teamsParams(abbrName)))
+        requestList.append(("games", gamesParams(abbrName)))
+    responses = iter(makeRequests(requestList))
     
-    conference = Conference(teams[0]['conference'], abbrName)
-    for t in teams:
-        newTeam = Team(t['school'], conference)
-        conference.addTeam(newTeam)
-            
-    updateStandings(conference)
+    conferences = {}
+    errors = {}
+    for abbrName in abbrNames:
+        teams = None if abbrName in loaded else next(responses)
+        games = next(responses)
+        if isinstance(teams, APIError) or isinstance(games, APIError):
+            errors[abbrName] = teams if isinstance(teams, APIError) else games
+            continue
+        if abbrName in loaded:
+            standingsUpdates[abbrName] = updateStandings(loaded[abbrName], games)
+            conferences[abbrName] = loaded[abbrName]
+            continue
+        if not teams:
+            errors[abbrName] = APIError(f"teams: no teams found for {abbrName}")
+            continue
+        
+        conference = Conference(teams[0]['conference'], abbrName)
+        for t in teams:
+            newTeam = Team(t['school'], conference)
+            conference.addTeam(newTeam)
+        
+        standingsUpdates[abbrName] = updateStandings(conference, games)
+        
+        loadedConferences[abbrName] = conference
+        conferences[abbrName] = conference
+    return (conferences, errors)
+
+# Opens a conference's saved snapshot without building it, see getConference()
+# Falls back to importing JSON if there is no snapshot, or it can't be read (ex: cut short by a crash)
+# Returns None if neither file exists
+def conferenceFromFile(abbrName: str) -> LazyConference | Conference | None:
+    try:
+        snapshot = Snapshot(confFilename(abbrName))
+    except (FileNotFoundError, ValueError):
+        return conferenceFromJSON(abbrName)
     
-    loadedConferences[abbrName] = conference
+    conference = LazyConference(snapshot)
+    loadedConferences[conference.abbrName] = conference
     return conference
 
-# Constructs a conference and its teams from an existing file
+# Saves a conference as a binary snapshot
+def conferenceToFile(conference: Conference) -> None:
+    writeSnapshot(conference, confFilename(conference.abbrName))
+
+# Constructs a conference and its teams from an existing JSON file
 # Returns None if the file does not exist
-def conferenceFromFile(abbrName: str) -> Conference | None:
+def conferenceFromJSON(abbrName: str) -> Conference | None:
     try:
-        with open(confFilename(abbrName), 'r') as f:
+        with open(confFilename(abbrName, "json"), 'r') as f:
             jsonConf = json.load(f)
     except FileNotFoundError:
         return None
@@ -76,29 +253,58 @@ def conferenceFromFile(abbrName: str) -> Conference | None:
     loadedConferences[conference.abbrName] = conference
     return conference
     
-# Exports a conference and its teams to a file
-def conferenceToFile(conference: Conference) -> None:
-    jsonConf = copy.copy(conference)
-    jsonConf.teams = [{'name': t.name,
-                             'nonConfWins': t.nonConfWins}
-                            for t in jsonConf.teams]
-    jsonConf.games = [{'home': g.home.name,
-                             'away': g.away.name,
-                             'winner': g.winner.name if g.winner is not None else None}
-                            for g in jsonConf.games]
-    
-    with open(confFilename(conference.abbrName), 'w') as f:
-        json.dump(jsonConf.__dict__, f, indent = '\t')
-
-# Updates conference standings via API call
-def updateStandings(conference: Conference) -> None:
-    params = {"year": YEAR,
-              "seasonType": "regular",
-              "conference": conference.abbrName}
-    games = makeRequest("games", params)
-    conference.setUpdateTimestamp()
+# Exports a conference and its teams to a JSON file
+def conferenceToJSON(conference: Conference) -> None:
+    jsonConf = {'name': conference.name,
+                'abbrName': conference.abbrName,
+                'update': conference.update}
+    jsonConf['teams'] = [{'name': t.name,
+                          'nonConfWins': t.nonConfWins}
+                         for t in conference.teams]
+    jsonConf['games'] = [{'home': g.home.name,
+                          'away': g.away.name,
+                          'winner': g.winner.name if g.winner is not None else None}
+                         for g in conference.games]
     
+    with open(confFilename(conference.abbrName, "json"), 'w') as f:
+        json.dump(jsonConf, f, indent = '\t')
+
+# Changes made to a conference by one updateStandings() call
+class StandingsUpdate:
+    def __init__(self) -> None:
+        self.completed: list[Game] = [] # Games that now have a result
+        self.corrected: list[Game] = [] # Games whose result changed or was withdrawn
+        self.added: list[Game] = [] # Games new to the conference
+        self.nonConfTeams: list[Team] = [] # Teams whose non-conference win total changed
+        
+    def __repr__(self) -> str:
+        return f"<StandingsUpdate ({len(self.completed)} completed, {len(self.corrected)} corrected, {len(self.added)} added)>"
+    
+    def __bool__(self) -> bool:
+        return bool(self.completed or self.corrected or self.added or self.nonConfTeams)
+
+# Updates conference standings via API call, or from an already fetched games response (the full season)
+# Returns the changes, after invalidating what depended on them (see invalidateStandings())
+def updateStandings(conference: Conference, games: list = None) -> StandingsUpdate:
+    if games is None: games = makeRequest("games", gamesParams(conference.abbrName))
+    conference.setUpdateTimestamp()
+    changes = applyGames(conference, games)
+    invalidateStandings(conference, changes)
+    return changes
+
+# Whether a fetched game is a conference championship: the title game itself, not part of the standings
+def isTitleGame(game: dict) -> bool:
+    return bool(game['conference_game']) and 'championship' in (game.get('notes') or "").lower()
+
+# Applies a games response (the full season) to a conference
+# Fetched games are matched to the conference's existing games and only differences are applied, so a
+# loaded conference can be updated in place any number of times; non-conference wins are recounted
+# Returns the changes
+def applyGames(conference: Conference, games: list) -> StandingsUpdate:
+    changes = StandingsUpdate()
+    nonConfWins = {team: 0 for team in conference.teams}
     for game in games:
+        if isTitleGame(game): continue
         home = conference.getTeamByName(game['home_team'])
         away = conference.getTeamByName(game['away_team'])
         
@@ -114,27 +320,287 @@ def updateStandings(conference: Conference) -> None:
                     game['conference_game'] = False 
                     
         if game['conference_game']:
-            conference.addGame(Game(home, away, winner))
+            if home is None or away is None: continue
+            existing = conference.getGameByTeams(home, away)
+            if existing is None:
+                newGame = Game(home, away, winner)
+                conference.addGame(newGame)
+                changes.added.append(newGame)
+            elif existing.winner is not winner:
+                (changes.completed if existing.winner is None else changes.corrected).append(existing)
+                existing.winner = winner
                 
         # Tally non-conf (used in Big 12 tiebreakers)    
         else:
             # Both teams in non conference game can be in conference (Baylor @ Utah, Arizona @ KSU)
             if home is not None:
-                home.nonConfWins += int(home is winner)
+                nonConfWins[home] += int(home is winner)
             if away is not None:
-                away.nonConfWins += int(away is winner)
-
-# At time of current development (Week 8), there are too many games remaining to simulate before the end of a season
-# Current estimates:
-# - SEC: 35 years
-# - ACC: 279 years
-# - Big 12: 8926 years
-# - Big Ten: 142808 years
-# TODO: develop after setgame functionality is complete
-def fullMapStandings() -> None:
-    numGamesRemaining = len(focusedConference.getUnplayedGames())
-    possibleOutcomes = 2 ** numGamesRemaining
-    yearsToComplete = possibleOutcomes / (1000 * 31536000) # Number of seconds in a year at a generous estimate of 1000 sims/second
-    
-    print(f"A full map would currently take approximately {yearsToComplete:.2f} years to complete")
-    print("Check back later :)")
\ No newline at end of file
+                nonConfWins[away] += int(away is winner)
+    
+    for team, wins in nonConfWins.items():
+        if team.nonConfWins != wins:
+            team.nonConfWins = wins
+            changes.nonConfTeams.append(team)
+    return changes
+
+# Drops what depended on a conference's changed games: its stored results, and the focused standings if the
+# focus is on the conference. Those are only re-tiebroken where a changed result can matter
+# (see LiveStandings.setResult()); new games or non-conference wins change the kernel, so it is rebuilt on next use
+def invalidateStandings(conference: Conference, changes: StandingsUpdate) -> None:
+    global focusedStandings
+    if not changes: return
+    standingsResults.pop(conference.abbrName, None)
+    gameLeverage.pop(conference.abbrName, None)
+    
+    if focusedStandings is None: return
+    focusedRoot = focusedConference.getConference() if isinstance(focusedConference, Scenario) else focusedConference
+    if focusedRoot is not conference: return
+    if changes.added or changes.nonConfTeams:
+        focusedStandings = None
+        return
+    kernel = focusedStandings.tiebreaker.kernel
+    for game in changes.completed + changes.corrected:
+        winner = focusedConference.getWinner(game) # A what-if result set on the game still stands
+        focusedStandings.setResult(kernel.gameIndex[game], kernel.teamIndex[winner] if winner is not None else None)
+
+# Focuses a conference, discarding any what-if scenario and standings of the previous focus
+def focusConference(conference: Conference) -> None:
+    global focusedConference, focusedStandings
+    applyRatings(conference)
+    focusedConference = conference
+    focusedStandings = None
+
+def ratingsFilename(abbrName: str) -> str:
+    return confFilename(abbrName, "ratings.json")
+
+# Sets team ratings from the conference's saved ratings file
+def applyRatings(conference: Conference) -> None:
+    ratings = loadRatings(ratingsFilename(conference.abbrName))
+    for team in conference.teams:
+        team.rating = ratings.get(team.name, team.rating)
+
+# Sets (or with None, clears) a team's rating in the focused conference and saves the conference's ratings
+# Returns the team, or None if unknown
+def setRating(teamName: str, rating: float | None) -> Team | None:
+    team = focusedConference.getTeamByName(teamName)
+    if team is None: return None
+    team.rating = rating
+    saveRatings(ratingsFilename(focusedConference.abbrName),
+                {t.name: t.rating for t in focusedConference.teams if t.rating is not None})
+    return team
+
+# Sets the probability that teamName1 beats teamName2 in a what-if scenario over the focused conference
+# A probability of None falls back to ratings (or a coin flip)
+# Returns the game, or None if the teams are unknown or did not play each other
+def setOdds(teamName1: str, teamName2: str, probability: float | None) -> Game | None:
+    global focusedConference
+    team1 = focusedConference.getTeamByName(teamName1)
+    team2 = focusedConference.getTeamByName(teamName2)
+    if team1 is None or team2 is None: return None
+    
+    game = team1.getGameByOpponent(team2)
+    if game is None: return None
+    
+    if not isinstance(focusedConference, Scenario):
+        focusedConference = Scenario(focusedConference)
+    if probability is not None and game.home is not team1: probability = 1 - probability
+    focusedConference.setProbability(game, probability)
+    return game
+
+# Current standings of the focused conference as ordered groups of (team name, wins, losses)
+# Groups of more than one team could not be separated by tiebreakers
+def getStandings() -> list[list[tuple[str, int, int]]]:
+    global focusedStandings
+    if focusedStandings is None:
+        focusedStandings = LiveStandings(Tiebreaker(focusedConference))
+    kernel = focusedStandings.tiebreaker.kernel
+    
+    records = []
+    for group in focusedStandings.standings():
+        records.append([])
+        for t in group:
+            played = sum(focusedStandings.decided >> g & 1 for g in kernel.teamGames[t])
+            wins = focusedStandings.wins[t]
+            records[-1].append((kernel.teams[t].name, wins, played - wins))
+    return records
+
+# Sets a game result in a what-if scenario over the focused conference, leaving the conference itself untouched
+# A winner of None makes the game unplayed
+# Returns the game, or None if the teams are unknown or did not play each other
+def setGame(teamName1: str, teamName2: str, winnerName: str = None) -> Game | None:
+    global focusedConference
+    team1 = focusedConference.getTeamByName(teamName1)
+    team2 = focusedConference.getTeamByName(teamName2)
+    if team1 is None or team2 is None: return None
+    
+    game = team1.getGameByOpponent(team2)
+    if game is None: return None
+    
+    if not isinstance(focusedConference, Scenario):
+        focusedConference = Scenario(focusedConference)
+    winner = focusedConference.getTeamByName(winnerName) if winnerName is not None else None
+    focusedConference.setWinner(game, winner)
+    
+    if focusedStandings is not None:
+        kernel = focusedStandings.tiebreaker.kernel
+        focusedStandings.setResult(kernel.gameIndex[game], kernel.teamIndex[winner] if winner is not None else None)
+    return game
+
+# Estimated seconds to fully map the focused conference on the given number of processes
+# Throughput is measured on a slice of the conference's own outcome space, see enumeration.measureThroughput()
+# Without pruning every outcome is evaluated; with pruning this is an upper bound
+def fullMapEstimate(processes: int = None) -> float:
+    processes = os.cpu_count() if processes is None else processes
+    possibleOutcomes = 2 ** len(focusedConference.getUnplayedGames())
+    return possibleOutcomes / (enumeration.measureThroughput(focusedConference) * processes)
+
+# Enumerates every outcome of the focused conference's (or the given conference's) remaining games, see
+# enumeration.fullMap()
+# Interrupted runs resume from their checkpoint. With a job, progress is reported to it, see jobs.Job.report()
+# Returns title game appearance frequency by team name, most likely first, or None if the job was cancelled
+# (partial results are left on the job, not stored)
+def fullMapStandings(processes: int = None, prune: bool = True, conference: Conference | Scenario = None,
+                     job: jobs.Job = None) -> dict[str, float] | None:
+    conference = focusedConference if conference is None else conference
+    kernel = SeasonKernel(conference)
+    recorder = outcomestore.OutcomeRecorder(kernel) if recordOutcomes else None
+    tally = leverage.GameLeverage(kernel)
+    if job is not None: job.outcomes = 2 ** kernel.nUnplayed
+    start = time.perf_counter()
+    results, evaluated = enumeration.fullMap(conference, processes, prune, checkpointFilename(conference.abbrName, "fullmap"),
+                                             recorder, tally, job.report if job is not None else None)
+    if job is not None and job.cancelled(): return None
+    if job is not None: job.report(results, 1.0)
+    instrumentation.recordRun("fullmap", conference.abbrName, results.total, time.perf_counter() - start, evaluated)
+    if recorder is not None: storeOutcomes(recorder, conference)
+    gameLeverage[conference.abbrName] = (leverage.leverageSignature(kernel), tally)
+    return resultOdds(results, conference)
+
+# Monte Carlo simulation of the focused conference's (or the given conference's) remaining games, see
+# simulation.monteCarlo()
+# Interrupted runs resume from their checkpoint. With a job, progress is reported to it, see jobs.Job.report()
+# Returns title game appearance frequency by team name, most likely first, or None if the job was cancelled
+# (partial results are left on the job, not stored)
+# Stops early once every team's odds are within +/-margin at 95% confidence (0 to always run numSims)
+# chunkSize and margin default to simulation.DEFAULT_CHUNK_SIZE and simulation.DEFAULT_MARGIN
+def simulateStandings(numSims: int, chunkSize: int = None, margin: float = None, conference: Conference | Scenario = None,
+                      job: jobs.Job = None) -> dict[str, float] | None:
+    conference = focusedConference if conference is None else conference
+    chunkSize = simulation.DEFAULT_CHUNK_SIZE if chunkSize is None else chunkSize
+    margin = simulation.DEFAULT_MARGIN if margin is None else margin
+    tiebreaker = Tiebreaker(conference)
+    recorder = outcomestore.OutcomeRecorder(tiebreaker.kernel) if recordOutcomes else None
+    tally = leverage.GameLeverage(tiebreaker.kernel)
+    if job is not None: job.outcomes = numSims
+    start = time.perf_counter()
+    results = simulation.monteCarlo(tiebreaker, numSims, chunkSize, margin = margin or None,
+                                    checkpoint = checkpointFilename(conference.abbrName, "simulate"),
+                                    recorder = recorder, leverage = tally, progress = job.report if job is not None else None)
+    if job is not None and job.cancelled(): return None
+    if job is not None: job.report(results, 1.0)
+    instrumentation.recordRun("simulate", conference.abbrName, results.total, time.perf_counter() - start,
+                              cache = tiebreaker.cache.stats())
+    if recorder is not None: storeOutcomes(recorder, conference)
+    gameLeverage[conference.abbrName] = (leverage.leverageSignature(tiebreaker.kernel), tally)
+    return resultOdds(results, conference)
+
+# Exact title game odds of the focused conference's remaining games, see distribution.exactOdds()
+# Returns (title game appearance frequency by team name, most likely first; probability of a tie at the cut)
+def exactStandings(tieSamples: int = None) -> tuple[dict[str, float], float]:
+    tieSamples = distribution.DEFAULT_TIE_SAMPLES if tieSamples is None else tieSamples
+    tiebreaker = Tiebreaker(focusedConference)
+    start = time.perf_counter()
+    results, tiedMass = distribution.exactOdds(tiebreaker, tieSamples)
+    instrumentation.recordRun("exact", focusedConference.abbrName, None, time.perf_counter() - start,
+                              cache = tiebreaker.cache.stats())
+    return (resultOdds(results), tiedMass)
+
+# Clinch/elimination status of a team in the focused conference, see scenarios.ScenarioSolver.solve()
+# Returns (status, clinch scenarios as ([(winner name, loser name)], probability), complete),
+# or None if the team is unknown
+def clinchScenarios(teamName: str) -> tuple[str, list[tuple[list[tuple[str, str]], float]], bool] | None:
+    team = focusedConference.getTeamByName(teamName)
+    if team is None: return None
+    tiebreaker = Tiebreaker(focusedConference)
+    kernel = tiebreaker.kernel
+    solver = scenarios.ScenarioSolver(tiebreaker, kernel.teamIndex[team])
+    start = time.perf_counter()
+    status, found, complete = solver.solve()
+    instrumentation.recordRun("clinch", focusedConference.abbrName, None, time.perf_counter() - start, solver.nodes)
+    
+    named = []
+    for scenario in found:
+        results = [(kernel.teams[kernel.home[g] if homeWins else kernel.away[g]].name,
+                    kernel.teams[kernel.away[g] if homeWins else kernel.home[g]].name) for g, homeWins in scenario]
+        named.append((results, solver.probability(scenario)))
+    return (status, named, complete)
+
+# Builds, keeps and saves the outcome store of a run on the focused conference (or the given conference)
+def storeOutcomes(recorder: 'outcomestore.OutcomeRecorder', conference: Conference | Scenario = None) -> None:
+    conference = focusedConference if conference is None else conference
+    store = recorder.build()
+    outcomeStores[conference.abbrName] = store
+    store.save(outcomestore.storeFilename(conference.abbrName))
+
+# The outcome store recorded for the focused conference as it stands (results and odds), from memory or disk
+# kernel is the focused conference's, if already built
+# Returns None if no run recorded one since
+def getOutcomeStore(kernel: SeasonKernel = None) -> 'outcomestore.OutcomeStore | None':
+    abbrName = focusedConference.abbrName
+    kernel = SeasonKernel(focusedConference) if kernel is None else kernel
+    signature = outcomestore.storeSignature(kernel)
+    store = outcomeStores.get(abbrName)
+    if store is None or store.signature != signature:
+        store = outcomestore.OutcomeStore.load(outcomestore.storeFilename(abbrName), signature)
+        if store is None: return None
+        outcomeStores[abbrName] = store
+    return store
+
+# Title game odds of the focused conference given results of unplayed games ({game: winner}), from its outcome store
+# Returns (title game appearance frequency by team name, most likely first; matching results), or None without a store
+def whatIfStandings(fixed: dict[Game, Team]) -> tuple[dict[str, float], ResultAggregator] | None:
+    kernel = SeasonKernel(focusedConference)
+    store = getOutcomeStore(kernel)
+    if store is None: return None
+    results = store.query({kernel.gameIndex[game]: winner is game.home for game, winner in fixed.items()}) # Store columns are kernel games
+    frequencies = results.frequencies()
+    odds = {team.name: frequencies[i] for i, team in enumerate(focusedConference.teams)}
+    return (dict(sorted(odds.items(), key = lambda item: item[1], reverse = True)), results)
+
+# Unplayed games of the focused conference by how much their results move title game odds, largest first,
+# from the latest simulate/fullmap run (see leverage.GameLeverage.report())
+# Returns None if no run tallied them for the conference as it stands (results and odds)
+def leverageReport() -> list[dict] | None:
+    kept = gameLeverage.get(focusedConference.abbrName)
+    if kept is None: return None
+    kernel = SeasonKernel(focusedConference)
+    signature, tally = kept
+    if signature != leverage.leverageSignature(kernel): return None
+    return tally.report(kernel)
+
+# Stores results for the focused conference (or the given conference) and returns title game appearance
+# frequency by team name, most likely first
+def resultOdds(results: ResultAggregator, conference: Conference | Scenario = None) -> dict[str, float]:
+    conference = focusedConference if conference is None else conference
+    standingsResults[conference.abbrName] = results
+    return namedOdds(results, conference)
+
+# Title game appearance frequency by team name, most likely first
+def namedOdds(results: ResultAggregator, conference: Conference | Scenario) -> dict[str, float]:
+    frequencies = results.frequencies()
+    odds = {team.name: frequencies[i] for i, team in enumerate(conference.teams)}
+    return dict(sorted(odds.items(), key = lambda item: item[1], reverse = True))
+
+# Starts a simulate or fullmap run (see simulateStandings(), fullMapStandings()) on the focused conference as a
+# background job, with the given keyword arguments
+# The job runs on a copy taken now, so results, odds and ratings set while it is queued or running don't change it
+# Returns the job, or None if a run is already active on the conference (both runs write the conference's outcome
+# store and checkpoints)
+def startJob(kind: str, **kwargs) -> jobs.Job | None:
+    global backgroundJobs
+    if backgroundJobs is None: backgroundJobs = jobs.JobManager()
+    if backgroundJobs.active(abbrName = focusedConference.abbrName): return None
+    conference = copy.deepcopy(focusedConference)
+    run = fullMapStandings if kind == "fullmap" else simulateStandings
+    return backgroundJobs.submit(kind, conference.abbrName, lambda job: run(conference = conference, job = job, **kwargs))
@@ -0,0 +1,100 @@
+# Backtests the tiebreaker engine against past seasons in the historical store (see history.py).
+# Replays each stored season's final standings through the Tiebreaker and checks the top two against the
+# teams that actually played the title game. Seasons are independent jobs in a process pool; each worker
+# reads the store through its own connection.
+#   python backtest.py [--years 2014-2024] [--conferences ACC SEC] [--processes N] [--output results/backtest.json]
+# Only conferences with a rule chain (see tiebreakers.tiebreakers) are replayed, and only seasons without
+# divisions: with divisions the title game is between division winners, which the rule chains don't model.
+
+import os, sys, json, time, argparse, traceback
+import multiprocessing
+from history import HistoryStore, historyFilename, parseYears
+from tiebreakers import Tiebreaker, tiebreakers, titleGameShares
+
+DEFAULT_OUTPUT = "results/backtest.json"
+
+MATCH, MISMATCH, UNRESOLVED, NO_TITLE_GAME, DIVISIONS, NO_RULES = \
+    "match", "mismatch", "unresolved", "no title game", "divisions", "no rules"
+
+workerStore: HistoryStore = None
+
+def initWorker(filename: str) -> None:
+    global workerStore
+    workerStore = HistoryStore(filename)
+
+# Replays one season's final standings
+# Returns a result: {year, conference, status, actual, predicted, standings} or {year, conference, error}
+# Status is MATCH when the top two are exactly the title game teams, UNRESOLVED when a tie the rules couldn't
+# break straddles the cut but includes them, MISMATCH otherwise, or why the season was skipped
+def replaySeason(season: tuple[int, str]) -> dict:
+    year, abbrName = season
+    result = {'year': year, 'conference': abbrName}
+    try:
+        if abbrName not in tiebreakers: return {**result, 'status': NO_RULES}
+        if workerStore.divisions(year, abbrName): return {**result, 'status': DIVISIONS}
+        titleGame = workerStore.titleGame(year, abbrName)
+        if titleGame is None: return {**result, 'status': NO_TITLE_GAME}
+
+        conference = workerStore.conference(year, abbrName)
+        standings = Tiebreaker(conference, cacheSize = 0).orderStandings()
+        shares = titleGameShares(standings)
+        actual = sorted(titleGame[:2])
+        predicted = sorted(conference.teams[t].name for t, share in shares.items() if share >= 1.0)
+        possible = {conference.teams[t].name for t in shares}
+        if predicted == actual: status = MATCH
+        elif len(predicted) < 2 and set(actual) <= possible and set(predicted) <= set(actual): status = UNRESOLVED
+        else: status = MISMATCH
+        return {**result, 'status': status, 'actual': actual, 'predicted': predicted,
+                'standings': [[conference.teams[t].name for t in group] for group in standings]}
+    except Exception:
+        return {**result, 'error': traceback.format_exc()}
+
+# Replays every stored season of the given years and conferences (all stored by default) across a process pool
+# Returns results in season order
+def runBacktest(years: list[int] = None, abbrNames: list[str] = None, processes: int = None,
+                filename: str = None, log = print) -> list[dict]:
+    filename = historyFilename() if filename is None else filename
+    store = HistoryStore(filename)
+    seasons = store.seasons(years, abbrNames)
+    store.close()
+
+    results = []
+    processes = min(processes or os.cpu_count(), len(seasons)) if seasons else 1
+    with multiprocessing.Pool(processes, initializer = initWorker, initargs = (filename,)) as pool:
+        for result in pool.imap_unordered(replaySeason, seasons):
+            results.append(result)
+            if 'error' in result: log(f"{result['year']} {result['conference']}: failed\n{result['error']}")
+            elif result['status'] in (MISMATCH, UNRESOLVED):
+                log(f"{result['year']} {result['conference']}: {result['status']} "
+                    f"(predicted {', '.join(result['predicted']) or 'none'}; actual {', '.join(result['actual'])})")
+    return sorted(results, key = lambda result: (result['year'], result['conference']))
+
+# Seasons by status (failed seasons under "error")
+def summarize(results: list[dict]) -> dict[str, int]:
+    summary = {}
+    for result in results:
+        status = result.get('status', "error")
+        summary[status] = summary.get(status, 0) + 1
+    return summary
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description = "Check the tiebreakers against past seasons' title games.")
+    parser.add_argument("--years", type = parseYears)
+    parser.add_argument("--conferences", nargs = "+", type = str.upper)
+    parser.add_argument("--processes", type = int)
+    parser.add_argument("--output", default = DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = runBacktest(args.years, args.conferences, args.processes)
+    summary = summarize(results)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok = True)
+    with open(args.output, 'w') as f:
+        json.dump({'generated': int(time.time()), 'summary': summary, 'seasons': results}, f, indent = 2)
+    print(f"{len(results)} seasons in {time.perf_counter() - start:.1f}s: "
+          + (", ".join(f"{count} {status}" for status, count in sorted(summary.items())) or "none stored"))
+    print(f"Written to {args.output}")
+    return 1 if summary.get(MISMATCH) or summary.get("error") else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
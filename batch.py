@@ -0,0 +1,164 @@
+# Non-interactive batch runs for scheduled jobs.
+# Runs one engine over several conferences, each conference an independent job in a process pool, and
+# writes structured results per conference. Jobs are submitted largest estimated outcome space first so
+# a long job never starts last while the other processes sit idle.
+#   python batch.py [spec.json] [--conferences ACC SEC] [--engine simulate|fullmap|exact] [--sims N] ...
+# A spec file is a JSON object with any of the keys of DEFAULT_SPEC; command line options override it.
+
+import os, sys, json, time, argparse, traceback
+import multiprocessing
+import DataController
+import simulation
+import enumeration
+import distribution
+from main import SUPPORTED_CONFS
+from model import Conference
+from tiebreakers import Tiebreaker
+from results import ResultAggregator, checkpointFilename
+from leverage import GameLeverage
+
+ENGINES = ["simulate", "fullmap", "exact"]
+ENGINE_PARAMS = {"simulate": ('sims', 'margin', 'seed'), "fullmap": (), "exact": ('tieSamples', 'seed')}
+DEFAULT_SPEC = {
+    'conferences': SUPPORTED_CONFS,
+    'engine': "simulate",
+    'sims': 100000, # simulate: maximum outcomes to sample
+    'margin': simulation.DEFAULT_MARGIN, # simulate: stop once odds are this precise (0 to always run sims)
+    'tieSamples': distribution.DEFAULT_TIE_SAMPLES, # exact: tied outcomes to sample
+    'seed': None,
+    'source': "file", # file: saved conferences; api: fetch the latest first (and save them)
+    'output': "results/batch",
+    'processes': None # defaults to all cores
+}
+
+# Relative cost of a job, used to order the queue
+# Exhaustive engines scale with the outcome space; sampling scales with outcomes drawn and teams to tally
+def estimateCost(conference: Conference, spec: dict) -> float:
+    unplayed = len(conference.getUnplayedGames())
+    if spec['engine'] == "simulate": return spec['sims'] * (unplayed + len(conference.teams))
+    return 2.0 ** unplayed
+
+# Runs the spec's engine on one conference
+# Returns (abbrName, report, None) or (abbrName, None, formatted exception) so one failed job doesn't stop the batch
+def runJob(job: tuple[Conference, dict]) -> tuple[str, dict | None, str | None]:
+    conference, spec = job
+    try:
+        start = time.perf_counter()
+        engine = spec['engine']
+        extra = {}
+        tiebreaker = Tiebreaker(conference)
+        leverage = GameLeverage(tiebreaker.kernel) if engine != "exact" else None
+        if engine == "simulate":
+            results = simulation.monteCarlo(tiebreaker, spec['sims'], seed = spec['seed'],
+                                            margin = spec['margin'] or None,
+                                            checkpoint = checkpointFilename(conference.abbrName, "simulate"), leverage = leverage)
+        elif engine == "fullmap":
+            # Pool workers can't start pools of their own; each job maps in-process
+            results, extra['evaluated'] = enumeration.fullMap(conference, 1, checkpoint = checkpointFilename(conference.abbrName, "fullmap"),
+                                                              leverage = leverage)
+        else:
+            results, extra['tiedMass'] = distribution.exactOdds(tiebreaker, spec['tieSamples'], spec['seed'])
+        if leverage is not None: extra['leverage'] = leverage.report(tiebreaker.kernel)
+        return (conference.abbrName, jobReport(conference, spec, results, time.perf_counter() - start, extra), None)
+    except Exception:
+        return (conference.abbrName, None, traceback.format_exc())
+
+# Structured results for one conference: team odds (most likely first), matchup odds, and run details
+# (with game leverage for simulate and fullmap, see GameLeverage.report())
+def jobReport(conference: Conference, spec: dict, results: ResultAggregator, seconds: float, extra: dict) -> dict:
+    teams = conference.teams
+    frequencies = results.frequencies()
+    margins = results.margins or [None] * len(teams)
+    odds = sorted(zip(teams, frequencies, margins), key = lambda item: item[1], reverse = True)
+    pairs = sorted(results.pairFrequencies().items(), key = lambda item: item[1], reverse = True)
+    return {'conference': conference.abbrName,
+            'name': conference.name,
+            'update': conference.update,
+            'engine': spec['engine'],
+            'spec': {key: spec[key] for key in ENGINE_PARAMS[spec['engine']]},
+            'generated': int(time.time()),
+            'seconds': seconds,
+            'unplayedGames': len(conference.getUnplayedGames()),
+            'outcomes': results.total,
+            **extra,
+            'odds': [{'team': team.name, 'probability': f, 'margin': m} for team, f, m in odds],
+            'matchups': [{'teams': [teams[a].name, teams[b].name], 'probability': f} for (a, b), f in pairs]}
+
+def reportFilename(output: str, abbrName: str, engine: str) -> str:
+    return os.path.join(output, f"{abbrName}-{engine}.json")
+
+# Loads (or with source "api", fetches and saves) the spec's conferences with their ratings
+# Returns (conferences, errors by conference)
+def loadConferences(spec: dict) -> tuple[list[Conference], dict[str, str]]:
+    abbrNames = spec['conferences']
+    errors = {}
+    if spec['source'] == "api":
+        fetched, apiErrors = DataController.conferencesFromAPI(abbrNames)
+        errors.update({abbrName: str(error) for abbrName, error in apiErrors.items()})
+        for conference in fetched.values(): DataController.conferenceToFile(conference)
+    else:
+        for abbrName in abbrNames:
+            if DataController.conferenceFromFile(abbrName) is None: errors[abbrName] = "not saved on disk"
+
+    conferences = []
+    for abbrName in abbrNames:
+        conference = DataController.getConference(abbrName)
+        if conference is None: continue
+        DataController.applyRatings(conference)
+        conferences.append(conference)
+    return (conferences, errors)
+
+# Runs a batch, writing a report per conference to the spec's output directory
+# Returns errors by conference
+def runBatch(spec: dict, log = print) -> dict[str, str]:
+    spec = {**DEFAULT_SPEC, **spec}
+    if spec['engine'] not in ENGINES: raise ValueError(f"Unknown engine: {spec['engine']}")
+    conferences, errors = loadConferences(spec)
+    os.makedirs(spec['output'], exist_ok = True)
+
+    jobs = sorted(((conference, spec) for conference in conferences),
+                  key = lambda job: estimateCost(job[0], spec), reverse = True)
+    processes = min(spec['processes'] or os.cpu_count(), len(jobs)) if jobs else 1
+    with multiprocessing.Pool(processes) as pool:
+        for abbrName, report, error in pool.imap_unordered(runJob, jobs):
+            if error is not None:
+                errors[abbrName] = error
+                log(f"{abbrName}: failed\n{error}")
+                continue
+            filename = reportFilename(spec['output'], abbrName, spec['engine'])
+            with open(filename, 'w') as f:
+                json.dump(report, f, indent = 2)
+            log(f"{abbrName}: {report['seconds']:.1f}s, written to {filename}")
+
+    for abbrName, error in errors.items():
+        if abbrName not in [c.abbrName for c in conferences]: log(f"{abbrName}: skipped ({error})")
+    return errors
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description = "Run title game odds for several conferences without a terminal.")
+    parser.add_argument("spec", nargs = "?", help = "JSON job spec (see DEFAULT_SPEC)")
+    parser.add_argument("--conferences", nargs = "+", type = str.upper, choices = SUPPORTED_CONFS)
+    parser.add_argument("--engine", choices = ENGINES)
+    parser.add_argument("--sims", type = int)
+    parser.add_argument("--exhaustive", action = "store_true", help = "shorthand for --engine fullmap")
+    parser.add_argument("--margin", type = float)
+    parser.add_argument("--tie-samples", dest = "tieSamples", type = int)
+    parser.add_argument("--seed", type = int)
+    parser.add_argument("--source", choices = ["file", "api"])
+    parser.add_argument("--output")
+    parser.add_argument("--processes", type = int)
+    args = parser.parse_args(argv)
+
+    spec = {}
+    if args.spec:
+        with open(args.spec, 'r') as f:
+            spec = json.load(f)
+    if args.exhaustive: args.engine = "fullmap"
+    spec.update({key: value for key, value in vars(args).items()
+                 if key in DEFAULT_SPEC and value is not None})
+
+    errors = runBatch(spec)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,223 @@
+# Benchmark suite over synthetic conferences.
+# Times startup and the hot paths (conference loading, common games/opponents, each tiebreaker rule, standings
+# ordering, end-to-end simulation and enumeration) and writes the results as JSON so runs can be
+# compared between commits:
+#   python benchmark.py [--teams N] [--games N] [--unplayed N] [--parity P] [--compare previous.json]
+
+import os, sys, json, math, time, random, platform, subprocess, argparse, tempfile, itertools
+from model import *
+from kernel import SeasonKernel
+from tiebreakers import Tiebreaker, tiebreakers, getCommonGames, getCommonOpponents
+from snapshot import writeSnapshot, Snapshot
+import simulation
+import enumeration
+
+BENCHMARK_PATH = "benchmarks"
+MIN_TIME = 0.5 # seconds each benchmark runs for
+
+# Round-robin schedule (circle method) cut to gamesPerTeam rounds, in round order
+# With an odd number of teams one team sits out each round
+def roundRobin(nTeams: int, gamesPerTeam: int) -> list[tuple[int, int]]:
+    slots = list(range(nTeams)) + ([None] if nTeams % 2 else [])
+    rounds = len(slots) - 1
+    pairs = []
+    for r in range(min(gamesPerTeam, rounds)):
+        for i in range(len(slots) // 2):
+            a, b = slots[i], slots[-1 - i]
+            if a is None or b is None: continue
+            pairs.append((a, b) if (r + i) % 2 else (b, a)) # Alternate home and away
+        slots.insert(1, slots.pop())
+    return pairs
+
+# Builds a conference of nTeams teams playing gamesPerTeam conference games each, the last unplayed of them unplayed
+# parity sets how often records tie: at 0 the better team always wins played games (records spread out),
+# at 1 every played game is a coin flip (records bunch up and tiebreakers run often)
+# rules is the conference whose tiebreaker chain is used
+def syntheticConference(nTeams: int = 16, gamesPerTeam: int = 8, unplayed: int = 12, parity: float = 0.5,
+                        rules: str = "SEC", seed: int = 0) -> Conference:
+    rng = random.Random(seed)
+    conference = Conference(f"Synthetic {rules}", rules)
+    for i in range(nTeams):
+        team = Team(f"Team {i + 1}")
+        team.nonConfWins = rng.randint(0, 4)
+        conference.addTeam(team)
+
+    teams = conference.teams
+    pairs = roundRobin(nTeams, gamesPerTeam)
+    firstUnplayed = len(pairs) - min(unplayed, len(pairs))
+    for g, (home, away) in enumerate(pairs):
+        winner = None
+        if g < firstUnplayed:
+            if rng.random() < parity: winner = teams[rng.choice((home, away))]
+            else: winner = teams[min(home, away)] # Lower index is the better team
+        conference.addGame(Game(teams[home], teams[away], winner))
+    conference.setUpdateTimestamp()
+    return conference
+
+# Calls fn until minTime has passed
+# Returns {'calls', 'seconds', 'perSecond'}
+def timeCalls(fn, minTime: float = MIN_TIME) -> dict:
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= minTime: break
+    return {'calls': calls, 'seconds': elapsed, 'perSecond': calls / elapsed}
+
+# Best wall time over repeat runs of a fresh interpreter executing the statement in the repo directory
+# Runs without the API key, as offline analysis would
+def timeStartup(statement: str, repeat: int = 5) -> dict:
+    repo = os.path.dirname(os.path.abspath(__file__))
+    env = {k: v for k, v in os.environ.items() if k != 'CFBD_API'}
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd = repo, env = env, check = True,
+                       stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return {'calls': repeat, 'seconds': best, 'perSecond': 1 / best}
+
+# Random full season outcomes for the conference's unplayed games
+def randomOutcomes(kernel: SeasonKernel, n: int, rng: random.Random) -> list[int]:
+    return [kernel.expandOutcome(rng.getrandbits(kernel.nUnplayed)) for _ in range(n)]
+
+# Tied groups (of two teams, of three or more) in order of finish, with the outcome they occur in
+def tiedGroups(tiebreaker: Tiebreaker, outcomes: list[int]) -> tuple[list[tuple[int, list[int]]], list[tuple[int, list[int]]]]:
+    two, multi = [], []
+    for outcome in outcomes:
+        tiebreaker.setOutcome(outcome)
+        for group in tiebreaker.finishGroups:
+            if len(group) == 2: two.append((outcome, group))
+            elif len(group) > 2: multi.append((outcome, group))
+    return (two, multi)
+
+# Times one tiebreaker rule over sampled tied groups; only the rule call itself is timed
+def timeRule(tiebreaker: Tiebreaker, name: str, samples: list[tuple[int, list[int]]], minTime: float = MIN_TIME) -> dict:
+    rule = getattr(tiebreaker, name)
+    calls, separated, elapsed = 0, 0, 0.0
+    while elapsed < minTime:
+        for outcome, group in samples:
+            tiebreaker.setOutcome(outcome)
+            start = time.perf_counter()
+            groups = rule(group)
+            elapsed += time.perf_counter() - start
+            calls += 1
+            separated += len(groups) > 1
+    return {'calls': calls, 'seconds': elapsed, 'perSecond': calls / elapsed, 'separationRate': separated / calls}
+
+# Runs every benchmark on a synthetic conference
+# Returns a JSON-serializable report
+def runBenchmarks(nTeams: int = 16, gamesPerTeam: int = 8, unplayed: int = 12, parity: float = 0.5,
+                  rules: str = "SEC", seed: int = 0, numSims: int = 20000, minTime: float = MIN_TIME) -> dict:
+    rng = random.Random(seed)
+    conference = syntheticConference(nTeams, gamesPerTeam, unplayed, parity, rules, seed)
+    kernel = SeasonKernel(conference)
+    results = {}
+
+    # Startup: a bare interpreter, then importing the REPL (which must not pull in requests or numpy)
+    results['startup.interpreter'] = timeStartup("pass")
+    results['startup.main'] = timeStartup("import main")
+
+    # Loading
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "bench.ccs")
+        writeSnapshot(conference, filename)
+        def loadSnapshot():
+            snapshot = Snapshot(filename)
+            snapshot.toConference()
+            snapshot.close()
+        results['loadSnapshot'] = timeCalls(loadSnapshot, minTime)
+    results['buildKernel'] = timeCalls(lambda: SeasonKernel(conference), minTime)
+
+    # Model helpers
+    teams = conference.teams
+    teamSets = [rng.sample(teams, rng.choice((2, 3))) for _ in range(100)]
+    results['getCommonGames'] = timeCalls(lambda: [getCommonGames(s) for s in teamSets], minTime)
+    results['getCommonOpponents'] = timeCalls(lambda: [getCommonOpponents(s) for s in teamSets], minTime)
+    for name in ('getCommonGames', 'getCommonOpponents'):
+        results[name]['perSecond'] *= len(teamSets)
+
+    # Tiebreaker rules, uncached
+    tiebreaker = Tiebreaker(conference, kernel, cacheSize = 0)
+    outcomes = randomOutcomes(kernel, 200, rng)
+    two, multi = tiedGroups(tiebreaker, outcomes)
+    for label, samples, chain in (("two", two, tiebreakers[rules][0]), ("multi", multi, tiebreakers[rules][1])):
+        if not samples: continue
+        for name in chain:
+            results[f"rule.{label}.{name}"] = timeRule(tiebreaker, name, samples, minTime)
+
+    # Standings ordering
+    outcomeCycle = itertools.cycle(outcomes)
+    results['orderStandings'] = timeCalls(lambda: tiebreaker.orderStandings(next(outcomeCycle)), minTime)
+    cached = Tiebreaker(conference, kernel)
+    results['orderStandingsCached'] = timeCalls(lambda: cached.orderStandings(next(outcomeCycle)), minTime)
+
+    # End to end
+    start = time.perf_counter()
+    simulation.monteCarlo(Tiebreaker(conference, kernel), numSims, seed = seed)
+    elapsed = time.perf_counter() - start
+    results['simulate'] = {'calls': numSims, 'seconds': elapsed, 'perSecond': numSims / elapsed}
+    results['fullmapUnpruned'] = {'perSecond': enumeration.measureThroughput(conference, minTime)}
+
+    return {'commit': gitCommit(),
+            'timestamp': int(time.time()),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'params': {'teams': nTeams, 'gamesPerTeam': gamesPerTeam, 'unplayed': unplayed, 'parity': parity,
+                       'rules': rules, 'seed': seed, 'sims': numSims},
+            'tiedGroups': {'two': len(two) / len(outcomes), 'multi': len(multi) / len(outcomes)},
+            'results': results}
+
+def gitCommit() -> str | None:
+    try:
+        repo = os.path.dirname(os.path.abspath(__file__))
+        return subprocess.run(["git", "-C", repo, "rev-parse", "--short", "HEAD"],
+                              capture_output = True, text = True, check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Throughput ratio (current / previous) for each benchmark in both reports
+def compareReports(current: dict, previous: dict) -> dict[str, float]:
+    ratios = {}
+    for name, result in current['results'].items():
+        old = previous['results'].get(name)
+        if old and old.get('perSecond'): ratios[name] = result['perSecond'] / old['perSecond']
+    return ratios
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description = "Benchmark conference simulation hot paths.")
+    parser.add_argument("--teams", type = int, default = 16)
+    parser.add_argument("--games", type = int, default = 8, help = "conference games per team")
+    parser.add_argument("--unplayed", type = int, default = 12)
+    parser.add_argument("--parity", type = float, default = 0.5, help = "0 = records spread out, 1 = frequent ties")
+    parser.add_argument("--rules", default = "SEC", choices = sorted(tiebreakers))
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--sims", type = int, default = 20000)
+    parser.add_argument("--time", type = float, default = MIN_TIME, help = "seconds per benchmark")
+    parser.add_argument("--output", help = f"report filename (default: {BENCHMARK_PATH}/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", help = "previous report to compare throughput against")
+    args = parser.parse_args(argv)
+
+    report = runBenchmarks(args.teams, args.games, args.unplayed, args.parity, args.rules, args.seed, args.sims, args.time)
+    output = args.output
+    if output is None:
+        os.makedirs(BENCHMARK_PATH, exist_ok = True)
+        output = os.path.join(BENCHMARK_PATH, f"{report['timestamp']}-{report['commit'] or 'nocommit'}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent = 2)
+
+    ratios = {}
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            ratios = compareReports(report, json.load(f))
+    for name, result in report['results'].items():
+        line = f"{name:48} {result['perSecond']:>14,.1f}/s"
+        if name in ratios: line += f"  x{ratios[name]:.2f}"
+        print(line)
+    print(f"Report written to {output}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
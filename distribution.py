@@ -0,0 +1,180 @@
+# Exact title game odds from the joint distribution of final win totals.
+# A dynamic program walks the unplayed games one at a time, carrying the probability of every distinct
+# state of win totals rather than every outcome, so outcomes that reach the same records merge. A team
+# leaves the state once all its games are processed (only its final record is kept, and only while it
+# could still reach the top two) or once it can no longer reach the top two at all.
+# Final states without a tie at the title game cut are exact. The probability mass of each tied
+# configuration (who is above the cut, who is tied at it) is exact too, and is split among the tied teams
+# by running the Tiebreaker on sampled outcomes that land in that configuration.
+
+import math
+import numpy as np
+from collections import defaultdict
+from kernel import SeasonKernel
+from tiebreakers import Tiebreaker, titleGameShares, titleGamePairs
+from simulation import OutcomeSampler, winTotalsBatch, incidenceMatrices, rowToOutcome, DEFAULT_CHUNK_SIZE
+from results import ResultAggregator, CONFIDENCE_Z
+
+DEFAULT_TIE_SAMPLES = 20000 # tied outcomes run through the Tiebreaker
+MAX_DRAWS_PER_TIE_SAMPLE = 100 # gives up sampling when ties are this rare
+
+# Teams above the title game cut and teams tied at it: (above, at), each sorted by team index
+# A configuration is decided on record when the two together are just the title game pair
+Configuration = tuple[tuple[int, ...], tuple[int, ...]]
+
+# Unplayed games ordered so teams finish their schedules (and leave the state) as early as possible:
+# repeatedly takes every remaining game of the team with the fewest left
+def gameOrder(kernel: SeasonKernel) -> list[int]:
+    left = {t: [] for t in range(kernel.nTeams)}
+    for g in kernel.unplayed:
+        left[kernel.home[g]].append(g)
+        left[kernel.away[g]].append(g)
+    order, done = [], set()
+    while len(done) < kernel.nUnplayed:
+        team = min((t for t in left if left[t]), key = lambda t: len(left[t]))
+        for g in left.pop(team):
+            if g in done: continue
+            done.add(g)
+            order.append(g)
+            other = kernel.away[g] if kernel.home[g] == team else kernel.home[g]
+            if other in left: left[other].remove(g)
+    return order
+
+# Second highest of the values (the title game cut), or None with fewer than two
+def secondHighest(values) -> int | None:
+    first = second = None
+    for v in values:
+        if first is None or v > first: first, second = v, first
+        elif second is None or v > second: second = v
+    return second
+
+# Canonical state: active teams' wins (-1 once a team has left), and finished teams' final (wins, team)
+# Finished teams below the second best finished record can't reach the cut and are dropped; active teams
+# that can't reach the second best record in the state even by winning out are dropped too
+def normalize(wins: list[int], finished: list[tuple[int, int]], remaining: list[int]) -> tuple:
+    cut = secondHighest(w for w, _ in finished)
+    if cut is not None: finished = [(w, t) for w, t in finished if w >= cut]
+    bound = secondHighest([w for w in wins if w >= 0] + [w for w, _ in finished])
+    if bound is not None:
+        for t, w in enumerate(wins):
+            if w >= 0 and w + remaining[t] < bound: wins[t] = -1
+    return (tuple(wins), tuple(sorted(finished, reverse = True)))
+
+# Exact probability of each final configuration of the unplayed games, see Configuration
+def configurationOdds(kernel: SeasonKernel) -> dict[Configuration, float]:
+    order = gameOrder(kernel)
+    remaining = [0] * kernel.nTeams
+    for g in order:
+        remaining[kernel.home[g]] += 1
+        remaining[kernel.away[g]] += 1
+
+    wins = [w if remaining[t] else -1 for t, w in enumerate(kernel.baseWins)]
+    finished = [(w, t) for t, w in enumerate(kernel.baseWins) if not remaining[t]]
+    states = {normalize(wins, finished, remaining): 1.0}
+
+    for g in order:
+        h, a, p = kernel.home[g], kernel.away[g], kernel.probabilities[g]
+        remaining[h] -= 1
+        remaining[a] -= 1
+        nextStates = defaultdict(float)
+        for (wins, finished), prob in states.items():
+            if wins[h] < 0 and wins[a] < 0:
+                nextStates[(wins, finished)] += prob # Neither team matters any more
+                continue
+            for winner, q in ((h, p), (a, 1 - p)):
+                if q == 0: continue
+                newWins = list(wins)
+                newFinished = list(finished)
+                if newWins[winner] >= 0: newWins[winner] += 1
+                for t in (h, a):
+                    if not remaining[t] and newWins[t] >= 0:
+                        newFinished.append((newWins[t], t))
+                        newWins[t] = -1
+                nextStates[normalize(newWins, newFinished, remaining)] += prob * q
+        states = nextStates
+
+    configurations = defaultdict(float)
+    for (wins, finished), prob in states.items():
+        configurations[configuration(dict((t, w) for w, t in finished))] += prob
+    return configurations
+
+# Configuration of final win totals by team (only teams that could be at or above the cut need be present)
+def configuration(wins: dict[int, int]) -> Configuration:
+    cut = secondHighest(wins.values())
+    if cut is None: return (tuple(sorted(wins)), ())
+    return (tuple(sorted(t for t, w in wins.items() if w > cut)), tuple(sorted(t for t, w in wins.items() if w == cut)))
+
+# Standings groups for a configuration whose tie is left unbroken
+def configurationGroups(config: Configuration) -> list[list[int]]:
+    above, at = config
+    return ([list(above)] if above else []) + [list(at)]
+
+# Title game shares and pair shares summed over the sampled outcomes of one tied configuration
+class TieSamples:
+    def __init__(self, nTeams: int) -> None:
+        self.n = 0
+        self.shares = [0.0] * nTeams
+        self.shareSquares = [0.0] * nTeams
+        self.pairs: dict[tuple[int, int], float] = defaultdict(float)
+
+    def add(self, groups: list[list[int]]) -> None:
+        self.n += 1
+        for team, share in titleGameShares(groups).items():
+            self.shares[team] += share
+            self.shareSquares[team] += share * share
+        for key, share in titleGamePairs(groups).items():
+            self.pairs[key] += share
+
+# Samples outcomes until tieSamples of them land in one of the tied configurations (or sampling gives up)
+# Returns the samples by configuration
+def sampleTies(tiebreaker: Tiebreaker, tied: set[Configuration], tieSamples: int, seed: int = None,
+               chunkSize: int = DEFAULT_CHUNK_SIZE) -> dict[Configuration, TieSamples]:
+    kernel = tiebreaker.kernel
+    rng = np.random.default_rng(seed)
+    sampler = OutcomeSampler(kernel, stratified = 0)
+    incidence = incidenceMatrices(kernel)
+    samples = {config: TieSamples(kernel.nTeams) for config in tied}
+    found = drawn = 0
+    while found < tieSamples and drawn < tieSamples * MAX_DRAWS_PER_TIE_SAMPLE:
+        outcomes = sampler.sample(rng, chunkSize)
+        wins = winTotalsBatch(kernel, outcomes, incidence)
+        drawn += chunkSize
+        top = -np.sort(-wins, axis = 1)[:, :3]
+        for row in np.flatnonzero(top[:, 1] == top[:, 2]):
+            rowWins = wins[row].tolist()
+            config = configuration(dict(enumerate(rowWins)))
+            if config not in samples: continue
+            samples[config].add(tiebreaker.titleGameGroups(rowToOutcome(kernel, outcomes[row]), rowWins))
+            found += 1
+    return samples
+
+# Title game odds of the unplayed games: exact except for how each tied configuration's probability is split
+# among its tied teams, which is estimated from tieSamples sampled tied outcomes
+# Returns (aggregated results, probability of a tie at the cut); results' margins cover the sampled part only
+def exactOdds(tiebreaker: Tiebreaker, tieSamples: int = DEFAULT_TIE_SAMPLES, seed: int = None) -> tuple[ResultAggregator, float]:
+    kernel = tiebreaker.kernel
+    results = ResultAggregator(kernel.nTeams)
+    results.total = 1.0
+    configurations = configurationOdds(kernel)
+
+    tied = {config: prob for config, prob in configurations.items() if len(config[0]) + len(config[1]) > 2}
+    for config, prob in configurations.items():
+        if config not in tied: results.addPair(*config[0], *config[1], prob)
+
+    variances = [0.0] * kernel.nTeams
+    samples = sampleTies(tiebreaker, set(tied), tieSamples, seed) if tied and tieSamples > 0 else {}
+    for config, prob in tied.items():
+        sampled = samples.get(config)
+        if sampled is None or sampled.n == 0:
+            # Never sampled (too rare): split evenly, as if no tiebreaker separated the group
+            groups = configurationGroups(config)
+            results.addShares(titleGameShares(groups), titleGamePairs(groups), prob)
+            continue
+        results.addShares({t: s / sampled.n for t, s in enumerate(sampled.shares) if s},
+                          {key: s / sampled.n for key, s in sampled.pairs.items()}, prob)
+        for t in range(kernel.nTeams):
+            mean = sampled.shares[t] / sampled.n
+            variances[t] += prob * prob * max(0.0, sampled.shareSquares[t] / sampled.n - mean * mean) / sampled.n
+
+    results.margins = [CONFIDENCE_Z * math.sqrt(v) for v in variances]
+    return (results, sum(tied.values()))
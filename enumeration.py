@@ -0,0 +1,411 @@
+# Exhaustive enumeration of every outcome of a conference's unplayed games.
+# Outcomes are walked in Gray-code order so each step flips exactly one game and win totals
+# update incrementally. The outcome space is split by prefix (the first unplayed games)
+# across a multiprocessing pool and per-prefix results are merged as they complete.
+# With pruning, a bounds analysis on each team's best and worst possible win totals collapses
+# every subtree whose title game pair is already decided, weighted by its number of outcomes.
+# Outcomes are weighted by their probability (see Conference.getProbability()), scaled so that every
+# outcome weighs 1 when all games are coin flips: each game contributes a factor of 2p (home win) or
+# 2(1 - p) (away win), and a subtree over r undecided games weighs 2^r times the factors fixed above it.
+# Runs can record every outcome (and every collapsed subtree) for later what-if queries, see outcomestore.py,
+# and tally how much each unplayed game's result moves every team's odds, see leverage.py.
+
+import multiprocessing
+import os, time, threading
+from operator import add, sub
+from typing import Callable
+import numpy as np
+from model import Conference
+from kernel import SeasonKernel
+from tiebreakers import Tiebreaker, titleGameShares, titleGamePairs
+from results import *
+from outcomestore import OutcomeRecorder
+from leverage import GameLeverage
+
+TASKS_PER_PROCESS = 8
+THROUGHPUT_TIME = 0.1 # seconds spent measuring throughput for an estimate
+POLL_STEPS = 1 << 14 # search nodes or outcomes walked between OutcomeMapper.poll calls
+PROGRESS_INTERVAL = 0.5 # seconds between progress reports while waiting on pool workers
+
+# Raised out of OutcomeMapper.mapPrefix() when its poll asks to stop
+class MapCancelled(Exception):
+    pass
+
+workerMapper: 'OutcomeMapper' = None
+workerCovered: 'multiprocessing.sharedctypes.Synchronized' = None # outcomes covered by all workers, see fullMap()
+
+def initWorker(conference: Conference, prune: bool, prefixLength: int, record: bool = False, tallyLeverage: bool = False,
+               covered: 'multiprocessing.sharedctypes.Synchronized' = None) -> None:
+    global workerMapper, workerCovered
+    workerMapper = OutcomeMapper(Tiebreaker(conference), prune)
+    workerMapper.prefixLength = prefixLength
+    workerMapper.record = record
+    workerMapper.tallyLeverage = tallyLeverage
+    workerCovered = covered
+    if covered is not None: workerMapper.poll = addCovered
+
+# Publishes a worker's progress to the parent; workers are stopped by terminating the pool, so never cancels
+def addCovered(covered: int) -> bool:
+    with workerCovered.get_lock():
+        workerCovered.value += covered
+    return True
+
+# Process pool start method: forking copies the parent's locks as they are, which only the main thread can count
+# on being safe (off it, another thread may hold one, e.g. the REPL's input() holds stdin's while a background
+# job starts a pool, and the workers hang), so pools started off the main thread fork from a clean server process
+def poolContext() -> multiprocessing.context.BaseContext:
+    if threading.current_thread() is threading.main_thread(): return multiprocessing.get_context()
+    return multiprocessing.get_context("forkserver")
+
+def enumerateWorker(prefix: int) -> tuple[int, ResultAggregator, int, OutcomeRecorder | None, GameLeverage | None]:
+    return (prefix, *workerMapper.mapPrefix(prefix), workerMapper.recorder, workerMapper.leverage)
+
+# Index of the game flipped between Gray codes i-1 and i (number of trailing zeros of i)
+def grayFlip(i: int) -> int:
+    return (i & -i).bit_length() - 1
+
+# Teams that can still finish in the top two on record, given current wins and games left per team
+# A team is out once its best possible total is below the second best current total
+def contenders(wins: list[int], remaining: list[int]) -> list[int]:
+    cut = sorted(wins, reverse = True)[1]
+    return [t for t, w in enumerate(wins) if w + remaining[t] >= cut]
+
+# Orders unplayed games for branch-and-bound
+# Games involving a team still in contention come first; games between two teams that are already
+# out of contention can only matter through tiebreakers and are left to the end (the 'tail')
+# Returns (ordered games, number of games before the tail)
+def orderGames(kernel: SeasonKernel) -> tuple[list[int], int]:
+    remaining = [0] * kernel.nTeams
+    for g in kernel.unplayed:
+        remaining[kernel.home[g]] += 1
+        remaining[kernel.away[g]] += 1
+    live = set(contenders(kernel.baseWins, remaining)) if kernel.nTeams > 1 else set()
+
+    # Higher-ceiling teams' games first so subtrees decide (and collapse) as early as possible
+    ceiling = lambda g: -max(kernel.baseWins[t] + remaining[t] for t in (kernel.home[g], kernel.away[g]))
+    relevant = sorted([g for g in kernel.unplayed if kernel.home[g] in live or kernel.away[g] in live], key = ceiling)
+    tail = [g for g in kernel.unplayed if kernel.home[g] not in live and kernel.away[g] not in live]
+    return (relevant + tail, len(relevant))
+
+class OutcomeMapper:
+    def __init__(self, tiebreaker: Tiebreaker, prune: bool = True) -> None:
+        self.tiebreaker = tiebreaker
+        self.kernel: SeasonKernel = tiebreaker.kernel
+        self.prune = prune
+        if prune:
+            self.games, self.nRelevant = orderGames(self.kernel)
+        else:
+            self.games, self.nRelevant = (list(self.kernel.unplayed), 0)
+        self.tail = self.games[self.nRelevant:]
+        self.prefixLength = 0
+        self.record = False # Record outcomes of each mapPrefix() call into a new self.recorder
+        self.recorder: OutcomeRecorder = None
+        self.tallyLeverage = False # Tally game leverage of each mapPrefix() call into a new self.leverage
+        self.leverage: GameLeverage = None
+        self.homeRows: dict[int, list[float]] = None # Per game: title game shares while the home team won, see tallyPrefix()
+        self.collapsed: list[list[float]] = None # Per depth: title game shares of the subtrees collapsed there
+        self.positions = {g: j for j, g in enumerate(self.kernel.unplayed)} # Leverage row of each unplayed game
+        # Called every POLL_STEPS steps of mapPrefix() (and once at its end) with the outcomes covered since the last
+        # call; returning False cancels the prefix, see MapCancelled
+        self.poll: Callable[[int], bool] = None
+        self.covered = 0 # outcomes walked, collapsed or skipped since the last poll
+        self.untilPoll = POLL_STEPS
+        self.freeMasks = [0] * (len(self.games) + 1) # Games from each depth on
+        for depth in range(len(self.games) - 1, -1, -1):
+            self.freeMasks[depth] = self.freeMasks[depth + 1] | 1 << self.games[depth]
+        self.homeFactor = [2 * p for p in self.kernel.probabilities]
+        self.awayFactor = [2 * (1 - p) for p in self.kernel.probabilities]
+
+    # Number of leading games fixed per task so there are about TASKS_PER_PROCESS tasks per process
+    # Without pruning every game is in the tail and the prefix is taken from it
+    def prefixBits(self, processes: int) -> int:
+        available = self.nRelevant if self.prune else len(self.games)
+        return min(available, max(0, (processes * TASKS_PER_PROCESS - 1).bit_length()))
+
+    # Maps every outcome with the first games fixed to the given prefix bits
+    # Returns (aggregated results, outcomes evaluated individually)
+    def mapPrefix(self, prefix: int, prefixBits: int = None) -> tuple[ResultAggregator, int]:
+        kernel = self.kernel
+        prefixBits = self.prefixLength if prefixBits is None else prefixBits
+        self.results = ResultAggregator(kernel.nTeams)
+        self.evaluated = 0
+        self.recorder = OutcomeRecorder(kernel) if self.record else None
+        self.leverage = GameLeverage(kernel) if self.tallyLeverage else None
+        self.homeRows = {g: [0.0] * kernel.nTeams for g in self.games} if self.tallyLeverage else None
+        self.collapsed = [[0.0] * kernel.nTeams for _ in range(len(self.games) + 1)] if self.tallyLeverage else None
+
+        # All unassigned games start as away wins
+        self.outcome = kernel.playedOutcome
+        self.wins = kernel.baseWins.copy()
+        self.remaining = [0] * kernel.nTeams
+        self.weight = 1.0
+        for j, g in enumerate(self.games):
+            if j < prefixBits and prefix >> j & 1:
+                self.outcome |= 1 << g
+                self.wins[kernel.home[g]] += 1
+                self.weight *= self.homeFactor[g]
+            elif j < prefixBits:
+                self.wins[kernel.away[g]] += 1
+                self.weight *= self.awayFactor[g]
+            else:
+                self.remaining[kernel.home[g]] += 1
+                self.remaining[kernel.away[g]] += 1
+        self.results.total = (1 << (len(self.games) - prefixBits)) * self.weight
+        if self.weight == 0:
+            self.covered += 1 << (len(self.games) - prefixBits)
+        elif self.prune and prefixBits <= self.nRelevant:
+            self.search(prefixBits)
+        else:
+            self.enumerateTail(self.games[prefixBits:])
+        if self.leverage is not None and self.weight != 0: self.tallyPrefix(prefixBits)
+        if self.poll is not None: self.poll(self.covered) # The prefix is done either way
+        self.covered = 0
+        return (self.results, self.evaluated)
+
+    # Passes the outcomes covered so far to self.poll, raising MapCancelled if it asks to stop
+    def pollNow(self) -> None:
+        self.untilPoll = POLL_STEPS
+        if self.poll is None: return
+        covered, self.covered = self.covered, 0
+        if not self.poll(covered): raise MapCancelled()
+
+    # Completes the prefix's leverage tallies into self.leverage
+    # Each game's home row gets the counts by which the title game shares grew while its home team won: subtracted
+    # as the game flips to a home win and added back as it flips away (or at the end). Games the prefix fixes as
+    # home wins take every share; a subtree collapsed at some depth leaves the games from there on free, and
+    # counts toward their home rows split p : 1 - p. Home weights follow from independence, p of the total
+    def tallyPrefix(self, prefixBits: int) -> None:
+        counts, total = self.results.counts, self.results.total
+        homeCounts = np.zeros((len(self.positions), self.kernel.nTeams))
+        homeWeights = np.zeros(len(self.positions))
+        free = [0.0] * self.kernel.nTeams
+        for j, g in enumerate(self.games):
+            p = self.kernel.probabilities[g]
+            if j < prefixBits:
+                home = self.outcome >> g & 1
+                homeCounts[self.positions[g]] = counts if home else 0.0
+                homeWeights[self.positions[g]] = total if home else 0.0
+            else:
+                free = list(map(add, free, self.collapsed[j]))
+                homeCounts[self.positions[g]] = np.array(self.homeRows[g]) + p * np.array(free)
+                homeWeights[self.positions[g]] = p * total
+        self.leverage.addCounts(homeCounts, homeWeights, np.array(counts, dtype = np.float64), total)
+
+    # Branches on games[depth], collapsing the subtree as soon as only two teams can reach the title game
+    # Branches with probability zero are skipped
+    def search(self, depth: int) -> None:
+        kernel = self.kernel
+        wins, remaining = self.wins, self.remaining
+
+        self.untilPoll -= 1
+        if self.untilPoll <= 0: self.pollNow()
+
+        live = contenders(wins, remaining)
+        if len(live) <= 2:
+            self.covered += 1 << (len(self.games) - depth)
+            weight = (1 << (len(self.games) - depth)) * self.weight
+            self.results.addPair(*live, weight)
+            if self.recorder is not None: self.recorder.add(self.outcome, self.freeMasks[depth], weight, self.recorder.pairId(*live))
+            if self.collapsed is not None:
+                for t in live:
+                    self.collapsed[depth][t] += weight
+            return
+        if depth == self.nRelevant:
+            self.enumerateTail(self.tail)
+            return
+
+        g = self.games[depth]
+        h, a = kernel.home[g], kernel.away[g]
+        remaining[h] -= 1
+        remaining[a] -= 1
+
+        weight = self.weight
+        rows, counts = self.homeRows, self.results.counts
+        if self.homeFactor[g]:
+            self.outcome |= 1 << g
+            self.weight = weight * self.homeFactor[g]
+            wins[h] += 1
+            if rows is not None: rows[g] = list(map(sub, rows[g], counts))
+            self.search(depth + 1)
+            if rows is not None: rows[g] = list(map(add, rows[g], counts))
+            wins[h] -= 1
+            self.outcome &= ~(1 << g)
+        else:
+            self.covered += 1 << (len(self.games) - depth - 1)
+
+        if self.awayFactor[g]:
+            self.weight = weight * self.awayFactor[g]
+            wins[a] += 1
+            self.search(depth + 1)
+            wins[a] -= 1
+        else:
+            self.covered += 1 << (len(self.games) - depth - 1)
+        self.weight = weight
+
+        remaining[h] += 1
+        remaining[a] += 1
+
+    # Walks all outcomes of the given games in Gray-code order from the current state (all away wins)
+    # The weight is kept as a product of nonzero factors plus a count of zero factors, so outcomes with
+    # probability zero are skipped and flips never divide by zero
+    def enumerateTail(self, games: list[int]) -> None:
+        kernel = self.kernel
+        home, away = kernel.home, kernel.away
+        homeFactor, awayFactor = self.homeFactor, self.awayFactor
+        results = self.results
+        recorder = self.recorder
+        rows, counts = self.homeRows, results.counts
+        outcome = self.outcome
+        wins = self.wins.copy()
+        weight, zeros = self.weight, 0
+        for g in games:
+            wins[away[g]] += 1
+            if awayFactor[g]: weight *= awayFactor[g]
+            else: zeros += 1
+
+        size = 1 << len(games)
+        nextPoll, walked = self.untilPoll, 0
+        for i in range(size):
+            if i == nextPoll:
+                self.covered += i - walked
+                walked = i
+                self.pollNow()
+                nextPoll += POLL_STEPS
+            if i:
+                g = games[grayFlip(i)]
+                outcome ^= 1 << g
+                if outcome >> g & 1:
+                    wins[home[g]] += 1
+                    wins[away[g]] -= 1
+                    old, new = awayFactor[g], homeFactor[g]
+                    if rows is not None: rows[g] = list(map(sub, rows[g], counts))
+                else:
+                    wins[home[g]] -= 1
+                    wins[away[g]] += 1
+                    old, new = homeFactor[g], awayFactor[g]
+                    if rows is not None: rows[g] = list(map(add, rows[g], counts))
+                if old: weight /= old
+                else: zeros -= 1
+                if new: weight *= new
+                else: zeros += 1
+            if zeros: continue
+
+            top = sorted(wins, reverse = True)
+            if len(top) < 3 or top[1] != top[2]:
+                pair = [t for t, w in enumerate(wins) if w >= top[1]]
+                results.addPair(*pair, weight)
+                if recorder is not None: recorder.add(outcome, 0, weight, recorder.pairId(*pair))
+            else:
+                groups = self.tiebreaker.titleGameGroups(outcome, wins)
+                shares, pairs = titleGameShares(groups), titleGamePairs(groups)
+                results.addShares(shares, pairs, weight)
+                if recorder is not None: recorder.add(outcome, 0, weight, recorder.resultId(shares, pairs))
+        if rows is not None:
+            for g in games:
+                if outcome >> g & 1: rows[g] = list(map(add, rows[g], counts))
+        self.covered += size - walked
+        self.untilPoll = nextPoll - size
+        self.evaluated += size
+
+# Outcomes per second of unpruned enumeration on this conference, measured on a slice of its own outcome space
+# Enumerates the last k unplayed games with the rest fixed, doubling the slice until it takes THROUGHPUT_TIME
+def measureThroughput(conference: Conference, minTime: float = THROUGHPUT_TIME) -> float:
+    mapper = OutcomeMapper(Tiebreaker(conference), prune = False)
+    nGames = len(mapper.games)
+    k = min(nGames, 6)
+    while True:
+        start = time.perf_counter()
+        results, evaluated = mapper.mapPrefix(0, nGames - k)
+        elapsed = time.perf_counter() - start
+        if elapsed >= minTime or k == nGames: break
+        k += 1
+    return evaluated / elapsed if elapsed > 0 else float('inf')
+
+# Enumerates every outcome of the unplayed games, split across a pool of processes (defaults to all cores)
+# With prune, subtrees whose title game pair is decided by win total bounds are counted without being walked
+# Per-prefix results are merged as they stream in. With a checkpoint filename, merged results and the completed
+# prefixes are saved every CHECKPOINT_INTERVAL seconds and a matching checkpoint is resumed from
+# With a recorder, every outcome and collapsed subtree is recorded into it (a recording run starts over rather
+# than resume, since the checkpoint holds no records)
+# With a leverage, every outcome and collapsed subtree is also tallied into it (see GameLeverage); its tallies
+# are checkpointed
+# With progress, it is called with the results of the prefixes merged so far and the fraction of the outcome space
+# covered: after each prefix, and in between every PROGRESS_INTERVAL seconds (pool) or POLL_STEPS steps (in-process).
+# Returning False stops the run within that time, the pool terminated and the prefixes merged so far checkpointed
+# so a rerun picks up from there
+# Returns (aggregated results, outcomes evaluated individually)
+def fullMap(conference: Conference, processes: int = None, prune: bool = True,
+            checkpoint: str = None, recorder: OutcomeRecorder = None, leverage: GameLeverage = None,
+            progress: Callable[[ResultAggregator, float], bool] = None) -> tuple[ResultAggregator, int]:
+    processes = os.cpu_count() if processes is None else processes
+    mapper = OutcomeMapper(Tiebreaker(conference), prune)
+    mapper.record = recorder is not None
+    mapper.tallyLeverage = leverage is not None
+    # Split even when running in-process so checkpoints have completed prefixes to record
+    mapper.prefixLength = mapper.prefixBits(processes)
+
+    results = ResultAggregator(mapper.kernel.nTeams)
+    completed = set()
+    evaluated = 0
+    params = {'prune': prune, 'prefixLength': mapper.prefixLength, 'leverage': leverage is not None}
+    signature = runSignature(mapper.kernel, "fullmap", params)
+    resumed = loadCheckpoint(checkpoint, signature) if checkpoint is not None and recorder is None else None
+    if resumed is not None:
+        results, cursor = resumed
+        completed = set(cursor['completed'])
+        evaluated = cursor['evaluated']
+        if leverage is not None: leverage.loadDict(cursor['leverage'])
+    prefixes = [prefix for prefix in range(1 << mapper.prefixLength) if prefix not in completed]
+
+    # Outcomes covered, counting resumed prefixes whole, as a fraction of the outcome space
+    context = poolContext()
+    covered = context.Value('q', len(completed) << (len(mapper.games) - mapper.prefixLength))
+    fraction = lambda: min(1.0, covered.value / (1 << len(mapper.games)))
+
+    lastCheckpoint = time.time()
+    stopped = False
+    def report() -> None:
+        nonlocal lastCheckpoint, stopped
+        if progress is not None: stopped = not progress(results, fraction())
+        if checkpoint is not None and (stopped or time.time() - lastCheckpoint >= CHECKPOINT_INTERVAL):
+            cursor = {'completed': sorted(completed), 'evaluated': evaluated}
+            if leverage is not None: cursor['leverage'] = leverage.toDict()
+            saveCheckpoint(checkpoint, signature, results, cursor)
+            lastCheckpoint = time.time()
+
+    def merge(prefix: int, prefixResults: ResultAggregator, prefixEvaluated: int, prefixRecorder: OutcomeRecorder = None,
+              prefixLeverage: GameLeverage = None) -> None:
+        nonlocal evaluated
+        results.merge(prefixResults)
+        if recorder is not None: recorder.merge(prefixRecorder)
+        if leverage is not None: leverage.merge(prefixLeverage)
+        completed.add(prefix)
+        evaluated += prefixEvaluated
+        report()
+
+    if processes <= 1:
+        # Mid-prefix polls report progress too; a cancelled prefix is dropped, to be mapped again on resume
+        def poll(prefixCovered: int) -> bool:
+            covered.value += prefixCovered
+            report()
+            return not stopped
+        mapper.poll = poll
+        for prefix in prefixes:
+            try:
+                merge(prefix, *mapper.mapPrefix(prefix), mapper.recorder, mapper.leverage)
+            except MapCancelled:
+                break
+            if stopped: break
+    else:
+        initargs = (conference, prune, mapper.prefixLength, mapper.record, mapper.tallyLeverage, covered)
+        with context.Pool(processes, initializer = initWorker, initargs = initargs) as pool:
+            pending = pool.imap_unordered(enumerateWorker, prefixes)
+            while not stopped and len(completed) < 1 << mapper.prefixLength:
+                try:
+                    merge(*pending.next(PROGRESS_INTERVAL))
+                except multiprocessing.TimeoutError:
+                    report()
+            if stopped: pool.terminate() # Prefixes still mapping are dropped, to be mapped again on resume
+
+    if checkpoint is not None and not stopped: removeCheckpoint(checkpoint)
+    return (results, evaluated)
@@ -0,0 +1,249 @@
+# Multi-season historical store: teams, games and non-conference wins of every ingested conference season,
+# with each season's title game, in one SQLite database indexed by season, conference and team.
+# Seasons are ingested from API payloads (teams and games responses), parsed exactly as a live update
+# parses them (see DataController.applyGames()), either straight from the response cache or fetched
+# (through the cache) many at once. Re-ingesting a season replaces it.
+#   python history.py ingest [--years 2014-2024] [--conferences ACC SEC] [--cached]
+#   python history.py show YEAR CONFERENCE
+
+import os, sys, json, sqlite3, argparse
+import DataController
+from main import SUPPORTED_CONFS
+from model import Conference, Team, Game
+
+HISTORY_PATH = "history"
+DEFAULT_FIRST_YEAR = 2014
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conferences (
+    year INTEGER NOT NULL,
+    abbr TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (year, abbr)
+);
+CREATE TABLE IF NOT EXISTS teams (
+    year INTEGER NOT NULL,
+    conference TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    division TEXT,
+    nonConfWins INTEGER NOT NULL,
+    PRIMARY KEY (year, conference, position)
+);
+CREATE INDEX IF NOT EXISTS teamsByName ON teams (name, year);
+CREATE TABLE IF NOT EXISTS games (
+    year INTEGER NOT NULL,
+    conference TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    week INTEGER,
+    home TEXT NOT NULL,
+    away TEXT NOT NULL,
+    winner TEXT,
+    titleGame INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (year, conference, position)
+);
+CREATE INDEX IF NOT EXISTS gamesByHome ON games (home, year);
+CREATE INDEX IF NOT EXISTS gamesByAway ON games (away, year);
+"""
+
+def historyFilename() -> str:
+    os.makedirs(HISTORY_PATH, exist_ok = True)
+    return os.path.join(HISTORY_PATH, "seasons.sqlite")
+
+class HistoryStore:
+    def __init__(self, filename: str = None) -> None:
+        self.filename = historyFilename() if filename is None else filename
+        self.db = sqlite3.connect(self.filename)
+        self.db.executescript(SCHEMA)
+
+    def __repr__(self) -> str:
+        return f"<HistoryStore ({self.filename})>"
+
+    def close(self) -> None:
+        self.db.close()
+
+    # === INGESTION ===
+
+    # Stores one conference season from its teams and games responses, replacing it if already stored
+    # Conference games are parsed as a live update parses them; the title game is kept apart from the standings
+    def ingestSeason(self, year: int, abbrName: str, teams: list, games: list) -> Conference:
+        conference = Conference(teams[0]['conference'], abbrName)
+        for t in teams:
+            conference.addTeam(Team(t['school'], conference))
+        DataController.applyGames(conference, games)
+        divisions = {t['school']: t.get('division') for t in teams}
+        weeks = {(g['home_team'], g['away_team']): g.get('week') for g in games if not DataController.isTitleGame(g)}
+        titleGames = [g for g in games if DataController.isTitleGame(g)
+                      and conference.getTeamByName(g['home_team']) is not None
+                      and conference.getTeamByName(g['away_team']) is not None]
+
+        gameRows = [(year, abbrName, i, weeks.get((g.home.name, g.away.name)), g.home.name, g.away.name,
+                     g.winner.name if g.winner is not None else None, 0) for i, g in enumerate(conference.games)]
+        for g in titleGames:
+            winner = None
+            if g['completed']: winner = g['home_team'] if g['home_points'] > g['away_points'] else g['away_team']
+            gameRows.append((year, abbrName, len(gameRows), g.get('week'), g['home_team'], g['away_team'], winner, 1))
+
+        with self.db:
+            self.deleteSeason(year, abbrName)
+            self.db.execute("INSERT INTO conferences VALUES (?, ?, ?)", (year, abbrName, conference.name))
+            self.db.executemany("INSERT INTO teams VALUES (?, ?, ?, ?, ?, ?)",
+                                [(year, abbrName, i, t.name, divisions.get(t.name), t.nonConfWins)
+                                 for i, t in enumerate(conference.teams)])
+            self.db.executemany("INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?)", gameRows)
+        return conference
+
+    def deleteSeason(self, year: int, abbrName: str) -> None:
+        for table in ("conferences", "teams", "games"):
+            self.db.execute(f"DELETE FROM {table} WHERE year = ? AND {'abbr' if table == 'conferences' else 'conference'} = ?",
+                            (year, abbrName))
+
+    # Ingests every conference season with both a teams and a games response in the response cache, without
+    # requests; a teams response without a year is the current season's (see DataController.teamsParams())
+    # Returns the (year, conference) seasons ingested
+    def ingestCached(self, cache = None) -> list[tuple[int, str]]:
+        cache = DataController.responseCache if cache is None else cache
+        teams, games = {}, {}
+        if not os.path.isdir(cache.path): return []
+        for name in os.listdir(cache.path):
+            if not name.endswith(".json"): continue
+            try:
+                with open(os.path.join(cache.path, name), 'r') as f:
+                    entry = json.load(f)
+            except ValueError:
+                continue
+            params = entry['params']
+            if 'conference' not in params: continue
+            if entry['directory'] == "teams":
+                teams[(int(params.get('year', DataController.YEAR)), params['conference'])] = entry['body']
+            elif entry['directory'] == "games" and params.get('seasonType') == "regular":
+                games[(int(params['year']), params['conference'])] = entry['body']
+
+        ingested = []
+        for season in sorted(set(teams) & set(games)):
+            if not teams[season]: continue
+            self.ingestSeason(*season, teams[season], games[season])
+            ingested.append(season)
+        return ingested
+
+    # Fetches (through the response cache) and ingests every season of the given conferences, all requested at once
+    # Returns (the (year, conference) seasons ingested, errors by season)
+    def ingestFetched(self, years: list[int], abbrNames: list[str]) -> tuple[list[tuple[int, str]], dict[tuple[int, str], str]]:
+        seasons = [(year, abbrName) for year in years for abbrName in abbrNames]
+        requestList = []
+        for year, abbrName in seasons:
+            requestList.append(("teams", DataController.teamsParams(abbrName, year)))
+            requestList.append(("games", DataController.gamesParams(abbrName, year)))
+        responses = iter(DataController.makeRequests(requestList))
+
+        ingested, errors = [], {}
+        for season in seasons:
+            teams, games = next(responses), next(responses)
+            if isinstance(teams, DataController.APIError) or isinstance(games, DataController.APIError):
+                errors[season] = str(teams if isinstance(teams, DataController.APIError) else games)
+            elif not teams:
+                errors[season] = f"no teams found for {season[1]} in {season[0]}"
+            else:
+                self.ingestSeason(*season, teams, games)
+                ingested.append(season)
+        return (ingested, errors)
+
+    # === QUERIES ===
+
+    # Stored (year, conference) seasons, optionally only those of some years or conferences
+    def seasons(self, years: list[int] = None, abbrNames: list[str] = None) -> list[tuple[int, str]]:
+        query, params = "SELECT year, abbr FROM conferences WHERE 1", []
+        if years is not None:
+            query += f" AND year IN ({', '.join('?' * len(years))})"
+            params.extend(years)
+        if abbrNames is not None:
+            query += f" AND abbr IN ({', '.join('?' * len(abbrNames))})"
+            params.extend(abbrNames)
+        return [tuple(row) for row in self.db.execute(query + " ORDER BY year, abbr", params)]
+
+    # A stored season as a conference, its standings games only
+    # Returns None if the season isn't stored
+    def conference(self, year: int, abbrName: str) -> Conference | None:
+        row = self.db.execute("SELECT name FROM conferences WHERE year = ? AND abbr = ?", (year, abbrName)).fetchone()
+        if row is None: return None
+        conference = Conference(row[0], abbrName)
+        for name, nonConfWins in self.db.execute("SELECT name, nonConfWins FROM teams WHERE year = ? AND conference = ? "
+                                                 "ORDER BY position", (year, abbrName)):
+            team = Team(name)
+            team.nonConfWins = nonConfWins
+            conference.addTeam(team)
+        for home, away, winner in self.db.execute("SELECT home, away, winner FROM games WHERE year = ? AND conference = ? "
+                                                  "AND NOT titleGame ORDER BY position", (year, abbrName)):
+            conference.addGame(Game(conference.getTeamByName(home), conference.getTeamByName(away),
+                                    conference.getTeamByName(winner)))
+        return conference
+
+    # Divisions of a stored season's teams by team name (empty for a season without divisions)
+    def divisions(self, year: int, abbrName: str) -> dict[str, str]:
+        return dict(self.db.execute("SELECT name, division FROM teams WHERE year = ? AND conference = ? "
+                                    "AND division IS NOT NULL AND division != ''", (year, abbrName)))
+
+    # The title game of a stored season as (home, away, winner), or None if none was played (or stored)
+    def titleGame(self, year: int, abbrName: str) -> tuple[str, str, str | None] | None:
+        row = self.db.execute("SELECT home, away, winner FROM games WHERE year = ? AND conference = ? AND titleGame",
+                              (year, abbrName)).fetchone()
+        return tuple(row) if row is not None else None
+
+    # A team's seasons as (year, conference, division, non-conference wins)
+    def teamSeasons(self, teamName: str) -> list[tuple[int, str, str | None, int]]:
+        return [tuple(row) for row in self.db.execute("SELECT year, conference, division, nonConfWins FROM teams "
+                                                      "WHERE name = ? ORDER BY year", (teamName,))]
+
+    # A team's conference games (title games included) as (year, conference, week, home, away, winner, title game)
+    def teamGames(self, teamName: str, year: int = None) -> list[tuple]:
+        query = "SELECT year, conference, week, home, away, winner, titleGame FROM games WHERE {} = ?"
+        params = (teamName,) if year is None else (teamName, year)
+        if year is not None: query += " AND year = ?"
+        rows = [row for column in ("home", "away") for row in self.db.execute(query.format(column), params)]
+        return sorted(rows, key = lambda row: (row[0], row[2] if row[2] is not None else 0))
+
+# Parses a span of years: "2019" or "2014-2024"
+def parseYears(text: str) -> list[int]:
+    first, _, last = text.partition("-")
+    return list(range(int(first), int(last or first) + 1))
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description = "Build and browse the multi-season historical store.")
+    commands = parser.add_subparsers(dest = "command", required = True)
+    ingest = commands.add_parser("ingest", help = "ingest seasons from the API (through the response cache)")
+    ingest.add_argument("--years", type = parseYears, default = parseYears(f"{DEFAULT_FIRST_YEAR}-{DataController.YEAR}"))
+    ingest.add_argument("--conferences", nargs = "+", type = str.upper, default = SUPPORTED_CONFS)
+    ingest.add_argument("--cached", action = "store_true", help = "only ingest responses already in the cache, without requests")
+    show = commands.add_parser("show", help = "show a stored season's standings games and title game")
+    show.add_argument("year", type = int)
+    show.add_argument("conference", type = str.upper)
+    args = parser.parse_args(argv)
+
+    store = HistoryStore()
+    try:
+        if args.command == "ingest":
+            if args.cached:
+                ingested, errors = store.ingestCached(), {}
+            else:
+                ingested, errors = store.ingestFetched(args.years, args.conferences)
+            print(f"Ingested {len(ingested)} seasons into {store.filename}")
+            for (year, abbrName), error in sorted(errors.items()):
+                print(f"  {year} {abbrName}: {error}")
+            return 1 if errors else 0
+
+        conference = store.conference(args.year, args.conference)
+        if conference is None:
+            print(f"Not stored: {args.year} {args.conference}")
+            return 1
+        print(f"{args.year} {conference.name}: {len(conference.teams)} teams, {len(conference.games)} conference games")
+        for team in conference.teams:
+            wins = sum(g.winner is team for g in team.games)
+            print(f"  {team.name:<24}{wins}-{sum(g.winner is not None for g in team.games) - wins}")
+        titleGame = store.titleGame(args.year, args.conference)
+        if titleGame is not None: print(f"Title game: {titleGame[1]} @ {titleGame[0]} ({titleGame[2] or 'unplayed'})")
+        return 0
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,83 @@
+# Optional instrumentation of tiebreaker and simulation internals.
+# While disabled nothing is wrapped, so the hot paths run exactly as uninstrumented code. While enabled,
+# Tiebreakers created afterwards wrap their rules and breakTie to record per-rule call counts, time
+# and separation rates, and the sizes of tied groups. Runs (simulate, fullmap, exact, clinch) are always recorded,
+# once per run. Statistics from worker processes are not collected.
+
+import json, time
+
+enabled = False
+
+class RuleStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.separated = 0 # calls that split the tied group
+
+    def toDict(self) -> dict:
+        return {'calls': self.calls,
+                'seconds': self.seconds,
+                'separated': self.separated,
+                'separationRate': self.separated / self.calls if self.calls else 0.0}
+
+rules: dict[str, dict[str, RuleStats]] = {'two': {}, 'multi': {}} # By chain, then rule name
+tieSizes: dict[int, int] = {} # Tied groups handed to breakTie by size, including subgroups left by a rule
+runs: list[dict] = []
+
+def enable() -> None:
+    global enabled
+    enabled = True
+
+def disable() -> None:
+    global enabled
+    enabled = False
+
+def reset() -> None:
+    for chain in rules.values(): chain.clear()
+    tieSizes.clear()
+    runs.clear()
+
+# Wraps a bound rule def to record its calls, time and separations under the given chain ('two' or 'multi')
+def timedRule(chain: str, name: str, rule):
+    stats = rules[chain].setdefault(name, RuleStats())
+    def timed(teams: list[int]) -> list[list[int]]:
+        start = time.perf_counter()
+        groups = rule(teams)
+        stats.seconds += time.perf_counter() - start
+        stats.calls += 1
+        if len(groups) > 1: stats.separated += 1
+        return groups
+    return timed
+
+# Wraps a bound breakTie to record tied group sizes
+def countedTies(breakTie):
+    def counted(teams: list[int]) -> list[list[int]]:
+        size = len(teams)
+        if size > 1: tieSizes[size] = tieSizes.get(size, 0) + 1
+        return breakTie(teams)
+    return counted
+
+# Records a finished run; cache is the Tiebreaker cache's stats() if available
+# Engines that don't go through outcomes one by one (exact, clinch) pass None for outcomes and get no throughput;
+# evaluated is what they did count instead, if anything
+def recordRun(kind: str, conference: str, outcomes: int | None, seconds: float, evaluated: int = None, cache: dict = None) -> None:
+    run = {'kind': kind,
+           'conference': conference,
+           'seconds': seconds}
+    if outcomes is not None:
+        run['outcomes'] = outcomes
+        run['perSecond'] = outcomes / seconds if seconds > 0 else 0.0
+    if evaluated is not None: run['evaluated'] = evaluated
+    if cache is not None: run['cache'] = cache
+    runs.append(run)
+
+def toDict() -> dict:
+    return {'enabled': enabled,
+            'rules': {chain: {name: stats.toDict() for name, stats in chainStats.items()}
+                      for chain, chainStats in rules.items()},
+            'tieSizes': {str(size): count for size, count in sorted(tieSizes.items())},
+            'runs': runs}
+
+def export(filename: str) -> None:
+    with open(filename, 'w') as f:
+        json.dump(toDict(), f, indent = 2)
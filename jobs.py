@@ -0,0 +1,134 @@
+# Background jobs: long simulate/fullmap runs on a small pool of threads, so the REPL stays usable meanwhile.
+# A run reports its results so far after each chunk (or prefix), which gives its progress, throughput and ETA
+# and lets partial results be viewed, and stops at its next report once cancelled. A stopped run leaves its
+# checkpoint, so running the same thing again picks up where it stopped. fullmap does the heavy lifting in
+# its own process pool; a simulate job shares this process with the REPL.
+
+import time, threading, itertools, traceback
+from typing import Callable, TYPE_CHECKING
+from results import ResultAggregator
+if TYPE_CHECKING: from concurrent.futures import ThreadPoolExecutor # imported with the first job, see submit()
+
+MAX_JOBS = 2 # jobs running at once; later ones wait their turn
+
+QUEUED, RUNNING, DONE, CANCELLED, FAILED = "queued", "running", "done", "cancelled", "failed"
+
+class Job:
+    def __init__(self, id: int, kind: str, abbrName: str) -> None:
+        self.id = id
+        self.kind = kind
+        self.abbrName = abbrName
+        self.state = QUEUED
+        self.started: float = None
+        self.finished: float = None
+        self.fraction = 0.0 # of the run done, as of the latest report
+        self.outcomes = 0 # in the whole run (simulations, or fullmap's outcome space), for throughput()
+        self.results: ResultAggregator = None # copy of the latest (or final) results
+        self.odds: dict[str, float] = None # final title game odds by team name
+        self.error: str = None
+        self.cancelEvent = threading.Event()
+        self.lock = threading.Lock()
+        self.firstReport: tuple[float, float] = None # (time, fraction) throughput is measured from
+        self.lastReport: tuple[float, float] = None
+        self.announced = False # completion shown, see JobManager.collectFinished()
+
+    def __repr__(self) -> str:
+        return f"<Job {self.id}: {self.kind} {self.abbrName} ({self.state})>"
+
+    # Progress callback for the engines (see simulation.monteCarlo(), enumeration.fullMap()): keeps a copy of
+    # the results so far, and returns False once the job is cancelled so the run stops
+    def report(self, results: ResultAggregator, fraction: float) -> bool:
+        snapshot = ResultAggregator.fromDict(results.toDict())
+        snapshot.counts = list(snapshot.counts) # Shared by toDict()
+        snapshot.margins = list(results.margins) if results.margins is not None else None
+        now = time.perf_counter()
+        with self.lock:
+            self.results = snapshot
+            self.fraction = fraction
+            if self.firstReport is None: self.firstReport = (now, fraction)
+            self.lastReport = (now, fraction)
+        return not self.cancelEvent.is_set()
+
+    def cancel(self) -> None:
+        self.cancelEvent.set()
+
+    def cancelled(self) -> bool:
+        return self.cancelEvent.is_set()
+
+    def active(self) -> bool:
+        return self.state in (QUEUED, RUNNING)
+
+    # Outcomes per second between the first and latest reports (outcomes from before a resume don't count),
+    # or None until two reports apart in time
+    # Measured by progress, which covers outcomes a fullmap prefix still in progress has mapped
+    def throughput(self) -> float | None:
+        with self.lock:
+            first, last = self.firstReport, self.lastReport
+        if first is None or last[0] <= first[0]: return None
+        return (last[1] - first[1]) * self.outcomes / (last[0] - first[0])
+
+    # Seconds left at the rate progress has been made so far, or None until measurable
+    # An upper bound for simulate runs that stop once their odds are precise enough
+    def eta(self) -> float | None:
+        with self.lock:
+            first, last = self.firstReport, self.lastReport
+        if first is None or last[1] <= first[1]: return None
+        return (1 - last[1]) * (last[0] - first[0]) / (last[1] - first[1])
+
+    def elapsed(self) -> float:
+        if self.started is None: return 0.0
+        return (self.finished if self.finished is not None else time.time()) - self.started
+
+class JobManager:
+    def __init__(self, maxJobs: int = MAX_JOBS) -> None:
+        self.maxJobs = maxJobs
+        self.pool: 'ThreadPoolExecutor | None' = None # Started with the first job
+        self.jobs: dict[int, Job] = {}
+        self.ids = itertools.count(1)
+
+    # Starts run(job) in the background, once a slot is free
+    # run returns the final odds, or None if it stopped early because the job was cancelled
+    def submit(self, kind: str, abbrName: str, run: Callable[[Job], dict[str, float] | None]) -> Job:
+        if self.pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self.pool = ThreadPoolExecutor(max_workers = self.maxJobs, thread_name_prefix = "job")
+        job = Job(next(self.ids), kind, abbrName)
+        self.jobs[job.id] = job
+        self.pool.submit(self.execute, job, run)
+        return job
+
+    def execute(self, job: Job, run: Callable[[Job], dict[str, float] | None]) -> None:
+        if job.cancelled():
+            job.state = CANCELLED
+            return
+        job.started = time.time()
+        job.state = RUNNING
+        try:
+            job.odds = run(job)
+            state = DONE if job.odds is not None else CANCELLED
+        except Exception:
+            job.error = traceback.format_exc()
+            state = FAILED
+        job.finished = time.time()
+        job.state = state # Last, so a finished job is complete once seen
+
+    def get(self, id: int) -> Job | None:
+        return self.jobs.get(id)
+
+    # Queued or running jobs, optionally only those of one kind on one conference
+    def active(self, kind: str = None, abbrName: str = None) -> list[Job]:
+        return [job for job in self.jobs.values() if job.active()
+                and (kind is None or job.kind == kind) and (abbrName is None or job.abbrName == abbrName)]
+
+    # Jobs that finished since the last call, each returned once
+    def collectFinished(self) -> list[Job]:
+        finished = [job for job in self.jobs.values() if not job.active() and not job.announced]
+        for job in finished:
+            job.announced = True
+        return finished
+
+    # Cancels every job and waits for the running ones to stop (and checkpoint)
+    def shutdown(self) -> None:
+        for job in self.active():
+            job.cancel()
+        if self.pool is not None: self.pool.shutdown(wait = True)
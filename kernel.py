@@ -0,0 +1,104 @@
+# Compact integer representation of a conference season for simulation hot paths.
+# Teams are integer indices, games are parallel (home, away) index lists, and a full
+# season outcome is a single int bitmask: bit g is set if the home team won game g.
+
+from model import *
+
+class SeasonKernel:
+    def __init__(self, conference: Conference | Scenario) -> None:
+        self.conference = conference
+        self.teams: list[Team] = list(conference.teams)
+        self.teamIndex = {team: i for i, team in enumerate(self.teams)}
+        self.nTeams = len(self.teams)
+
+        self.games: list[Game] = list(conference.games)
+        self.gameIndex = {game: g for g, game in enumerate(self.games)}
+        self.nGames = len(self.games)
+        self.allMask = (1 << self.nGames) - 1
+        self.home = [self.teamIndex[g.home] for g in self.games]
+        self.away = [self.teamIndex[g.away] for g in self.games]
+        self.nonConfWins = [t.nonConfWins for t in self.teams]
+
+        # Per-team game lists and head-to-head lookup; opponent bitsets are maintained by the conference
+        self.teamGames: list[list[int]] = [[] for _ in range(self.nTeams)]
+        self.opponentMask = [t.opponentMask for t in self.teams]
+        self.pairGames: dict[tuple[int, int], list[int]] = {}
+        for g in range(self.nGames):
+            h, a = self.home[g], self.away[g]
+            self.teamGames[h].append(g)
+            self.teamGames[a].append(g)
+            self.pairGames.setdefault((min(h, a), max(h, a)), []).append(g)
+        self.gameCounts = [len(games) for games in self.teamGames]
+
+        self.setPlayed()
+
+    def __repr__(self) -> str:
+        return f"<{self.conference.abbrName}: SeasonKernel ({self.nTeams} teams, {len(self.unplayed)} unplayed)>"
+
+    # (Re)reads completed games from the conference (or scenario)
+    # Sets the unplayed game list, the played outcome and mask bits, win totals from completed games,
+    # and home win probabilities
+    def setPlayed(self) -> None:
+        self.unplayed: list[int] = []
+        self.playedOutcome = 0
+        self.playedMask = 0
+        self.baseWins = [0] * self.nTeams
+        for g, game in enumerate(self.games):
+            winner = self.conference.getWinner(game)
+            if winner is None:
+                self.unplayed.append(g)
+            else:
+                w = self.teamIndex[winner]
+                self.playedMask |= 1 << g
+                self.baseWins[w] += 1
+                if w == self.home[g]: self.playedOutcome |= 1 << g
+        self.nUnplayed = len(self.unplayed)
+        self.probabilities = [self.conference.getProbability(game) for game in self.games] # Home win probability
+
+    # === OUTCOMES ===
+
+    # Expands a k-bit outcome over the unplayed games (bit j -> unplayed[j]) into a full season outcome
+    def expandOutcome(self, bits: int) -> int:
+        outcome = self.playedOutcome
+        for j, g in enumerate(self.unplayed):
+            if bits >> j & 1: outcome |= 1 << g
+        return outcome
+
+    def winner(self, outcome: int, g: int) -> int:
+        return self.home[g] if outcome >> g & 1 else self.away[g]
+
+    def loser(self, outcome: int, g: int) -> int:
+        return self.away[g] if outcome >> g & 1 else self.home[g]
+
+    # Conference wins per team for a full season outcome
+    def winTotals(self, outcome: int) -> list[int]:
+        wins = self.baseWins.copy()
+        home, away = self.home, self.away
+        for g in self.unplayed:
+            wins[home[g] if outcome >> g & 1 else away[g]] += 1
+        return wins
+
+    # === LOOKUPS ===
+
+    def gamesBetween(self, a: int, b: int) -> list[int]:
+        return self.pairGames.get((min(a, b), max(a, b)), [])
+
+    # Games played between any two teams of the group
+    def commonGames(self, teams: list[int]) -> list[int]:
+        games = []
+        for i, a in enumerate(teams):
+            for b in teams[i+1:]:
+                games.extend(self.gamesBetween(a, b))
+        return games
+
+    # Opponents played by every team of the group, excluding the group itself
+    def commonOpponents(self, teams: list[int]) -> list[int]:
+        mask = (1 << self.nTeams) - 1
+        for t in teams:
+            mask &= self.opponentMask[t]
+        for t in teams:
+            mask &= ~(1 << t)
+        return [o for o in range(self.nTeams) if mask >> o & 1]
+
+    def teamNames(self, teams: list[int]) -> list[str]:
+        return [self.teams[t].name for t in teams]
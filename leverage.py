@@ -0,0 +1,112 @@
+# Game leverage: how much the result of each unplayed game moves every team's title game odds.
+# Tallied in the same pass as a fullmap or simulate run, from the same outcomes: for every unplayed game, the
+# weight of the outcomes where the home team won and each team's title game shares among them. Together with
+# the run's totals that gives every team's odds conditional on either result of every game, instead of
+# rerunning everything twice per game. A subtree collapsed by fullmap's pruning counts toward both results of
+# a game it leaves free, split p : 1 - p.
+
+import numpy as np
+from kernel import SeasonKernel
+from results import CONFIDENCE_Z, runSignature
+
+# Identifies the season state a leverage tally holds for (whichever run tallied it)
+def leverageSignature(kernel: SeasonKernel) -> str:
+    return runSignature(kernel, "leverage", {})
+
+class GameLeverage:
+    def __init__(self, kernel: SeasonKernel) -> None:
+        self.games = list(kernel.unplayed)
+        self.nTeams = kernel.nTeams
+        self.probabilities = np.array([kernel.probabilities[g] for g in kernel.unplayed], dtype = np.float64)
+        self.sampled = False # sampled runs get confidence intervals, see margins()
+
+        self.homeCounts = np.zeros((len(self.games), self.nTeams)) # title game shares when the home team won
+        self.homeWeights = np.zeros(len(self.games)) # weight of outcomes where the home team won
+        self.counts = np.zeros(self.nTeams)
+        self.total = 0.0
+
+    def __repr__(self) -> str:
+        return f"<GameLeverage ({len(self.games)} games, {self.total:g} outcomes)>"
+
+    # Adds sampled outcomes: a (rows x unplayed games) 0/1 outcome matrix and each row's title game shares (rows x teams)
+    def addRows(self, outcomes: np.ndarray, shares: np.ndarray) -> None:
+        self.sampled = True
+        home = outcomes.astype(np.float64)
+        self.homeCounts += home.T @ shares
+        self.homeWeights += home.sum(axis = 0)
+        self.counts += shares.sum(axis = 0)
+        self.total += len(outcomes)
+
+    # Adds tallies made directly (one fullmap prefix, see enumeration.OutcomeMapper.tallyPrefix()): per unplayed game,
+    # the title game shares (games x teams) and weight of outcomes where the home team won, plus the totals
+    def addCounts(self, homeCounts: np.ndarray, homeWeights: np.ndarray, counts: np.ndarray, total: float) -> None:
+        self.homeCounts += homeCounts
+        self.homeWeights += homeWeights
+        self.counts += counts
+        self.total += total
+
+    def merge(self, other: 'GameLeverage') -> None:
+        self.sampled = self.sampled or other.sampled
+        self.homeCounts += other.homeCounts
+        self.homeWeights += other.homeWeights
+        self.counts += other.counts
+        self.total += other.total
+
+    # Title game odds of every team given each result of every game: (home wins, away wins), each (games x teams)
+    # A result with no weight (probability zero, or never sampled) gives NaN
+    def odds(self) -> tuple[np.ndarray, np.ndarray]:
+        awayWeights = self.total - self.homeWeights
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            home = self.homeCounts / self.homeWeights[:, None]
+            away = (self.counts - self.homeCounts) / awayWeights[:, None]
+        home[self.homeWeights <= 0] = np.nan
+        away[awayWeights <= 0] = np.nan
+        return (home, away)
+
+    # Confidence interval half-widths of each team's swing (home wins odds - away wins odds) per game, for sampled runs
+    # Binomial over the outcomes sampled with each result; zero for exhaustive runs
+    def margins(self, z: float = CONFIDENCE_Z) -> np.ndarray:
+        if not self.sampled: return np.zeros((len(self.games), self.nTeams))
+        home, away = self.odds()
+        homeN, awayN = self.homeWeights[:, None], (self.total - self.homeWeights)[:, None]
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            variance = home * (1 - home) / homeN + away * (1 - away) / awayN
+        return z * np.sqrt(np.nan_to_num(variance, nan = np.inf))
+
+    # Games by leverage, largest first: the biggest swing a result of the game makes in any team's odds
+    # Returns a list of {game, home, away, probability, swing, margin, team, odds: [{team, home, away, margin}]},
+    # odds being the teams' odds if the home or away team wins, biggest swing first
+    def report(self, kernel: SeasonKernel) -> list[dict]:
+        home, away = self.odds()
+        swings = np.nan_to_num(np.abs(home - away))
+        margins = self.margins()
+        entries = []
+        for j, g in enumerate(self.games):
+            teams = sorted(range(self.nTeams), key = lambda t: swings[j, t], reverse = True)
+            # Only teams the game moves; a result that can't happen (probability 0 or 1) moves no one
+            odds = [{'team': kernel.teams[t].name, 'home': float(home[j, t]), 'away': float(away[j, t]),
+                     'margin': float(margins[j, t])} for t in teams if swings[j, t] > 0]
+            entries.append({'game': str(kernel.games[g]),
+                            'home': kernel.teams[kernel.home[g]].name,
+                            'away': kernel.teams[kernel.away[g]].name,
+                            'probability': float(self.probabilities[j]),
+                            'swing': abs(odds[0]['home'] - odds[0]['away']) if odds else 0.0,
+                            'margin': odds[0]['margin'] if odds else 0.0,
+                            'team': odds[0]['team'] if odds else None,
+                            'odds': odds})
+        return sorted(entries, key = lambda entry: entry['swing'], reverse = True)
+
+    def toDict(self) -> dict:
+        return {'sampled': self.sampled,
+                'homeCounts': self.homeCounts.tolist(),
+                'homeWeights': self.homeWeights.tolist(),
+                'counts': self.counts.tolist(),
+                'total': self.total}
+
+    # Restores tallies saved with toDict() (in a checkpoint) into a leverage built for the same kernel
+    def loadDict(self, d: dict) -> None:
+        self.sampled = d['sampled']
+        self.homeCounts = np.array(d['homeCounts'], dtype = np.float64).reshape(len(self.games), self.nTeams)
+        self.homeWeights = np.array(d['homeWeights'], dtype = np.float64)
+        self.counts = np.array(d['counts'], dtype = np.float64)
+        self.total = d['total']
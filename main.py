@@ -1,5 +1,5 @@
 import shlex
-from datetime import datetime
+from datetime import datetime, timedelta
 import DataController
 
 # === CONSTANTS ===
@@ -18,6 +18,22 @@ SHORTDESC = {
         'update': 'update [conference]: Load/update latest conference standings from online.',
         'save': 'save [conference]: Save conference standings to disk.',
         'load': 'load [conference]: Load conference standings from disk.',
+        'exportjson': 'exportjson [conference]: Export conference standings to JSON.',
+        'importjson': 'importjson [conference]: Import conference standings from JSON.',
+        'standings': 'standings: Show the focused conference\'s current standings.',
+        'setgame': 'setgame [team] [team] [winner]: Set a game result for the focused conference\'s what-if scenario.',
+        'setodds': 'setodds [team] [team] [probability]: Set the probability that a team wins a game in the what-if scenario.',
+        'rate': 'rate [team] [rating]: Set a team\'s rating, used for the odds of games without set odds.',
+        'fullmap': 'fullmap [processes]: Enumerate every outcome of the focused conference\'s remaining games, in the background.',
+        'simulate': 'simulate [sims] [chunk] [margin]: Simulate the focused conference\'s remaining games, in the background.',
+        'exact': 'exact [samples]: Compute exact odds for the focused conference, sampling only to break ties.',
+        'store': 'store [on|off]: Record per-outcome results of simulate/fullmap runs for whatif queries.',
+        'whatif': 'whatif [winner] [loser] ...: Show title game odds given game results, from the last recorded run.',
+        'leverage': 'leverage [games]: Show which remaining games move title game odds most, from the last simulate/fullmap run.',
+        'clinch': 'clinch [team]: Show whether a team has clinched a title game spot or been eliminated, and what clinches it.',
+        'jobs': 'jobs [job]: Show background simulate/fullmap jobs, or one job\'s progress and odds so far.',
+        'cancel': 'cancel [job]: Stop a background job, keeping its progress to resume from.',
+        'stats': 'stats [on|off|reset|export] [filename]: Show or control tiebreaker and simulation statistics.',
         'quit': 'quit: Quit program.'
             }
 LONGDESC = {
@@ -39,10 +55,87 @@ COMMANDS:
 'load':
     """Arguments:
   - [conference = *]: Name of conference to load. If *, load all conferences on disk.""",
+'standings': "Teams tied after all tiebreakers are marked T-.",
+'setgame':
+    """Arguments:
+  - [team]: Name of one team in the game. Use quotes for names with spaces.
+  - [team]: Name of the other team in the game.
+  - [winner = none]: Name of the winning team. If none, the game is treated as unplayed.
+Results are kept in a what-if scenario; the loaded conference is not changed. Refocus to discard.""",
+'fullmap':
+    """Arguments:
+  - [processes = all cores]: Number of processes to split the enumeration across.
+Runs as a background job (see jobs); its odds are shown at the prompt once it finishes.""",
+'exportjson':
+    """Arguments:
+  - [conference = *]: Name of conference to export. If *, export all conferences in memory.""",
+'importjson':
+    """Arguments:
+  - [conference = *]: Name of conference to import. If *, import all conferences with a JSON file on disk.""",
+'simulate':
+    """Arguments:
+  - [sims = 100000]: Maximum number of random outcomes of the remaining games to simulate.
+  - [chunk = 10000]: Number of outcomes simulated at once. Lower to reduce memory use.
+  - [margin = 0.005]: Stop once every team's odds are within +/- margin at 95% confidence. If 0, always simulate [sims].
+Games are drawn with their odds from setodds or team ratings, or as coin flips.
+Runs as a background job (see jobs); its odds are shown at the prompt once it finishes.""",
+'exact':
+    """Arguments:
+  - [samples = 20000]: Number of tied outcomes to sample and run through the tiebreakers.
+Odds are computed from the exact distribution of final records, without enumerating every outcome. Only how a
+tie at the title game cut is broken is estimated, from sampled outcomes that end in that tie.""",
+'setodds':
+    """Arguments:
+  - [team]: Name of one team in the game. Use quotes for names with spaces.
+  - [team]: Name of the other team in the game.
+  - [probability = none]: Probability from 0 to 1 that the first team wins. If none, odds come from ratings again.
+Odds are kept in the what-if scenario, like setgame. They weight both simulate and fullmap.""",
+'rate':
+    """Arguments:
+  - [team]: Name of the team. Use quotes for names with spaces.
+  - [rating = none]: Elo-style rating; 400 points is 10:1 odds, and the home team gets a small bonus. If none, clears it.
+Ratings are saved alongside the conference. A game uses ratings when both of its teams have one.""",
+'store':
+    """Arguments:
+  - [setting = show]: on to record the outcomes of every later simulate/fullmap run, off to stop.
+Recorded outcomes are saved under results/ and answer whatif queries until the conference or its odds change.""",
+'whatif':
+    """Arguments:
+  - [winner] [loser]: Result of an unplayed game; repeat for more games. Use quotes for names with spaces.
+Odds are read from the outcomes recorded by the last simulate/fullmap run with store on, without rerunning it.
+Without results, shows that run's odds.""",
+'leverage':
+    """Arguments:
+  - [games = 10]: Number of games to show, most decisive first. If *, show every remaining game.
+A game's swing is the biggest difference its result makes to any team's odds; that team's odds are shown both ways.
+Tallied during every simulate/fullmap run (within the shown margin for simulate), until the conference or its odds change.""",
+'clinch':
+    f"""Arguments:
+  - [team]: Name of the team. Use quotes for names with spaces.
+Clinched and eliminated are proven over every outcome of the remaining games, tiebreakers included. Otherwise lists
+the {DataController.scenarios.MAX_SCENARIOS} most likely sets of results found that each clinch a spot whatever else happens, with their chance from the game odds.
+Games set with setgame count as played. The search is cut off after a few seconds.""",
+'jobs':
+    """Arguments:
+  - [job = all]: Number of a job to show with its title game odds so far. If none, lists every job.
+Jobs show their progress, throughput (outcomes per second) and estimated time left. Runs started while another run is
+going on the same conference are refused, since they would share its outcome store and checkpoints.""",
+'cancel':
+    """Arguments:
+  - [job = *]: Number of the job to stop. If *, stops every queued or running job.
+A stopped run is checkpointed: running it again on the same conference as it stands resumes where it stopped.
+Quitting stops every job the same way.""",
+'stats':
+    """Arguments:
+  - [action = show]: on/off to start/stop recording rule statistics, reset to clear them, export to write them as JSON.
+  - [filename = stats.json]: File to export to.
+Rule statistics are recorded by tiebreakers created while on, in this process only (fullmap workers are not included).
+Simulation runs are always recorded.""",
 'quit': ""
            }
 
-SIMULATION_COMPLETE = "Simulation complete"
+def SIMULATED(num: int, margin: float) -> str:
+    return f"Simulated {num:,.0f} outcomes (odds within +/-{margin:.2%} at 95% confidence)"
 
 def UNRECOGNIZED_COMMAND(command: str) -> str:
     return f"Unrecognized command: {command}"
@@ -67,12 +160,25 @@ def UNLOADED_CONFERENCE(conf: str) -> str:
 def NO_CONFERENCE_FILE(conf: str) -> str:
     return f"Conference not saved on disk: {conf}"
            
-def UPDATED_CONFERENCE(conf: str) -> str:
-    return f"Updated conference: {conf}"
+def UPDATED_CONFERENCE(conf: str, update: 'DataController.StandingsUpdate' = None) -> str:
+    returnStr = f"Updated conference: {conf}"
+    if update is None: return returnStr
+    changes = [f"{len(games)} {label}" for games, label in
+               ((update.completed, "completed"), (update.corrected, "corrected"), (update.added, "new")) if games]
+    returnStr += f" ({', '.join(changes) if changes else 'no changes'})"
+    for game in update.completed + update.corrected:
+        returnStr += f"\n  {game} ({game.winner if game.winner is not None else 'unplayed'})"
+    return returnStr
+
+def UPDATE_FAILED(conf: str, error: Exception) -> str:
+    return f"Failed to update conference: {conf} ({error})"
 
 def SAVED_CONFERENCE(conf: str) -> str:
     return f"Saved conference: {conf}"
 
+def EXPORTED_CONFERENCE(conf: str) -> str:
+    return f"Exported conference to JSON: {conf}"
+
 def LOADED_CONFERENCE(conf: str, update: int = None) -> str:
     returnStr = f"Successfuly loaded conference: {conf}"
     if update is not None: 
@@ -82,12 +188,171 @@ def LOADED_CONFERENCE(conf: str, update: int = None) -> str:
 def FOCUSED_CONFERENCE(conf: str) -> str:
     return f"Focused conference: {conf}"
 
-def OUTCOMES_TO_SIMULATE(num: int) -> str:
-    return f"Outcomes to simulate: {num}\n" + \
-        "Continue? (y/n)"
+def NO_FOCUSED_CONFERENCE() -> str:
+    return "No conference focused. Use 'focus [conference]' first."
+
+def TITLE_GAME_ODDS(odds: dict[str, float]) -> str:
+    return "\n".join([f"  {name:<24}{odds[name]:>8.2%}" for name in odds])
+
+def STANDINGS(standings: list[list[tuple[str, int, int]]]) -> str:
+    lines = []
+    place = 1
+    for group in standings:
+        for name, wins, losses in group:
+            rank = f"{'T-' if len(group) > 1 else ''}{place}."
+            lines.append(f"  {rank:>6} {name:<24}{wins}-{losses}")
+        place += len(group)
+    return "\n".join(lines)
+
+def GAME_NOT_FOUND(team1: str, team2: str) -> str:
+    return f"No conference game between {team1} and {team2}"
+
+def SET_GAME(game: str, winner: str = None) -> str:
+    return f"Set game: {game} ({winner if winner is not None else 'unplayed'})"
+
+def OUTCOMES_TO_SIMULATE(num: int, seconds: float = None) -> str:
+    returnStr = f"Outcomes to simulate: {num}\n"
+    if seconds is not None:
+        returnStr += f"Estimated time: {formatDuration(seconds)}\n"
+    return returnStr + "Continue? (y/n)"
+        
+def STATS(stats: dict) -> str:
+    lines = [f"Rule statistics: {'on' if stats['enabled'] else 'off'}"]
+    for chain, label in (('two', "Two-team"), ('multi', "Multi-team")):
+        if not stats['rules'][chain]: continue
+        lines.append(f"{label + ' rules:':<36}{'calls':>10}{'time':>12}{'separated':>12}")
+        for name, rule in stats['rules'][chain].items():
+            lines.append(f"  {name:<34}{rule['calls']:>10}{rule['seconds']:>11.3f}s{rule['separationRate']:>12.1%}")
+    if stats['tieSizes']:
+        lines.append("Tied group sizes:")
+        lines.extend(f"  {size:>3} teams: {count}" for size, count in stats['tieSizes'].items())
+    if stats['runs']:
+        lines.append("Runs:")
+        for run in stats['runs']:
+            if 'outcomes' in run:
+                line = f"  {run['kind']} {run['conference']}: {run['outcomes']} outcomes in {run['seconds']:.2f}s ({run['perSecond']:,.0f}/s)"
+            else:
+                line = f"  {run['kind']} {run['conference']}: {run['seconds']:.2f}s"
+                if 'evaluated' in run: line += f" ({run['evaluated']:,} search nodes)"
+            if 'cache' in run: line += f", tiebreak cache hit rate {run['cache']['hitRate']:.1%}"
+            lines.append(line)
+    return "\n".join(lines)
+
+def EXACT_COMPLETE(tiedMass: float, margin: float) -> str:
+    return f"Exact odds complete ({tiedMass:.2%} of outcomes tied at the cut; tiebreaks within +/-{margin:.2%} at 95% confidence)"
+
+def SET_ODDS(game: str, team: str, probability: float | None) -> str:
+    if probability is None: return f"Cleared odds: {game}"
+    return f"Set odds: {game} ({team} {probability:.1%})"
+
+def SET_RATING(team: str, rating: float | None) -> str:
+    if rating is None: return f"Cleared rating: {team}"
+    return f"Set rating: {team} ({rating:g})"
+
+def CLINCH_STATUS(team: str, status: str, scenarios: list[tuple[list[tuple[str, str]], float]], complete: bool) -> str:
+    if status == "unknown": return f"{team}: undetermined (search cut off)"
+    lines = [f"{team}: {status}"]
+    if status == "alive":
+        if scenarios: lines.append("Clinches with any of (most likely first):")
+        elif complete: lines.append("No set of results clinches a spot outright")
+        else: lines.append("No clinching set of results found")
+        for results, probability in scenarios:
+            chance = f"{probability:.2%}" if probability >= 0.0001 else f"1 in {1 / probability:,.0f}" # ex: 1 in 2,097,152
+            lines.append(f"  {chance:>14}  ({len(results)} result{"s" if len(results) > 1 else ""}) " + ", ".join(f"{winner} over {loser}" for winner, loser in results))
+        if not complete: lines.append("(search cut off; other or more likely scenarios may exist)")
+    return "\n".join(lines)
+
+def STORE_SETTING(on: bool) -> str:
+    return f"Recording outcomes: {'on' if on else 'off'}"
+
+def NO_OUTCOME_STORE() -> str:
+    return "No recorded outcomes for the focused conference as it stands. Use 'store on', then simulate or fullmap."
+
+def GAME_ALREADY_PLAYED(game: str) -> str:
+    return f"Game already played: {game}"
+
+def WHAT_IF(results: list[tuple[str, str]], probability: float, outcomes: int, margin: float = None) -> str:
+    given = ", ".join(f"{winner} over {loser}" for winner, loser in results) or "nothing"
+    returnStr = f"Given {given} ({probability:.2%} of outcomes, {outcomes} recorded"
+    if margin is not None: returnStr += f", odds within +/-{margin:.2%} at 95% confidence"
+    return returnStr + ")"
+
+def NO_LEVERAGE() -> str:
+    return "No game leverage for the focused conference as it stands. Run simulate or fullmap first."
+
+def LEVERAGE(report: list[dict]) -> str:
+    lines = [f"  {'Game':<38}{'swing':>8}"]
+    for entry in report:
+        swing = f"{entry['swing']:>8.2%}" + (f" +/-{entry['margin']:.2%}" if entry['margin'] else "")
+        lines.append(f"  {entry['game']:<38}{swing}")
+        if entry['odds']:
+            odds = entry['odds'][0]
+            lines.append(f"    {odds['team']}: {odds['home']:.2%} if {entry['home']} wins, "
+                         f"{odds['away']:.2%} if {entry['away']} wins")
+    return "\n".join(lines)
+
+def JOB_STARTED(job: 'DataController.jobs.Job') -> str:
+    return f"Started job {job.id}: {job.kind} {job.abbrName} ('jobs {job.id}' for progress, 'cancel {job.id}' to stop)"
+
+def JOB_ALREADY_ACTIVE(abbrName: str) -> str:
+    return f"A job is already running on {abbrName}. Use 'jobs' to follow it or 'cancel' to stop it."
+
+def JOB_NOT_FOUND(job: str) -> str:
+    return f"Job not found: {job}"
+
+def NO_JOBS() -> str:
+    return "No jobs. Start one with simulate or fullmap."
+
+def JOB_LINE(job: 'DataController.jobs.Job') -> str:
+    line = f"  {job.id:>3}  {job.kind:<10}{job.abbrName:<6}{job.state:<11}{job.fraction:>7.1%}  {formatDuration(job.elapsed())}"
+    if job.state == "running":
+        throughput, eta = job.throughput(), job.eta()
+        if throughput is not None: line += f"  {throughput:,.0f}/s"
+        if eta is not None: line += f"  ETA {formatDuration(eta)}"
+    return line
+
+def JOBS(jobList: list['DataController.jobs.Job']) -> str:
+    return "\n".join([f"  {'job':>3}  {'kind':<10}{'conf':<6}{'state':<11}{'done':>7}  elapsed"] + [JOB_LINE(job) for job in jobList])
+
+def JOB_STATUS(job: 'DataController.jobs.Job', odds: dict[str, float] | None) -> str:
+    lines = [JOBS([job])]
+    results = job.results
+    if job.state == "failed": lines.append(job.error.rstrip())
+    elif results is None: lines.append("No results yet")
+    else:
+        returnStr = f"{'Odds' if job.state == 'done' else 'Odds so far'} ({results.total:,.0f} outcomes"
+        if results.margins: returnStr += f", within +/-{max(results.margins):.2%} at 95% confidence"
+        lines.append(returnStr + ")")
+        lines.append(TITLE_GAME_ODDS(odds))
+    return "\n".join(lines)
+
+def JOB_FINISHED(job: 'DataController.jobs.Job') -> str:
+    header = f"Job {job.id} {job.state}: {job.kind} {job.abbrName} after {formatDuration(job.elapsed())}"
+    if job.state == "failed": return f"{header}\n{job.error.rstrip()}"
+    if job.state == "cancelled": return f"{header}, at {job.fraction:.1%} (checkpointed; run it again to resume)"
+    lines = [header]
+    if job.kind == "simulate": lines.append(SIMULATED(job.results.total, max(job.results.margins)))
+    lines.append(TITLE_GAME_ODDS(job.odds))
+    return "\n".join(lines)
+
+def CANCELLING_JOB(job: 'DataController.jobs.Job') -> str:
+    return f"Stopping job {job.id}: {job.kind} {job.abbrName} (at its next progress report)"
+
+def STOPPING_JOBS(count: int) -> str:
+    return f"Stopping {count} background job{'s' if count != 1 else ''} (progress is checkpointed)..."
+
+def TEAM_NOT_FOUND(team: str) -> str:
+    return f"Team not found: {team}"
+
+def EXPORTED_STATS(filename: str) -> str:
+    return f"Exported statistics to: {filename}"
         
 # === HELPERS ===
 
+def formatDuration(seconds: float) -> str:
+    if seconds >= 31536000: return f"{seconds / 31536000:.2f} years"
+    return str(timedelta(seconds = round(seconds)))
+
 def checkCommandValid(args: list[str]) -> tuple[bool, str]:
     command = args[0] if args else ''
     if command not in SHORTDESC.keys():
@@ -121,9 +386,11 @@ def help(*args: str):
 def update(*args: str, log: bool = True):
     default, confNames = processConferenceArgs(args, log = log)
     
+    conferences, errors = DataController.conferencesFromAPI(confNames)
     for cn in confNames:
-        DataController.conferenceFromAPI(cn)
-        if log: print(UPDATED_CONFERENCE(cn))
+        if cn in errors:
+            print(UPDATE_FAILED(cn, errors[cn]))
+        elif log: print(UPDATED_CONFERENCE(cn, DataController.standingsUpdates.get(cn)))
 
     if default: save(log = False)
     else: save(*confNames, log = False)
@@ -133,13 +400,36 @@ def save(*args: str, log: bool = True):
     
     for cn in confNames:
         conference = DataController.getConference(cn)
-        if cn is None: 
+        if conference is None: 
             if not default and log:
                 print(UNLOADED_CONFERENCE(cn))
         else:
             DataController.conferenceToFile(conference)
             if log: print(SAVED_CONFERENCE(cn))
     
+def exportjson(*args: str, log: bool = True):
+    default, confNames = processConferenceArgs(args)
+    
+    for cn in confNames:
+        conference = DataController.getConference(cn)
+        if conference is None: 
+            if not default and log:
+                print(UNLOADED_CONFERENCE(cn))
+        else:
+            DataController.conferenceToJSON(conference)
+            if log: print(EXPORTED_CONFERENCE(cn))
+
+def importjson(*args: str, log: bool = True):
+    default, confNames = processConferenceArgs(args)
+    
+    for cn in confNames:
+        conference = DataController.conferenceFromJSON(cn)
+        if conference is None:
+            if not default and log:
+                print(NO_CONFERENCE_FILE(cn))
+        else:
+            if log: print(LOADED_CONFERENCE(cn, conference.update))
+    
 def load(*args: str, log: bool = True):
     default, confNames = processConferenceArgs(args)
     
@@ -162,23 +452,56 @@ def focus(*args: str, log: bool = True):
         if conf is None:
             if log: print(UNLOADED_CONFERENCE(abbrName))
         else:
-            DataController.focusedConference = conf
+            DataController.focusConference(conf)
             if log: print(FOCUSED_CONFERENCE(abbrName))
             
+def standings(*args: str, log: bool = True):
+    if DataController.focusedConference is None:
+        print(NO_FOCUSED_CONFERENCE())
+        return
+    
+    print(STANDINGS(DataController.getStandings()))
+
 def setgame(*args: str, log: bool = True):
-    pass
+    if len(args) < 2:
+        print(BAD_ARGUMENT(" ".join(args)))
+        return
+    winner = args[2] if len(args) > 2 else None
+    if winner is not None and winner not in args[:2]:
+        print(BAD_ARGUMENT(winner))
+        return
+    
+    if DataController.focusedConference is None:
+        print(NO_FOCUSED_CONFERENCE())
+        return
+    
+    game = DataController.setGame(args[0], args[1], winner)
+    if game is None: print(GAME_NOT_FOUND(args[0], args[1]))
+    elif log: print(SET_GAME(str(game), winner))
 
-# Development paused until setgame complete, see: DataController.fullMapStandings()
 def fullmap(*args: str, log: bool = True):
+    processes = None
+    if args:
+        try:
+            processes = int(args[0])
+        except:
+            print(BAD_ARGUMENT(args[0]))
+            return
+    
+    if DataController.focusedConference is None:
+        print(NO_FOCUSED_CONFERENCE())
+        return
+    
     numGamesRemaining = len(DataController.focusedConference.getUnplayedGames())
     possibleOutcomes = 2 ** numGamesRemaining
     
-    print(OUTCOMES_TO_SIMULATE(possibleOutcomes))
+    print(OUTCOMES_TO_SIMULATE(possibleOutcomes, DataController.fullMapEstimate(processes)))
     cont = input(INPUT_CURSOR)
-    if cont[0].lower() == 'n': return
+    if not cont or cont[0].lower() != 'y': return
     
-    DataController.fullMapStandings()
-    if log: print(SIMULATION_COMPLETE)
+    job = DataController.startJob("fullmap", processes = processes)
+    if job is None: print(JOB_ALREADY_ACTIVE(DataController.focusedConference.abbrName))
+    elif log: print(JOB_STARTED(job))
 
 def simulate(*args: str, log: bool = True):
     if args:
@@ -190,9 +513,224 @@ def simulate(*args: str, log: bool = True):
     else:
         numSims = 100000
     
+    chunkSize = DataController.simulation.DEFAULT_CHUNK_SIZE
+    if len(args) > 1:
+        try:
+            chunkSize = int(args[1])
+        except:
+            print(BAD_ARGUMENT(args[1]))
+            return
+    
+    margin = DataController.simulation.DEFAULT_MARGIN
+    if len(args) > 2:
+        try:
+            margin = float(args[2])
+        except:
+            print(BAD_ARGUMENT(args[2]))
+            return
+    
+    if DataController.focusedConference is None:
+        print(NO_FOCUSED_CONFERENCE())
+        return
+    
+    job = DataController.startJob("simulate", numSims = numSims, chunkSize = chunkSize, margin = margin)
+    if job is None: print(JOB_ALREADY_ACTIVE(DataController.focusedConference.abbrName))
+    elif log: print(JOB_STARTED(job))
+
+def exact(*args: str, log: bool = True):
+    tieSamples = DataController.distribution.DEFAULT_TIE_SAMPLES
+    if args:
+        try:
+            tieSamples = int(args[0])
+        except:
+            print(BAD_ARGUMENT(args[0]))
+            return
+    
+    if DataController.focusedConference is None:
+        print(NO_FOCUSED_CONFERENCE())
+        return
+    
+    odds, tiedMass = DataController.exactStandings(tieSamples)
+    if log:
+        results = DataController.standingsResults[DataController.focusedConference.abbrName]
+        print(EXACT_COMPLETE(tiedMass, max(results.margins, default = 0.0)))
+        print(TITLE_GAME_ODDS(odds))
+
+def setodds(*args: str, log: bool = True):
+    if len(args) < 2:
+        print(BAD_ARGUMENT(" ".join(args)))
+        return
+    
+    probability = None
+    if len(args) > 2 and args[2].lower() != 'none':
+        try:
+            probability = float(args[2])
+            if not 0 <= probability <= 1: raise ValueError
+        except:
+            print(BAD_ARGUMENT(args[2]))
+            return
+    
+    if DataController.focusedConference is None:
+        print(NO_FOCUSED_CONFERENCE())
+        return
+    
+    game = DataController.setOdds(args[0], args[1], probability)
+    if game is None: print(GAME_NOT_FOUND(args[0], args[1]))
+    elif log: print(SET_ODDS(str(game), args[0], probability))
+
+def rate(*args: str, log: bool = True):
+    if not args:
+        print(BAD_ARGUMENT(""))
+        return
+    
+    rating = None
+    if len(args) > 1 and args[1].lower() != 'none':
+        try:
+            rating = float(args[1])
+        except:
+            print(BAD_ARGUMENT(args[1]))
+            return
+    
+    if DataController.focusedConference is None:
+        print(NO_FOCUSED_CONFERENCE())
+        return
+    
+    team = DataController.setRating(args[0], rating)
+    if team is None: print(TEAM_NOT_FOUND(args[0]))
+    elif log: print(SET_RATING(team.name, rating))
+    
+def store(*args: str, log: bool = True):
+    if args:
+        if args[0].lower() not in ('on', 'off'):
+            print(BAD_ARGUMENT(args[0]))
+            return
+        DataController.recordOutcomes = args[0].lower() == 'on'
+    if log: print(STORE_SETTING(DataController.recordOutcomes))
+
+def whatif(*args: str, log: bool = True):
+    if len(args) % 2:
+        print(BAD_ARGUMENT(args[-1]))
+        return
+    
+    if DataController.focusedConference is None:
+        print(NO_FOCUSED_CONFERENCE())
+        return
+    
+    conference = DataController.focusedConference
+    fixed = {}
+    for winnerName, loserName in zip(args[::2], args[1::2]):
+        winner, loser = conference.getTeamByName(winnerName), conference.getTeamByName(loserName)
+        game = winner.getGameByOpponent(loser) if winner is not None and loser is not None else None
+        if game is None:
+            print(GAME_NOT_FOUND(winnerName, loserName))
+            return
+        if conference.getWinner(game) is not None:
+            print(GAME_ALREADY_PLAYED(str(game)))
+            return
+        fixed[game] = winner
+    
+    whatIf = DataController.whatIfStandings(fixed)
+    if whatIf is None:
+        print(NO_OUTCOME_STORE())
+        return
+    odds, results = whatIf
+    if log:
+        store = DataController.outcomeStores[conference.abbrName]
+        margin = max(results.margins) if results.margins else None
+        print(WHAT_IF(list(zip(args[::2], args[1::2])), results.total / store.weights.sum(), len(store), margin))
+        print(TITLE_GAME_ODDS(odds))
+
+def leverage(*args: str, log: bool = True):
+    count = 10
+    if args and args[0] != '*':
+        try:
+            count = int(args[0])
+        except:
+            print(BAD_ARGUMENT(args[0]))
+            return
+    elif args: count = None
+    
+    if DataController.focusedConference is None:
+        print(NO_FOCUSED_CONFERENCE())
+        return
+    
+    report = DataController.leverageReport()
+    if report is None: print(NO_LEVERAGE())
+    elif log: print(LEVERAGE(report[:count]))
+
+def clinch(*args: str, log: bool = True):
+    if not args:
+        print(BAD_ARGUMENT(""))
+        return
+    
+    if DataController.focusedConference is None:
+        print(NO_FOCUSED_CONFERENCE())
+        return
+    
+    clinchStatus = DataController.clinchScenarios(args[0])
+    if clinchStatus is None: print(TEAM_NOT_FOUND(args[0]))
+    elif log: print(CLINCH_STATUS(args[0], *clinchStatus))
+    
+def jobs(*args: str, log: bool = True):
+    backgroundJobs = DataController.backgroundJobs
+    if not args:
+        if backgroundJobs is None or not backgroundJobs.jobs: print(NO_JOBS())
+        elif log: print(JOBS(list(backgroundJobs.jobs.values())))
+        return
+    
+    try:
+        id = int(args[0])
+    except:
+        print(BAD_ARGUMENT(args[0]))
+        return
+    job = backgroundJobs.get(id) if backgroundJobs is not None else None
+    if job is None: print(JOB_NOT_FOUND(args[0]))
+    elif log:
+        conference = DataController.getConference(job.abbrName)
+        odds = job.odds
+        if odds is None and job.results is not None and conference is not None:
+            odds = DataController.namedOdds(job.results, conference)
+        print(JOB_STATUS(job, odds))
+
+def cancel(*args: str, log: bool = True):
+    backgroundJobs = DataController.backgroundJobs
+    if not args or args[0] == '*':
+        toCancel = backgroundJobs.active() if backgroundJobs is not None else []
+    else:
+        try:
+            id = int(args[0])
+        except:
+            print(BAD_ARGUMENT(args[0]))
+            return
+        job = backgroundJobs.get(id) if backgroundJobs is not None else None
+        if job is None or not job.active():
+            print(JOB_NOT_FOUND(args[0]))
+            return
+        toCancel = [job]
+    
+    for job in toCancel:
+        job.cancel()
+        if log: print(CANCELLING_JOB(job))
+
+def stats(*args: str, log: bool = True):
+    action = args[0].lower() if args else 'show'
+    instrumentation = DataController.instrumentation
+    if action == 'on': instrumentation.enable()
+    elif action == 'off': instrumentation.disable()
+    elif action == 'reset': instrumentation.reset()
+    elif action == 'export':
+        filename = args[1] if len(args) > 1 else "stats.json"
+        instrumentation.export(filename)
+        if log: print(EXPORTED_STATS(filename))
+        return
+    elif action != 'show':
+        print(BAD_ARGUMENT(args[0]))
+        return
+    if log: print(STATS(instrumentation.toDict()))
+    
 def quit(): pass
 
-commands = [help, update, save, load, focus, setgame, fullmap, simulate, quit]
+commands = [help, update, save, load, exportjson, importjson, focus, standings, setgame, setodds, rate, fullmap, simulate, exact, store, whatif, leverage, clinch, jobs, cancel, stats, quit]
 
 # === CONTROL FLOW ===
 
@@ -203,13 +741,23 @@ def main():
     load()
     
     quitLoop = False
-    while not quitLoop:
-        userInput = input(INPUT_CURSOR)
-        userCommand = shlex.split(userInput)
-        commandFunc = next((c for c in commands if c.__name__ == userCommand[0].lower()), None)
-        
-        if commandFunc is None: print(UNRECOGNIZED_COMMAND(userCommand[0]))
-        elif commandFunc is quit: quitLoop = True
-        else: commandFunc(*userCommand[1:])
+    try:
+        while not quitLoop:
+            if DataController.backgroundJobs is not None:
+                for job in DataController.backgroundJobs.collectFinished():
+                    print(JOB_FINISHED(job))
+            userInput = input(INPUT_CURSOR)
+            userCommand = shlex.split(userInput)
+            if not userCommand: continue # Just checks on finished jobs
+            commandFunc = next((c for c in commands if c.__name__ == userCommand[0].lower()), None)
+            
+            if commandFunc is None: print(UNRECOGNIZED_COMMAND(userCommand[0]))
+            elif commandFunc is quit: quitLoop = True
+            else: commandFunc(*userCommand[1:])
+    finally:
+        if DataController.backgroundJobs is not None:
+            active = DataController.backgroundJobs.active()
+            if active: print(STOPPING_JOBS(len(active)))
+            DataController.backgroundJobs.shutdown()
     
 if __name__ == '__main__': main()
\ No newline at end of file
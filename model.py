@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import time
 import copy
+from ratings import winProbability
     
 class Game:
     def __init__(self, home: Team, away: Team, winner: Team = None):
@@ -32,6 +33,9 @@ class Team:
         self.conference = conference
         self.games = []
         self.nonConfWins = 0 # Used in Big 12 tiebreakers
+        self.index = None # Position in conference.teams, set by Conference.addTeam()
+        self.opponentMask = 0 # Bitset of opponents' indices
+        self.rating = None # Power rating used for game win probabilities, see ratings.py
         
     def __str__(self) -> str:
         return self.name
@@ -42,6 +46,7 @@ class Team:
     def __copy__(self) -> Team:
         copyTeam: Team = Team(self.name)
         copyTeam.nonConfWins = self.nonConfWins
+        copyTeam.rating = self.rating
         return copyTeam
         
     def addGame(self, game: Game, propagate: bool = False) -> None:
@@ -49,6 +54,8 @@ class Team:
             self.conference.addGame(game, True) # will add game to this team via propagation
         else:
             self.games.append(game)
+            opponent = game.home if game.home is not self else game.away
+            self.opponentMask |= 1 << opponent.index
             
     def getOpponents(self) -> list[Team]:
         return [g.home if g.home is not self else g.away
@@ -56,7 +63,7 @@ class Team:
     
     def getGameByOpponent(self, team: str | Team) -> Game | None:
         if isinstance(team, str): team = self.conference.getTeamByName(team)
-        return next((g for g in self.games if g.played(team)), None)
+        return self.conference.getGameByTeams(self, team) or self.conference.getGameByTeams(team, self)
             
 class Conference:
     def __init__(self, name: str, abbrName: str) -> None:
@@ -64,6 +71,9 @@ class Conference:
         self.abbrName = abbrName
         self.teams = []
         self.games = []
+        self.teamsByName: dict[str, Team] = {}
+        self.gamesByTeams: dict[tuple[Team, Team], Game] = {} # (home, away) -> first game between them
+        self.probabilities: dict[Game, float] = {} # User-set home win probabilities
         self.setUpdateTimestamp()
         
     def __str__(self) -> str:
@@ -72,23 +82,30 @@ class Conference:
     def __repr__(self) -> str:
         return f"<{str(self)}: Conference>"
     
+    # Prefer Scenario for branching a conference; this rebuilds every team and game
     def __deepcopy__(self, memo) -> Conference:
         copyConf: Conference = Conference(self.name, self.abbrName)
+        copyTeams = {}
         for team in self.teams:
             copyTeam = copy.copy(team)
-            copyTeam.setConference(copyConf)
-            copyConf.addTeam(copy.copy(team))
+            copyConf.addTeam(copyTeam)
+            copyTeams[team] = copyTeam
         for game in self.games:
-            copyConf.addGame(copy.copy(game))
+            copyGame = Game(copyTeams[game.home], copyTeams[game.away], copyTeams.get(game.winner))
+            copyConf.addGame(copyGame)
+            if game in self.probabilities: copyConf.probabilities[copyGame] = self.probabilities[game]
         copyConf.setUpdateTimestamp(self.update)
+        memo[id(self)] = copyConf
         return copyConf
     
     def addTeam(self, team: Team) -> None:
+        team.index = len(self.teams)
         self.teams.append(team)
+        self.teamsByName.setdefault(team.name, team)
         team.conference = self
         
     def getTeamByName(self, name: str) -> Team | None:
-        return next((t for t in self.teams if t.name == name), None)
+        return self.teamsByName.get(name)
     
     # Adds a standings field and propogates in arbitrary order.
     # NOTE: Does not sort standings. See Tiebreaker.orderStandings().
@@ -97,19 +114,95 @@ class Conference:
             
     def addGame(self, game: Game, propagate: bool = True) -> None:
         self.games.append(game)
+        self.gamesByTeams.setdefault((game.home, game.away), game)
         if propagate:
             game.home.addGame(game, False)
             game.away.addGame(game, False)
             
     def getGameByTeams(self, home: Team, away: Team) -> Game | None:
-        return next((g for g in self.games if g.home is home and g.away is away), None)
+        return self.gamesByTeams.get((home, away))
     
     def getGamesByTeam(self, team: Team | str) -> list[Game]:
         if isinstance(team, str): team = self.getTeamByName(team)
-        return [g for g in self.games if g.played(team)]
+        return list(team.games) if team is not None and team.conference is self else []
+    
+    def getWinner(self, game: Game) -> Team | None:
+        return game.winner
+    
+    # Probability that the home team wins an unplayed game
+    # User-set if available, else from both teams' ratings, else a coin flip
+    def getProbability(self, game: Game) -> float:
+        if game in self.probabilities: return self.probabilities[game]
+        if game.home.rating is not None and game.away.rating is not None:
+            return winProbability(game.home.rating, game.away.rating)
+        return 0.5
+    
+    # Sets (or with None, clears) the home win probability of a game
+    def setProbability(self, game: Game, probability: float | None) -> None:
+        if probability is None: self.probabilities.pop(game, None)
+        else: self.probabilities[game] = probability
     
     def getUnplayedGames(self) -> list[Game]:
         return [g for g in self.games if g.winner is None]
             
     def setUpdateTimestamp(self, update: int = None) -> None:
-        self.update = int(time.time()) if update is None else update
\ No newline at end of file
+        self.update = int(time.time()) if update is None else update
+
+# Copy-on-write branch of a conference (or of another scenario)
+# Stores only the game results set on it; every other read falls through to the base
+class Scenario:
+    def __init__(self, base: Conference | Scenario) -> None:
+        self.base = base
+        self.winners: dict[Game, Team | None] = {}
+        self.probabilities: dict[Game, float | None] = {}
+        
+    def __str__(self) -> str:
+        return str(self.base)
+    
+    def __repr__(self) -> str:
+        return f"<{str(self)}: Scenario ({len(self.winners)} set)>"
+    
+    def __getattr__(self, attr: str):
+        # name, abbrName, teams, games, update, getTeamByName(), getGameByTeams(), ...
+        base = self.__dict__.get('base')
+        if base is None or attr.startswith('__'): raise AttributeError(attr)
+        return getattr(base, attr)
+    
+    # Copies the chain down to the conference, with this scenario's results and odds set on the copied games
+    def __deepcopy__(self, memo) -> Scenario:
+        copyScen: Scenario = Scenario(copy.deepcopy(self.base, memo))
+        copyGames = dict(zip(self.games, copyScen.games))
+        copyTeams = dict(zip(self.teams, copyScen.teams))
+        copyScen.winners = {copyGames[game]: copyTeams.get(winner) for game, winner in self.winners.items()}
+        copyScen.probabilities = {copyGames[game]: probability for game, probability in self.probabilities.items()}
+        memo[id(self)] = copyScen
+        return copyScen
+    
+    # The conference at the bottom of a chain of scenarios
+    def getConference(self) -> Conference:
+        return self.base.getConference() if isinstance(self.base, Scenario) else self.base
+    
+    def getWinner(self, game: Game) -> Team | None:
+        if game in self.winners: return self.winners[game]
+        return self.base.getWinner(game)
+    
+    # Sets (or with None, clears) the result of a game in this scenario only
+    def setWinner(self, game: Game, winner: Team | None) -> None:
+        self.winners[game] = winner
+        
+    # Removes this scenario's result for a game so it falls through to the base again
+    def resetWinner(self, game: Game) -> None:
+        self.winners.pop(game, None)
+        
+    def getProbability(self, game: Game) -> float:
+        probability = self.probabilities.get(game)
+        if probability is not None: return probability
+        return self.base.getProbability(game)
+    
+    # Sets the home win probability of a game in this scenario only; None falls through to the base again
+    def setProbability(self, game: Game, probability: float | None) -> None:
+        if probability is None: self.probabilities.pop(game, None)
+        else: self.probabilities[game] = probability
+        
+    def getUnplayedGames(self) -> list[Game]:
+        return [g for g in self.games if self.getWinner(g) is None]
\ No newline at end of file
@@ -0,0 +1,200 @@
+# Per-outcome results of a fullmap or simulate run, indexed for conditional ("what if") queries.
+# A record is one outcome of the unplayed games, or for a subtree collapsed by fullmap's pruning, a partial
+# outcome whose remaining games are free, with its weight and title game result. Records are kept as columns:
+# every unplayed game has a bitmap of the records where the home team won and one of the records where the
+# game is free, so fixing results is a bitmap intersection and a weighted count, with no re-simulation.
+# A record that is free in a fixed game keeps that result's share of its weight (p or 1 - p).
+# Distinct title game results (shares and pairs, see tiebreakers.titleGameShares/titleGamePairs) are
+# interned once and referenced from the records by index.
+
+import os, json
+import numpy as np
+from kernel import SeasonKernel
+from results import ResultAggregator, CONFIDENCE_Z, CHECKPOINT_PATH, runSignature
+
+def storeFilename(abbrName: str) -> str:
+    os.makedirs(CHECKPOINT_PATH, exist_ok = True)
+    return os.path.join(CHECKPOINT_PATH, f"{abbrName}-outcomes.npz")
+
+# Identifies the season state a store answers for (whichever run recorded it)
+def storeSignature(kernel: SeasonKernel) -> str:
+    return runSignature(kernel, "outcomes", {})
+
+# Accumulates records during a run; build() turns them into an OutcomeStore
+# Records come either one at a time as full-season outcome bitmasks (fullmap) or as whole outcome matrices over
+# the unplayed games (simulate)
+class OutcomeRecorder:
+    def __init__(self, kernel: SeasonKernel) -> None:
+        self.kernel = kernel
+        self.resultIds: dict[tuple, int] = {}
+        self.results: list[tuple[dict[int, float], dict[tuple[int, int], float]]] = []
+        self.pairIds: dict[tuple[int, int], int] = {}
+
+        # Records added one at a time
+        self.outcomes: list[int] = []
+        self.free: list[int] = []
+        self.weights: list[float] = []
+        self.ids: list[int] = []
+
+        # Records added as matrices: (bit-packed outcome rows, result ids), every row weighing 1
+        self.chunks: list[tuple[np.ndarray, np.ndarray]] = []
+
+    def __len__(self) -> int:
+        return len(self.ids) + sum(len(ids) for _, ids in self.chunks)
+
+    # Index of a title game result, interned on first use
+    def resultId(self, shares: dict[int, float], pairs: dict[tuple[int, int], float]) -> int:
+        key = (tuple(sorted(shares.items())), tuple(sorted(pairs.items())))
+        resultId = self.resultIds.get(key)
+        if resultId is None:
+            resultId = self.resultIds[key] = len(self.results)
+            self.results.append((dict(shares), dict(pairs)))
+        return resultId
+
+    # Index of a title game decided outright between two teams
+    def pairId(self, a: int, b: int) -> int:
+        key = (a, b) if a < b else (b, a)
+        resultId = self.pairIds.get(key)
+        if resultId is None:
+            resultId = self.pairIds[key] = self.resultId({a: 1.0, b: 1.0}, {key: 1.0})
+        return resultId
+
+    # Adds one record: a full-season outcome bitmask, the mask of games left free in it, its weight and result
+    def add(self, outcome: int, free: int, weight: float, resultId: int) -> None:
+        self.outcomes.append(outcome)
+        self.free.append(free)
+        self.weights.append(weight)
+        self.ids.append(resultId)
+
+    # Adds a (rows x unplayed games) 0/1 outcome matrix with each row's result
+    def addRows(self, outcomes: np.ndarray, resultIds: np.ndarray) -> None:
+        self.chunks.append((np.packbits(outcomes, axis = 1), np.asarray(resultIds, dtype = np.int32)))
+
+    # Adds another recorder's records (from a worker), re-interning its results
+    def merge(self, other: 'OutcomeRecorder') -> None:
+        remap = np.array([self.resultId(*result) for result in other.results] or [0], dtype = np.int32)
+        self.outcomes.extend(other.outcomes)
+        self.free.extend(other.free)
+        self.weights.extend(other.weights)
+        self.ids.extend(remap[other.ids].tolist() if other.ids else [])
+        self.chunks.extend((packed, remap[ids]) for packed, ids in other.chunks)
+
+    # Unplayed game columns of full-season outcome bitmasks as a (rows x unplayed games) 0/1 matrix
+    def columns(self, masks: list[int]) -> np.ndarray:
+        kernel = self.kernel
+        if not masks: return np.zeros((0, kernel.nUnplayed), dtype = np.uint8)
+        nBytes = (kernel.nGames + 7) // 8
+        raw = np.frombuffer(b"".join(mask.to_bytes(nBytes, 'little') for mask in masks), dtype = np.uint8)
+        bits = np.unpackbits(raw.reshape(len(masks), nBytes), axis = 1, bitorder = 'little')
+        return bits[:, kernel.unplayed]
+
+    def build(self) -> 'OutcomeStore':
+        kernel = self.kernel
+        outcomes = [self.columns(self.outcomes)]
+        free = [self.columns(self.free)]
+        weights = [np.asarray(self.weights, dtype = np.float64)]
+        ids = [np.asarray(self.ids, dtype = np.int32)]
+        for packed, chunkIds in self.chunks:
+            outcomes.append(np.unpackbits(packed, axis = 1, count = kernel.nUnplayed))
+            free.append(np.zeros((len(chunkIds), kernel.nUnplayed), dtype = np.uint8))
+            weights.append(np.ones(len(chunkIds)))
+            ids.append(chunkIds)
+        outcomes, free = np.vstack(outcomes), np.vstack(free)
+
+        store = OutcomeStore()
+        store.signature = storeSignature(kernel)
+        store.nTeams = kernel.nTeams
+        store.games = list(kernel.unplayed)
+        store.probabilities = np.array([kernel.probabilities[g] for g in kernel.unplayed])
+        store.sampled = bool(self.chunks)
+        store.weights = np.concatenate(weights)
+        store.resultIds = np.concatenate(ids)
+        store.home = np.packbits(outcomes.T, axis = 1)
+        store.free = np.packbits(free.T, axis = 1) if free.any() else None
+        store.setResults(self.results)
+        return store
+
+class OutcomeStore:
+    def __repr__(self) -> str:
+        return f"<OutcomeStore ({len(self)} records, {len(self.games)} games)>"
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    # Flattens interned results into a share matrix (results x teams) and pair columns
+    def setResults(self, results: list[tuple[dict[int, float], dict[tuple[int, int], float]]]) -> None:
+        self.shares = np.zeros((len(results), self.nTeams))
+        pairRows = []
+        for i, (shares, pairs) in enumerate(results):
+            for team, share in shares.items():
+                self.shares[i, team] = share
+            pairRows.extend((i, a, b, share) for (a, b), share in pairs.items())
+        self.pairs = np.array(pairRows, dtype = np.float64).reshape(-1, 4)
+
+    # Title game results over the records consistent with the fixed results ({game: home team won})
+    # Returns an aggregator whose total is the matching weight (the run's total when nothing is fixed);
+    # sampled stores get binomial confidence intervals over the matching outcomes as margins
+    # Raises KeyError for a game that was already played when the store was recorded
+    def query(self, fixed: dict[int, bool]) -> ResultAggregator:
+        column = {g: j for j, g in enumerate(self.games)}
+        n = len(self)
+        match = np.full(self.home.shape[1], 0xFF, dtype = np.uint8)
+        for g, homeWins in fixed.items():
+            j = column[g]
+            bitmap = self.home[j] if homeWins else ~self.home[j]
+            if self.free is not None: bitmap = bitmap | self.free[j]
+            match &= bitmap
+        selected = np.flatnonzero(np.unpackbits(match, count = n))
+
+        weights = self.weights[selected]
+        if self.free is not None:
+            for g, homeWins in fixed.items():
+                j = column[g]
+                isFree = np.unpackbits(self.free[j], count = n)[selected].astype(bool)
+                weights = np.where(isFree, weights * (self.probabilities[j] if homeWins else 1 - self.probabilities[j]), weights)
+
+        resultWeights = np.bincount(self.resultIds[selected], weights = weights, minlength = len(self.shares))
+        aggregator = ResultAggregator(self.nTeams)
+        aggregator.total = float(weights.sum())
+        aggregator.counts = (resultWeights @ self.shares).tolist()
+        for i, a, b, share in self.pairs.tolist():
+            if resultWeights[int(i)]:
+                key = (int(a), int(b))
+                aggregator.pairs[key] = aggregator.pairs.get(key, 0.0) + resultWeights[int(i)] * share
+        if self.sampled:
+            aggregator.margins = [CONFIDENCE_Z * np.sqrt(f * (1 - f) / len(selected)) if len(selected) else np.inf
+                                  for f in aggregator.frequencies()]
+        return aggregator
+
+    # Saves compressed, with the run's signature so it is only used for the same season state
+    def save(self, filename: str) -> None:
+        meta = {'signature': self.signature, 'nTeams': self.nTeams, 'games': self.games, 'sampled': self.sampled}
+        arrays = {'weights': self.weights, 'resultIds': self.resultIds, 'home': self.home,
+                  'probabilities': self.probabilities, 'shares': self.shares, 'pairs': self.pairs}
+        if self.free is not None: arrays['free'] = self.free
+        with open(filename, 'wb') as f:
+            np.savez_compressed(f, meta = np.array(json.dumps(meta)), **arrays)
+
+    # Returns the store saved with a matching signature, else None
+    @staticmethod
+    def load(filename: str, signature: str) -> 'OutcomeStore | None':
+        try:
+            data = np.load(filename)
+        except (FileNotFoundError, ValueError):
+            return None
+        with data:
+            meta = json.loads(str(data['meta']))
+            if meta['signature'] != signature: return None
+            store = OutcomeStore()
+            store.signature = signature
+            store.nTeams = meta['nTeams']
+            store.games = meta['games']
+            store.sampled = meta['sampled']
+            store.weights = data['weights']
+            store.resultIds = data['resultIds']
+            store.home = data['home']
+            store.free = data['free'] if 'free' in data else None
+            store.probabilities = data['probabilities']
+            store.shares = data['shares']
+            store.pairs = data['pairs']
+        return store
@@ -0,0 +1,22 @@
+# Elo-style rating model for game win probabilities.
+# Ratings are kept per team in a JSON file alongside the saved conference ({team name: rating}).
+
+import json
+
+RATING_SCALE = 400 # A rating difference of RATING_SCALE is 10:1 odds
+HOME_ADVANTAGE = 55 # Rating points added to the home team
+
+# Probability that the home team beats the away team
+def winProbability(homeRating: float, awayRating: float) -> float:
+    return 1 / (1 + 10 ** ((awayRating - homeRating - HOME_ADVANTAGE) / RATING_SCALE))
+
+def loadRatings(filename: str) -> dict[str, float]:
+    try:
+        with open(filename, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def saveRatings(filename: str, ratings: dict[str, float]) -> None:
+    with open(filename, 'w') as f:
+        json.dump(ratings, f, indent = 2)
@@ -0,0 +1,101 @@
+# Persistent on-disk cache of API responses, keyed by directory + params.
+# Entries are fresh for a per-endpoint TTL; stale entries keep their ETag/Last-Modified validators
+# so they can be revalidated with a conditional request. Total size is bounded by evicting the
+# least recently used entries.
+
+import os, json, time, hashlib, threading
+
+CACHE_PATH = "cache/responses"
+DEFAULT_TTL = 3600 # seconds
+CACHE_TTLS = {
+    "teams": 7 * 24 * 3600, # Team lists don't change mid-season
+    "games": 300
+}
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+class ResponseCache:
+    def __init__(self, path: str = CACHE_PATH, ttls: dict[str, int] = CACHE_TTLS, maxBytes: int = MAX_CACHE_BYTES) -> None:
+        self.path = path
+        self.ttls = ttls
+        self.maxBytes = maxBytes
+        self.lock = threading.Lock()
+
+    def keyFor(self, directory: str, params: dict) -> str:
+        canonical = json.dumps([directory, params], sort_keys = True)
+        return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+    def filename(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+
+    def ttl(self, directory: str) -> int:
+        return self.ttls.get(directory, DEFAULT_TTL)
+
+    # Returns the cached entry for a request, fresh or stale, or None
+    # Reading an entry marks it as recently used
+    def get(self, directory: str, params: dict) -> dict | None:
+        filename = self.filename(self.keyFor(directory, params))
+        try:
+            with open(filename, 'r') as f:
+                entry = json.load(f)
+            os.utime(filename)
+        except (FileNotFoundError, ValueError):
+            return None
+        return entry
+
+    def isFresh(self, entry: dict) -> bool:
+        return time.time() - entry['fetched'] < self.ttl(entry['directory'])
+
+    # Conditional request headers to revalidate a stale entry
+    def validators(self, entry: dict | None) -> dict:
+        headers = {}
+        if entry is None: return headers
+        if entry.get('etag'): headers['If-None-Match'] = entry['etag']
+        if entry.get('lastModified'): headers['If-Modified-Since'] = entry['lastModified']
+        return headers
+
+    # Stores a response body with the response's validators, then evicts down to the size bound
+    def put(self, directory: str, params: dict, body, headers: dict = None) -> dict:
+        headers = {} if headers is None else headers
+        entry = {'directory': directory,
+                 'params': params,
+                 'fetched': time.time(),
+                 'etag': headers.get('ETag'),
+                 'lastModified': headers.get('Last-Modified'),
+                 'body': body}
+        self.write(entry)
+        return entry
+
+    # Marks a stale entry fresh again after the server confirmed it unchanged (304)
+    def revalidate(self, entry: dict) -> None:
+        entry['fetched'] = time.time()
+        self.write(entry)
+
+    def write(self, entry: dict) -> None:
+        with self.lock:
+            os.makedirs(self.path, exist_ok = True)
+            filename = self.filename(self.keyFor(entry['directory'], entry['params']))
+            tmpFilename = f"{filename}.{threading.get_ident()}.tmp"
+            with open(tmpFilename, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmpFilename, filename)
+            self.evict()
+
+    # Removes least recently used entries until the cache fits in maxBytes
+    def evict(self) -> None:
+        files = []
+        for name in os.listdir(self.path):
+            if not name.endswith(".json"): continue
+            stat = os.stat(os.path.join(self.path, name))
+            files.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.maxBytes: break
+            os.remove(os.path.join(self.path, name))
+            total -= size
+
+    def clear(self) -> None:
+        with self.lock:
+            if not os.path.isdir(self.path): return
+            for name in os.listdir(self.path):
+                if name.endswith(".json"): os.remove(os.path.join(self.path, name))
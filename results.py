@@ -0,0 +1,131 @@
+# Streaming aggregation of simulation/enumeration results with resumable checkpoints.
+# Counters are fixed-size (per team and per pair of teams), so memory stays constant however many
+# outcomes are aggregated. A checkpoint stores the counters with the run's cursor (RNG state or
+# completed enumeration prefixes) so an interrupted run can pick up exactly where it stopped.
+
+import os, json, math, hashlib
+from kernel import SeasonKernel
+
+CHECKPOINT_PATH = "results"
+CHECKPOINT_INTERVAL = 30 # seconds between checkpoints
+CONFIDENCE_Z = 1.96 # 95% confidence intervals
+
+class ResultAggregator:
+    def __init__(self, nTeams: int) -> None:
+        self.nTeams = nTeams
+        self.total = 0 # outcomes aggregated
+        self.counts = [0.0] * nTeams # title game appearances per team
+        self.pairs: dict[tuple[int, int], float] = {} # title game matchups, (lower index, higher index)
+        self.margins: list[float] | None = None # confidence interval half-widths of frequencies(), if sampled
+
+    def __repr__(self) -> str:
+        return f"<ResultAggregator ({self.total} outcomes)>"
+
+    # Adds a title game pair decided for weight outcomes
+    def addPair(self, a: int, b: int, weight: float = 1) -> None:
+        self.counts[a] += weight
+        self.counts[b] += weight
+        key = (a, b) if a < b else (b, a)
+        self.pairs[key] = self.pairs.get(key, 0.0) + weight
+
+    # Adds title game shares and pair shares (see tiebreakers.titleGameShares/titleGamePairs) for one outcome
+    def addShares(self, shares: dict[int, float], pairs: dict[tuple[int, int], float], weight: float = 1) -> None:
+        for team, share in shares.items():
+            self.counts[team] += share * weight
+        for key, share in pairs.items():
+            self.pairs[key] = self.pairs.get(key, 0.0) + share * weight
+
+    def merge(self, other: 'ResultAggregator') -> None:
+        self.total += other.total
+        for team, count in enumerate(other.counts):
+            self.counts[team] += count
+        for key, count in other.pairs.items():
+            self.pairs[key] = self.pairs.get(key, 0.0) + count
+
+    def frequencies(self) -> list[float]:
+        return [c / self.total if self.total else 0.0 for c in self.counts]
+
+    def pairFrequencies(self) -> dict[tuple[int, int], float]:
+        return {key: c / self.total for key, c in self.pairs.items()} if self.total else {}
+
+    def toDict(self) -> dict:
+        return {'nTeams': self.nTeams,
+                'total': self.total,
+                'counts': self.counts,
+                'pairs': [[a, b, c] for (a, b), c in self.pairs.items()]}
+
+    @staticmethod
+    def fromDict(d: dict) -> 'ResultAggregator':
+        aggregator = ResultAggregator(d['nTeams'])
+        aggregator.total = d['total']
+        aggregator.counts = d['counts']
+        aggregator.pairs = {(a, b): c for a, b, c in d['pairs']}
+        return aggregator
+
+# Running mean and variance of per-team title game frequencies over independent batches of sampled outcomes
+# The spread between batches gives a confidence interval that holds whatever variance reduction a batch uses
+class BatchStatistics:
+    def __init__(self, nTeams: int) -> None:
+        self.batches = 0
+        self.sums = [0.0] * nTeams
+        self.sumSquares = [0.0] * nTeams
+
+    def add(self, frequencies: list[float]) -> None:
+        self.batches += 1
+        for team, f in enumerate(frequencies):
+            self.sums[team] += f
+            self.sumSquares[team] += f * f
+
+    # Confidence interval half-width of each team's mean frequency (inf before two batches)
+    def margins(self, z: float = CONFIDENCE_Z) -> list[float]:
+        n = self.batches
+        if n < 2: return [math.inf] * len(self.sums)
+        return [z * math.sqrt(max(0.0, (sq - s * s / n) / (n - 1)) / n) for s, sq in zip(self.sums, self.sumSquares)]
+
+    def toDict(self) -> dict:
+        return {'batches': self.batches, 'sums': self.sums, 'sumSquares': self.sumSquares}
+
+    @staticmethod
+    def fromDict(d: dict) -> 'BatchStatistics':
+        statistics = BatchStatistics(len(d['sums']))
+        statistics.batches = d['batches']
+        statistics.sums = d['sums']
+        statistics.sumSquares = d['sumSquares']
+        return statistics
+
+# Identifies a run: the season state being evaluated plus the run's kind and parameters
+# A checkpoint is only resumed by a run with the same signature, so the state must cover every kernel input the
+# results depend on: the conference (its rule chain), teams, schedule (home and away of each game), completed
+# games, unplayed games' probabilities and non-conference wins (read by the Big 12 rules)
+def runSignature(kernel: SeasonKernel, kind: str, params: dict) -> str:
+    state = [kernel.conference.abbrName, [t.name for t in kernel.teams], kernel.home, kernel.away,
+             kernel.playedOutcome, kernel.playedMask, [kernel.probabilities[g] for g in kernel.unplayed],
+             kernel.nonConfWins, kind, params]
+    return hashlib.sha1(json.dumps(state, sort_keys = True).encode('utf-8')).hexdigest()
+
+def checkpointFilename(abbrName: str, kind: str) -> str:
+    os.makedirs(CHECKPOINT_PATH, exist_ok = True)
+    return os.path.join(CHECKPOINT_PATH, f"{abbrName}-{kind}.checkpoint.json")
+
+# Writes a checkpoint atomically, so an interruption mid-write leaves the previous one intact
+def saveCheckpoint(filename: str, signature: str, aggregator: ResultAggregator, cursor: dict) -> None:
+    tmpFilename = f"{filename}.tmp"
+    with open(tmpFilename, 'w') as f:
+        json.dump({'signature': signature, 'results': aggregator.toDict(), 'cursor': cursor}, f)
+    os.replace(tmpFilename, filename)
+
+# Returns (aggregator, cursor) from a checkpoint with a matching signature, else None
+def loadCheckpoint(filename: str, signature: str) -> tuple[ResultAggregator, dict] | None:
+    try:
+        with open(filename, 'r') as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if checkpoint.get('signature') != signature: return None
+    return (ResultAggregator.fromDict(checkpoint['results']), checkpoint['cursor'])
+
+def removeCheckpoint(filename: str) -> None:
+    try:
+        os.remove(filename)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,274 @@
+# Clinch/elimination solver for one team's title game chances.
+# Searches partial assignments of the unplayed games depth first, settling a branch as soon as win total
+# bounds decide it: a team has clinched once at most one other team can still reach its win total, and is
+# eliminated once two other teams are already guaranteed more wins than it can reach. Only branches the
+# bounds can't settle are resolved down to full outcomes and run through the Tiebreaker.
+# Clinch scenarios are partial assignments under which every completion puts the team in the title game,
+# reduced until dropping any one result breaks that. They are searched most likely first, so the paths shown are
+# the likely ones rather than the first ones in branching order. Early in a season, when clinching takes many
+# results and a search by likelihood can't reach that deep in time, they are instead reduced from sampled outcomes
+# in which the team makes the title game.
+
+import math, time, random, heapq, itertools
+from kernel import SeasonKernel
+from tiebreakers import Tiebreaker
+
+SOLVER_TIME = 5.0 # seconds before the search gives up
+MAX_SCENARIOS = 5 # most likely scenarios returned
+CHECK_INTERVAL = 1000 # nodes between deadline checks
+SCENARIO_NODES = 2000 # nodes a single check may search while building scenarios before it is given up on
+WITNESS_SAMPLES = 32 # random completions tried for a counterexample before searching
+SEARCH_SHARE = 0.5 # of the time limit searching for scenarios most likely first, before sampling them
+MAX_SAMPLES = 256 # sampled outcomes reduced to scenarios
+
+CLINCHED, ELIMINATED, ALIVE, UNKNOWN = "clinched", "eliminated", "alive", "unknown"
+
+class SolverTimeout(Exception):
+    pass
+
+class NodeLimit(Exception):
+    pass
+
+class ScenarioSolver:
+    def __init__(self, tiebreaker: Tiebreaker, team: int, timeLimit: float = SOLVER_TIME) -> None:
+        self.tiebreaker = tiebreaker
+        self.kernel: SeasonKernel = tiebreaker.kernel
+        self.team = team
+        self.timeLimit = timeLimit
+        self.memo: dict[tuple[bool, int, int], bool] = {}
+        self.nodeLimit = math.inf
+        self.limited = False # a check gave up, see proves()
+        self.rng = random.Random(0)
+
+        self.reset()
+        self.own = [g for g in self.kernel.unplayed if team in (self.kernel.home[g], self.kernel.away[g])]
+
+    # === STATE ===
+
+    # Back to the current results, every unplayed game unassigned
+    def reset(self) -> None:
+        kernel = self.kernel
+        self.outcome = kernel.playedOutcome
+        self.decided = kernel.playedMask
+        self.wins = kernel.baseWins.copy()
+        self.remaining = [0] * kernel.nTeams
+        for g in kernel.unplayed:
+            self.remaining[kernel.home[g]] += 1
+            self.remaining[kernel.away[g]] += 1
+
+    def assign(self, g: int, homeWins: bool) -> None:
+        kernel = self.kernel
+        self.decided |= 1 << g
+        if homeWins: self.outcome |= 1 << g
+        self.wins[kernel.home[g] if homeWins else kernel.away[g]] += 1
+        self.remaining[kernel.home[g]] -= 1
+        self.remaining[kernel.away[g]] -= 1
+
+    def unassign(self, g: int, homeWins: bool) -> None:
+        kernel = self.kernel
+        self.decided &= ~(1 << g)
+        self.outcome &= ~(1 << g)
+        self.wins[kernel.home[g] if homeWins else kernel.away[g]] -= 1
+        self.remaining[kernel.home[g]] += 1
+        self.remaining[kernel.away[g]] += 1
+
+    # CLINCHED or ELIMINATED if win total bounds settle every completion of the current assignment, else None
+    def bounds(self) -> str | None:
+        team, wins, remaining = self.team, self.wins, self.remaining
+        low, high = wins[team], wins[team] + remaining[team]
+        reach = ahead = 0
+        for t in range(self.kernel.nTeams):
+            if t == team: continue
+            if wins[t] + remaining[t] >= low: reach += 1
+            if wins[t] > high: ahead += 1
+        if reach <= 1: return CLINCHED
+        if ahead >= 2: return ELIMINATED
+        return None
+
+    # Whether the team makes the title game in every completion (forall) or in at least one (not forall)
+    # "Makes" means a full slot in every completion, but any share (a coin flip between tied teams) in one
+    def holds(self, forall: bool) -> bool:
+        self.nodes += 1
+        if self.nodes % CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline: raise SolverTimeout()
+        if self.nodes > self.nodeLimit: raise NodeLimit()
+        settled = self.bounds()
+        if settled is not None: return settled == CLINCHED
+
+        key = (forall, self.outcome, self.decided)
+        if key in self.memo: return self.memo[key]
+        g, favorable = self.nextGame()
+        if g is None:
+            share = self.tiebreaker.titleGame(self.outcome).get(self.team, 0.0)
+            result = share >= 1.0 if forall else share > 0.0
+        else:
+            # Try the result that is bad for the team first when looking for a counterexample, good otherwise
+            result = forall
+            for homeWins in ((not favorable, favorable) if forall else (favorable, not favorable)):
+                self.assign(g, homeWins)
+                try:
+                    branch = self.holds(forall)
+                finally:
+                    self.unassign(g, homeWins)
+                if branch != forall:
+                    result = branch
+                    break
+        self.memo[key] = result
+        return result
+
+    # Next game to branch on and its result that is good for the team: (game, home team wins), or (None, None)
+    # once every game is decided. The team's own games come first, then the game of the contested team (one that
+    # can still reach the team's win total but isn't already sure to finish ahead of it) with the highest
+    # ceiling, whose loss is the good result. Games without a contested team only matter to tiebreakers
+    def nextGame(self) -> tuple[int | None, bool | None]:
+        kernel, wins, remaining = self.kernel, self.wins, self.remaining
+        for g in self.own:
+            if not self.decided >> g & 1: return (g, kernel.home[g] == self.team)
+        low, high = wins[self.team], wins[self.team] + remaining[self.team]
+        best, bestCeiling, homeWins = None, -1, None
+        for g in kernel.unplayed:
+            if self.decided >> g & 1: continue
+            if best is None: best, homeWins = g, True
+            for t, other, tHome in ((kernel.home[g], kernel.away[g], True), (kernel.away[g], kernel.home[g], False)):
+                ceiling = wins[t] + remaining[t]
+                if ceiling > bestCeiling and ceiling >= low and wins[t] <= high:
+                    best, bestCeiling, homeWins = g, ceiling, not tHome
+        return (best, homeWins)
+
+    def startSearch(self) -> None:
+        self.nodes = 0
+        self.started = time.perf_counter()
+        self.deadline = self.started + self.timeLimit
+
+    # Whether one of WITNESS_SAMPLES random completions of the current assignment refutes holds(forall)
+    # Ties lost deep in the remaining games are rare for the search to reach but common among random completions
+    def refuted(self, forall: bool) -> bool:
+        undecided = [g for g in self.kernel.unplayed if not self.decided >> g & 1]
+        for _ in range(WITNESS_SAMPLES):
+            outcome = self.outcome
+            for g in undecided:
+                if self.rng.random() < 0.5: outcome |= 1 << g
+            share = self.tiebreaker.titleGame(outcome).get(self.team, 0.0)
+            if (share < 1.0) if forall else (share > 0.0): return True
+        return False
+
+    # holds() within SCENARIO_NODES nodes; a check that needs more (a tie decided deep in the remaining games)
+    # is answered conservatively: not clinched, and not ruled out
+    def proves(self, forall: bool) -> bool:
+        if self.bounds() is None and self.refuted(forall): return not forall
+        self.nodeLimit = self.nodes + SCENARIO_NODES
+        try:
+            return self.holds(forall)
+        except NodeLimit:
+            self.limited = True
+            return not forall
+        finally:
+            self.nodeLimit = math.inf
+
+    # === SCENARIOS ===
+
+    # Drops each result of a clinching assignment (currently applied) in turn, keeping it only if it is needed
+    # Leaves the full assignment applied
+    def minimize(self, assignment: list[tuple[int, bool]]) -> list[tuple[int, bool]]:
+        kept = list(assignment)
+        for result in reversed(assignment):
+            self.unassign(*result)
+            if self.proves(True): kept.remove(result)
+            else: self.assign(*result)
+        for result in assignment:
+            if result not in kept: self.assign(*result)
+        return kept
+
+    # Best first over partial assignments, most likely first (shortest first when games are coin flips), branching
+    # as nextGame() does with good results for the team first among equally likely ones
+    # Collects minimized clinching assignments into found, skipping branches that can't reach the title game or that
+    # already contain a found scenario. Stops once MAX_SCENARIOS are found and no branch left is as likely as the
+    # least likely of them (minimizing only makes a scenario likelier, so this is a heuristic cut, not a bound)
+    # Returns whether the search ran out of branches or stopped that way (rather than on the time limit)
+    def findScenarios(self, found: list[frozenset]) -> bool:
+        order = itertools.count() # FIFO among equally likely branches
+        frontier = [(-1.0, next(order), [])]
+        while frontier:
+            negProbability, _, assignment = heapq.heappop(frontier)
+            if len(found) >= MAX_SCENARIOS and -negProbability <= self.likeliest(found)[-1][1]: break
+            if any(scenario <= set(assignment) for scenario in found): continue
+            for result in assignment:
+                self.assign(*result)
+            try:
+                if not self.proves(False): continue
+                if self.proves(True):
+                    scenario = frozenset(self.minimize(assignment))
+                    if not any(other <= scenario for other in found): found.append(scenario)
+                    continue
+                g, favorable = self.nextGame()
+                if g is None: continue # Only a share of a tie here
+                for homeWins in (favorable, not favorable):
+                    probability = -negProbability * self.probability([(g, homeWins)])
+                    if probability > 0: heapq.heappush(frontier, (-probability, next(order), assignment + [(g, homeWins)]))
+            finally:
+                for result in reversed(assignment):
+                    self.unassign(*result)
+        return True
+
+    # Reduces sampled outcomes in which the team makes the title game outright to scenarios, until MAX_SAMPLES are
+    # reduced (or the time limit). Outcomes are drawn by game probabilities, so likely paths come up often, and
+    # reduced dropping their least likely results first
+    def sampleScenarios(self, found: list[frozenset]) -> None:
+        kernel = self.kernel
+        for _ in range(MAX_SAMPLES):
+            while True:
+                if time.perf_counter() > self.deadline: raise SolverTimeout()
+                assignment = [(g, self.rng.random() < kernel.probabilities[g]) for g in kernel.unplayed]
+                outcome = kernel.playedOutcome
+                for g, homeWins in assignment:
+                    if homeWins: outcome |= 1 << g
+                if self.tiebreaker.titleGame(outcome).get(self.team, 0.0) >= 1.0: break
+            assignment.sort(key = lambda result: -self.probability([result])) # minimize() drops from the end
+            for result in assignment:
+                self.assign(*result)
+            scenario = frozenset(self.minimize(assignment))
+            self.reset()
+            if any(other <= scenario for other in found): continue
+            found[:] = [other for other in found if not scenario <= other] + [scenario]
+
+    # The MAX_SCENARIOS most likely scenarios as (scenario, probability), most likely first
+    def likeliest(self, found: list[frozenset]) -> list[tuple[frozenset, float]]:
+        ranked = sorted(((scenario, self.probability(scenario)) for scenario in found), key = lambda entry: -entry[1])
+        return ranked[:MAX_SCENARIOS]
+
+    # Returns (status, up to MAX_SCENARIOS clinch scenarios as lists of (game, home team won), most likely first,
+    # complete)
+    # Status is CLINCHED, ELIMINATED, ALIVE, or UNKNOWN if the search ran out of time first, and is exact
+    # otherwise. Every scenario is proven to clinch; complete is False if the time limit cut the search short (the
+    # likeliest scenarios may not have been reached) or a check gave up (see proves()), in which case a scenario
+    # may keep a result it doesn't strictly need
+    def solve(self) -> tuple[str, list[list[tuple[int, bool]]], bool]:
+        self.startSearch()
+        try:
+            if self.holds(True): return (CLINCHED, [], True)
+            if not self.holds(False): return (ELIMINATED, [], True)
+        except SolverTimeout:
+            return (UNKNOWN, [], False)
+
+        found = []
+        self.deadline = self.started + self.timeLimit * SEARCH_SHARE
+        try:
+            complete = self.findScenarios(found) and not self.limited
+        except SolverTimeout:
+            complete = False
+            self.reset()
+            self.deadline = self.started + self.timeLimit
+            try:
+                self.sampleScenarios(found)
+            except SolverTimeout:
+                pass
+            self.reset()
+        scenarios = [sorted(scenario, key = lambda result: (result[0] not in self.own, result[0]))
+                     for scenario, _ in self.likeliest(found)]
+        return (ALIVE, scenarios, complete)
+
+    # Probability of every result of a scenario (see Conference.getProbability())
+    def probability(self, scenario: list[tuple[int, bool]]) -> float:
+        p = 1.0
+        for g, homeWins in scenario:
+            p *= self.kernel.probabilities[g] if homeWins else 1 - self.kernel.probabilities[g]
+        return p
@@ -0,0 +1,185 @@
+# Batched simulation engines over a SeasonKernel.
+# Win totals are computed for whole chunks of simulated outcomes with array ops; only outcomes
+# with a tie at the title game cut are handed to the Tiebreaker one at a time.
+# Games are drawn with their home win probabilities (see Conference.getProbability()). Outcomes are drawn
+# in independent batches; within a batch, draws come in antithetic pairs and the joint outcomes of the
+# highest leverage games are sampled systematically (stratified) rather than independently. Batch-to-batch
+# spread gives confidence intervals, so a run can stop as soon as every team's odds are precise enough.
+
+import math, time
+import numpy as np
+from typing import Callable
+from kernel import SeasonKernel
+from tiebreakers import Tiebreaker, titleGameShares, titleGamePairs
+from enumeration import orderGames
+from results import *
+from outcomestore import OutcomeRecorder
+from leverage import GameLeverage
+
+DEFAULT_CHUNK_SIZE = 10000
+BATCH_SIZE = 1000 # outcomes per independent batch, the unit of confidence intervals
+STRATIFIED_GAMES = 4 # highest leverage games sampled systematically; 2^STRATIFIED_GAMES strata
+MIN_BATCHES = 20 # batches before a run may stop on its confidence intervals
+DEFAULT_MARGIN = 0.005 # title game odds to within +/-0.5%
+
+# Home/away incidence matrices (unplayed games x teams) so that win totals for an outcome
+# matrix are baseWins + outcomes @ homeMinusAway + awayWins
+def incidenceMatrices(kernel: SeasonKernel) -> tuple[np.ndarray, np.ndarray]:
+    home = np.zeros((kernel.nUnplayed, kernel.nTeams), dtype = np.int32)
+    away = np.zeros((kernel.nUnplayed, kernel.nTeams), dtype = np.int32)
+    for j, g in enumerate(kernel.unplayed):
+        home[j, kernel.home[g]] = 1
+        away[j, kernel.away[g]] = 1
+    return (home, away)
+
+# Win totals for every row of an (N x unplayed games) 0/1 outcome matrix (1 = home win)
+def winTotalsBatch(kernel: SeasonKernel, outcomes: np.ndarray, incidence: tuple[np.ndarray, np.ndarray] = None) -> np.ndarray:
+    home, away = incidenceMatrices(kernel) if incidence is None else incidence
+    base = np.asarray(kernel.baseWins, dtype = np.int32) + away.sum(axis = 0)
+    return base + outcomes.astype(np.int32) @ (home - away)
+
+# Full season outcome bitmask for one row of an outcome matrix
+def rowToOutcome(kernel: SeasonKernel, row: np.ndarray) -> int:
+    outcome = kernel.playedOutcome
+    for j in np.flatnonzero(row):
+        outcome |= 1 << kernel.unplayed[j]
+    return outcome
+
+# Adds title game appearances and matchups for a chunk of outcomes to the aggregator (and each row to the recorder
+# and the game leverage tallies)
+# Rows whose second and third best records differ are decided on record alone
+def tallyTitleGames(tiebreaker: Tiebreaker, outcomes: np.ndarray, wins: np.ndarray, aggregator: ResultAggregator,
+                    recorder: OutcomeRecorder = None, leverage: GameLeverage = None) -> None:
+    kernel = tiebreaker.kernel
+    top = -np.sort(-wins, axis = 1)[:, :3]
+    tied = top[:, 1] == top[:, 2] if kernel.nTeams > 2 else np.zeros(len(wins), dtype = bool)
+    resultIds = np.zeros(len(wins), dtype = np.int32)
+    rowShares = np.zeros((len(wins), kernel.nTeams)) if leverage is not None else None
+
+    clear = wins[~tied]
+    if len(clear):
+        topTwo = np.sort(np.argpartition(-clear, 1, axis = 1)[:, :2], axis = 1)
+        pairs, inverse, pairCounts = np.unique(topTwo[:, 0] * kernel.nTeams + topTwo[:, 1], return_inverse = True, return_counts = True)
+        for pair, count in zip(pairs.tolist(), pairCounts.tolist()):
+            aggregator.addPair(pair // kernel.nTeams, pair % kernel.nTeams, count)
+        if recorder is not None:
+            ids = np.array([recorder.pairId(pair // kernel.nTeams, pair % kernel.nTeams) for pair in pairs.tolist()], dtype = np.int32)
+            resultIds[~tied] = ids[inverse.reshape(-1)]
+        if leverage is not None:
+            rows = np.flatnonzero(~tied)
+            rowShares[rows, topTwo[:, 0]] = 1.0
+            rowShares[rows, topTwo[:, 1]] = 1.0
+
+    for row in np.flatnonzero(tied):
+        groups = tiebreaker.titleGameGroups(rowToOutcome(kernel, outcomes[row]), wins[row].tolist())
+        shares, pairs = titleGameShares(groups), titleGamePairs(groups)
+        aggregator.addShares(shares, pairs)
+        if recorder is not None: resultIds[row] = recorder.resultId(shares, pairs)
+        if leverage is not None:
+            for team, share in shares.items(): rowShares[row, team] = share
+    aggregator.total += len(wins)
+    if recorder is not None: recorder.addRows(outcomes, resultIds)
+    if leverage is not None: leverage.addRows(outcomes, rowShares)
+
+# Unplayed game positions (columns of an outcome matrix) of the highest leverage games: those between teams with
+# the best chance of reaching the title game (see enumeration.orderGames()) whose results are not certain
+def leverageColumns(kernel: SeasonKernel, k: int = STRATIFIED_GAMES) -> list[int]:
+    column = {g: j for j, g in enumerate(kernel.unplayed)}
+    games, nRelevant = orderGames(kernel)
+    uncertain = [g for g in games[:nRelevant] if 0 < kernel.probabilities[g] < 1]
+    return [column[g] for g in uncertain[:k]]
+
+# Draws an (n x unplayed games) 0/1 outcome matrix with each game's home win probability
+# Rows come in antithetic pairs (u, 1 - u); the stratified columns' joint outcomes are sampled systematically
+class OutcomeSampler:
+    def __init__(self, kernel: SeasonKernel, stratified: int = STRATIFIED_GAMES) -> None:
+        self.p = np.array([kernel.probabilities[g] for g in kernel.unplayed])
+        self.columns = leverageColumns(kernel, stratified)
+
+        # Every joint outcome of the stratified games with its probability
+        k = len(self.columns)
+        self.strata = (np.arange(1 << k)[:, None] >> np.arange(k) & 1).astype(np.uint8)
+        p = self.p[self.columns]
+        self.cdf = np.cumsum(np.prod(np.where(self.strata == 1, p, 1 - p), axis = 1))
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        u = rng.random((math.ceil(n / 2), len(self.p)))
+        outcomes = (np.vstack((u, 1 - u))[:n] < self.p).astype(np.uint8)
+        if self.columns:
+            positions = (rng.permutation(n) + rng.random()) / n
+            stratum = np.minimum(np.searchsorted(self.cdf, positions, side = 'right'), len(self.cdf) - 1)
+            outcomes[:, self.columns] = self.strata[stratum]
+        return outcomes
+
+# Yields (outcome matrix, win totals) chunks until numSims outcomes are drawn
+# Chunks hold whole batches of BATCH_SIZE rows (at most chunkSize rows, rounded down to a whole batch)
+def outcomeBatches(kernel: SeasonKernel, rng: np.random.Generator, numSims: int, chunkSize: int = DEFAULT_CHUNK_SIZE,
+                   stratified: int = STRATIFIED_GAMES):
+    incidence = incidenceMatrices(kernel)
+    sampler = OutcomeSampler(kernel, stratified)
+    batchesPerChunk = max(1, chunkSize // BATCH_SIZE)
+    remaining = numSims
+    while remaining > 0:
+        batches = []
+        for _ in range(batchesPerChunk):
+            if remaining <= 0: break
+            n = min(BATCH_SIZE, remaining)
+            batches.append(sampler.sample(rng, n))
+            remaining -= n
+        outcomes = np.vstack(batches)
+        yield (outcomes, winTotalsBatch(kernel, outcomes, incidence))
+
+# Monte Carlo over the unplayed games
+# Processes up to numSims outcomes in chunks of at most chunkSize rows to keep memory bounded
+# With a margin, stops once every team's title game odds are within +/-margin at 95% confidence
+# (checked after each chunk, from MIN_BATCHES batches on)
+# With a checkpoint filename, results and RNG state are saved every CHECKPOINT_INTERVAL seconds and a matching
+# checkpoint is resumed from, drawing exactly the outcomes the interrupted run would have drawn
+# With a recorder, every sampled outcome is recorded into it (a recording run starts over rather than resume)
+# With a leverage, every sampled outcome is also tallied into it (see GameLeverage); its tallies are checkpointed
+# With progress, it is called after each chunk with the results so far (margins included) and the fraction of
+# numSims drawn; returning False stops the run early, checkpointed so that a rerun picks up from there
+# Returns the aggregated results, with confidence interval half-widths as margins
+def monteCarlo(tiebreaker: Tiebreaker, numSims: int, chunkSize: int = DEFAULT_CHUNK_SIZE, seed: int = None,
+               checkpoint: str = None, margin: float = None, stratified: int = STRATIFIED_GAMES,
+               recorder: OutcomeRecorder = None, leverage: GameLeverage = None,
+               progress: Callable[[ResultAggregator, float], bool] = None) -> ResultAggregator:
+    kernel = tiebreaker.kernel
+    rng = np.random.default_rng(seed)
+    aggregator = ResultAggregator(kernel.nTeams)
+    statistics = BatchStatistics(kernel.nTeams)
+
+    params = {'numSims': numSims, 'chunkSize': chunkSize, 'seed': seed, 'margin': margin, 'stratified': stratified,
+              'leverage': leverage is not None}
+    signature = runSignature(kernel, "simulate", params)
+    resumed = loadCheckpoint(checkpoint, signature) if checkpoint is not None and recorder is None else None
+    if resumed is not None:
+        aggregator, cursor = resumed
+        rng.bit_generator.state = cursor['rngState']
+        statistics = BatchStatistics.fromDict(cursor['statistics'])
+        if leverage is not None: leverage.loadDict(cursor['leverage'])
+
+    lastCheckpoint = time.time()
+    stopped = False
+    converged = lambda: margin and statistics.batches >= MIN_BATCHES and max(statistics.margins()) <= margin
+    if not converged():
+        for outcomes, wins in outcomeBatches(kernel, rng, numSims - aggregator.total, chunkSize, stratified):
+            for start in range(0, len(wins), BATCH_SIZE):
+                batch = ResultAggregator(kernel.nTeams)
+                tallyTitleGames(tiebreaker, outcomes[start:start + BATCH_SIZE], wins[start:start + BATCH_SIZE], batch, recorder, leverage)
+                aggregator.merge(batch)
+                if batch.total == BATCH_SIZE: statistics.add(batch.frequencies())
+            if converged(): break
+            if progress is not None:
+                aggregator.margins = statistics.margins()
+                stopped = not progress(aggregator, aggregator.total / numSims)
+            if checkpoint is not None and (stopped or time.time() - lastCheckpoint >= CHECKPOINT_INTERVAL):
+                cursor = {'rngState': rng.bit_generator.state, 'statistics': statistics.toDict()}
+                if leverage is not None: cursor['leverage'] = leverage.toDict()
+                saveCheckpoint(checkpoint, signature, aggregator, cursor)
+                lastCheckpoint = time.time()
+            if stopped: break
+
+    if checkpoint is not None and not stopped: removeCheckpoint(checkpoint)
+    aggregator.margins = statistics.margins()
+    return aggregator
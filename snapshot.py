@@ -0,0 +1,131 @@
+# Compact binary conference snapshots.
+# Layout (little-endian):
+#   header   magic, version, team count, game count, update timestamp, name and abbrName string refs
+#   teams    fixed-width records: name string ref, nonConfWins
+#   games    fixed-width records: home, away, winner team indices (NO_WINNER if unplayed)
+#   strings  UTF-8 blob holding every name once, referenced by (offset, length)
+# Snapshots are read through mmap, so opening one only parses the header; teams and games are
+# decoded when the conference is materialized.
+
+import os, mmap, struct
+from model import *
+
+MAGIC = b"CCSN"
+VERSION = 1
+NO_WINNER = 0xFFFF
+
+HEADER = struct.Struct("<4sHHIqIHIH")
+TEAM = struct.Struct("<IHH")
+GAME = struct.Struct("<HHH")
+
+# Appends each distinct string to the blob once, returning (offset, length) refs
+class StringTable:
+    def __init__(self) -> None:
+        self.blob = bytearray()
+        self.refs: dict[str, tuple[int, int]] = {}
+
+    def add(self, s: str) -> tuple[int, int]:
+        if s not in self.refs:
+            encoded = s.encode('utf-8')
+            self.refs[s] = (len(self.blob), len(encoded))
+            self.blob += encoded
+        return self.refs[s]
+
+# Written to a temporary file first and moved into place, so an interrupted save leaves the old snapshot
+def writeSnapshot(conference: Conference, filename: str) -> None:
+    strings = StringTable()
+    nameRef = strings.add(conference.name)
+    abbrRef = strings.add(conference.abbrName)
+
+    teams = b"".join(TEAM.pack(*strings.add(t.name), t.nonConfWins) for t in conference.teams)
+    games = b"".join(GAME.pack(g.home.index, g.away.index,
+                               g.winner.index if g.winner is not None else NO_WINNER)
+                     for g in conference.games)
+    header = HEADER.pack(MAGIC, VERSION, len(conference.teams), len(conference.games), conference.update,
+                         *nameRef, *abbrRef)
+
+    tmpFilename = f"{filename}.tmp"
+    with open(tmpFilename, 'wb') as f:
+        f.write(header + teams + games + strings.blob)
+    os.replace(tmpFilename, filename)
+
+# A snapshot file opened through mmap; header fields are read eagerly, everything else on demand
+# Raises ValueError if the file is empty, truncated or not a snapshot
+class Snapshot:
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) # ValueError if empty
+        if len(self.data) < HEADER.size:
+            self.close()
+            raise ValueError(f"Truncated conference snapshot: {filename}")
+
+        magic, version, self.nTeams, self.nGames, self.update, nameOff, nameLen, abbrOff, abbrLen = \
+            HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a version {VERSION} conference snapshot: {filename}")
+
+        self.teamsOffset = HEADER.size
+        self.gamesOffset = self.teamsOffset + self.nTeams * TEAM.size
+        self.stringsOffset = self.gamesOffset + self.nGames * GAME.size
+        if len(self.data) < self.stringsOffset + max(nameOff + nameLen, abbrOff + abbrLen):
+            self.close()
+            raise ValueError(f"Truncated conference snapshot: {filename}")
+        self.name = self.string(nameOff, nameLen)
+        self.abbrName = self.string(abbrOff, abbrLen)
+
+    def __repr__(self) -> str:
+        return f"<{self.abbrName}: Snapshot ({self.nTeams} teams, {self.nGames} games)>"
+
+    def string(self, offset: int, length: int) -> str:
+        start = self.stringsOffset + offset
+        return self.data[start:start + length].decode('utf-8')
+
+    # (name, nonConfWins) of team i
+    def team(self, i: int) -> tuple[str, int]:
+        nameOff, nameLen, nonConfWins = TEAM.unpack_from(self.data, self.teamsOffset + i * TEAM.size)
+        return (self.string(nameOff, nameLen), nonConfWins)
+
+    # (home, away, winner) team indices of game g; winner is None if unplayed
+    def game(self, g: int) -> tuple[int, int, int | None]:
+        home, away, winner = GAME.unpack_from(self.data, self.gamesOffset + g * GAME.size)
+        return (home, away, None if winner == NO_WINNER else winner)
+
+    def toConference(self) -> Conference:
+        conference = Conference(self.name, self.abbrName)
+        conference.setUpdateTimestamp(self.update)
+        for i in range(self.nTeams):
+            name, nonConfWins = self.team(i)
+            newTeam = Team(name)
+            newTeam.nonConfWins = nonConfWins
+            conference.addTeam(newTeam)
+
+        teams = conference.teams
+        for g in range(self.nGames):
+            home, away, winner = self.game(g)
+            conference.addGame(Game(teams[home], teams[away], teams[winner] if winner is not None else None))
+        return conference
+
+    def close(self) -> None:
+        self.data.close()
+
+# A saved conference that has been opened but not yet built
+# Exposes the snapshot's header fields; DataController.getConference() materializes it on first use
+class LazyConference:
+    def __init__(self, snapshot: Snapshot) -> None:
+        self.snapshot = snapshot
+        self.name = snapshot.name
+        self.abbrName = snapshot.abbrName
+        self.update = snapshot.update
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __repr__(self) -> str:
+        return f"<{str(self)}: LazyConference>"
+
+    def materialize(self) -> Conference:
+        conference = self.snapshot.toConference()
+        self.snapshot.close()
+        return conference
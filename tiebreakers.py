@@ -4,23 +4,47 @@
 # SEC: https://www.secsports.com/fbtiebreaker
 
 from model import *
-import math
+from kernel import SeasonKernel
+from collections import OrderedDict
+import instrumentation
 
+# Rule chains per conference: (two-team tiebreakers, multi-team tiebreakers)
+# Names refer to the rule defs on Tiebreaker, applied in order until the tied group separates
+# Past head-to-head, the multi-team steps of these policies are the two-team ones applied to the whole group: the
+# collective record against common opponents in order of finish (opponents tied in the standings taken together),
+# the opponents' combined conference record, total wins. So both chains share those rule defs
 tiebreakers = {
     "ACC" : 
-        (None,
-         None),
+        (("HeadToHeadTwo", "CommonOpponents", "CommonOpponentsInOrder", "StrengthOfSchedule"),
+         ("HeadToHeadMulti", "HeadToHeadLoserMulti", "CommonOpponents", "CommonOpponentsInOrder", "StrengthOfSchedule")),
     "B12" :
-        (None,
-         None),
+        (("HeadToHeadTwo", "CommonOpponents", "CommonOpponentsInOrder", "StrengthOfSchedule", "TotalWins"),
+         ("HeadToHeadMulti", "CommonOpponents", "CommonOpponentsInOrder", "StrengthOfSchedule", "TotalWins")),
     "B1G" :
-        (None,
-         None),
+        (("HeadToHeadTwo", "CommonOpponents", "CommonOpponentsInOrder", "StrengthOfSchedule"),
+         ("HeadToHeadMulti", "CommonOpponents", "CommonOpponentsInOrder", "StrengthOfSchedule")),
     "SEC" :
-        (None,
-         None)
+        (("HeadToHeadTwo", "CommonOpponents", "CommonOpponentsInOrder", "StrengthOfSchedule"),
+         ("HeadToHeadMulti", "HeadToHeadLoserMulti", "CommonOpponents", "CommonOpponentsInOrder", "StrengthOfSchedule"))
 }
 
+# What each rule def reads for a tied group, used to key cached tiebreak results
+# GROUP: games between the tied teams
+# TEAMS: every game involving a tied team
+# GLOBAL: TEAMS plus the win totals of the whole conference (order of finish, opponents' records)
+GROUP, TEAMS, GLOBAL = range(3)
+ruleScopes = {
+    "HeadToHeadTwo": GROUP,
+    "HeadToHeadMulti": GROUP,
+    "HeadToHeadLoserMulti": GROUP,
+    "CommonOpponents": TEAMS,
+    "CommonOpponentsInOrder": GLOBAL,
+    "StrengthOfSchedule": GLOBAL,
+    "TotalWins": TEAMS
+}
+
+DEFAULT_CACHE_SIZE = 65536
+
 # === HELPERS ===
 def getCommonGames(teams: list[Team]) -> list[Game]:
     games: list[Game] = []
@@ -30,117 +54,410 @@ def getCommonGames(teams: list[Team]) -> list[Game]:
             if game is not None: games.append(game)
     return games
 
-def getCommonOpponents(teams: list[Team]) -> list[Game]:
-    commonOpponents = teams[0].getOpponents()
+# Intersection of the teams' opponent bitsets (a team is never its own opponent, so the group drops out)
+def getCommonOpponents(teams: list[Team]) -> list[Team]:
+    mask = teams[0].opponentMask
     for team in teams[1:]:
-        commonOpponents = [o for o in team.getOpponents() if o in commonOpponents]
+        mask &= team.opponentMask
+    return [o for o in teams[0].conference.teams if mask >> o.index & 1]
 
 def sortDictValuesDescending(d: dict) -> dict:
     return dict(sorted(d.items(), key = lambda item: item[1], reverse=True))
 
-# Flatten sorted dict into list with equal values grouped into sublists
-def groupDictKeysByValue(d: dict) -> list:
+# Flatten sorted dict into list of keys with equal values grouped into sublists
+def groupDictKeysByValue(d: dict) -> list[list]:
     result = []
     currentGroup = []
-    lastValue = d.values()[0]
-    for key, value in d:
-        if value == lastValue:
+    lastValue = None
+    for key, value in d.items():
+        if currentGroup and value == lastValue:
             currentGroup.append(key)
         else:
-            if currentGroup:
-                result.append(currentGroup if len(currentGroup) > 1 else currentGroup[0])
+            if currentGroup: result.append(currentGroup)
             currentGroup = [key]
             lastValue = value
-    result.append(currentGroup if len(currentGroup) > 1 else currentGroup[0])
+    if currentGroup: result.append(currentGroup)
     return result
 
+# Teams guaranteed/expected to play in the title game given ordered standings groups
+# Teams in a group straddling the last slot share the remaining slots evenly (the policies' final step is a random draw)
+def titleGameShares(standings: list[list[int]], slots: int = 2) -> dict[int, float]:
+    shares = {}
+    for group in standings:
+        if slots <= 0: break
+        share = 1.0 if len(group) <= slots else slots / len(group)
+        for team in group: shares[team] = share
+        slots -= len(group)
+    return shares
+
+# Title game matchups given ordered standings groups, as shares over (lower index, higher index) pairs
+# A group holding both slots spreads its share over every pair within it; a lone leader is paired with each team
+# of the next group in turn
+def titleGamePairs(standings: list[list[int]]) -> dict[tuple[int, int], float]:
+    if not standings: return {}
+    first = standings[0]
+    if len(first) >= 2:
+        candidates = [(a, b) for i, a in enumerate(first) for b in first[i+1:]]
+    elif len(standings) > 1:
+        candidates = [(first[0], b) for b in standings[1]]
+    else:
+        return {}
+    share = 1.0 / len(candidates)
+    return {(min(a, b), max(a, b)): share for a, b in candidates}
+
+# Bounded LRU cache of tiebreak results with hit/miss statistics
+class TiebreakCache:
+    def __init__(self, maxSize: int = DEFAULT_CACHE_SIZE) -> None:
+        self.maxSize = maxSize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+    def __len__(self) -> int:
+        return len(self.entries)
+        
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None: self.entries.move_to_end(key)
+        return value
+    
+    def put(self, key, value) -> None:
+        if self.maxSize <= 0: return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxSize: self.entries.popitem(last = False)
+        
+    def clear(self) -> None:
+        self.entries.clear()
+        
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {'size': len(self.entries),
+                'maxSize': self.maxSize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': self.hits / lookups if lookups else 0.0}
+
 class Tiebreaker:
-    def __init__(self, conference: Conference) -> None:
+    def __init__(self, conference: Conference, kernel: SeasonKernel = None, cacheSize: int = DEFAULT_CACHE_SIZE) -> None:
         self.conference = conference
+        self.kernel = SeasonKernel(conference) if kernel is None else kernel
         self.tiebreakers = tiebreakers[conference.abbrName]
+        self.twoTeamRules = [(getattr(self, name), ruleScopes[name]) for name in self.tiebreakers[0]]
+        self.multiTeamRules = [(getattr(self, name), ruleScopes[name]) for name in self.tiebreakers[1]]
+        self.cache = TiebreakCache(cacheSize)
+        self.groupMasks: dict[tuple[int, ...], tuple[int, int]] = {}
+        self.scope = GROUP
+        if instrumentation.enabled: self.instrument()
         
+    # Wraps rules and breakTie to record statistics, see instrumentation
+    def instrument(self) -> None:
+        self.twoTeamRules = [(instrumentation.timedRule('two', name, rule), scope)
+                             for name, (rule, scope) in zip(self.tiebreakers[0], self.twoTeamRules)]
+        self.multiTeamRules = [(instrumentation.timedRule('multi', name, rule), scope)
+                               for name, (rule, scope) in zip(self.tiebreakers[1], self.multiTeamRules)]
+        self.breakTie = instrumentation.countedTies(self.breakTie)
+        
+    # Orders the conference for a full season outcome (defaults to current results, unplayed games excluded) 
+    # Returns standings as ordered groups of team indices; groups of more than one team could not be separated
+    def orderStandings(self, outcome: int = None) -> list[list[int]]:
+        if outcome is None: self.setCurrent()
+        else: self.setOutcome(outcome)
+        standings = []
+        for group in self.finishGroups:
+            standings.extend(self.breakTie(group))
+        return standings
+    
+    # Sets the outcome evaluated by the tiebreaker defs, with win totals and order of finish by record
+    # decided masks the games that count; by default a full season outcome where every game counts
+    def setOutcome(self, outcome: int, wins: list[int] = None, decided: int = None) -> None:
+        self.outcome = outcome
+        self.decided = self.kernel.allMask if decided is None else decided
+        self.wins = self.kernel.winTotals(outcome) if wins is None else wins
+        if decided is None:
+            self.gamesDecided = self.kernel.gameCounts
+            self.finishGroups = groupDictKeysByValue(sortDictValuesDescending(dict(enumerate(self.wins))))
+        else:
+            # Mid-season, teams have played different numbers of games: order of finish is by winning percentage
+            self.gamesDecided = [sum(self.decided >> g & 1 for g in games) for games in self.kernel.teamGames]
+            self.finishGroups = groupDictKeysByValue(sortDictValuesDescending(dict(enumerate(self.winPcts()))))
+    
+    def winPcts(self) -> list[float]:
+        return [w / n if n else 0.0 for w, n in zip(self.wins, self.gamesDecided)]
+    
+    # Sets current results (completed games only) for evaluation
+    def setCurrent(self) -> None:
+        self.setOutcome(self.kernel.playedOutcome, self.kernel.baseWins, self.kernel.playedMask)
+    
+    # Breaks a tied group with its conference's rule chain, using cached results where possible
+    def breakTie(self, teams: list[int]) -> list[list[int]]:
+        if len(teams) < 2: return [teams]
+        if self.cache.maxSize > 0: return self.cachedBreakTie(teams)
+        return self.applyTiebreakers(teams)
+    
     # Takes in tbIdx: current tiebreaker (recursive)
-    # Returns true if top teams are fully separated, false if top teams are unable to be separated
+    # Any separated subgroup restarts from the first tiebreaker of its own chain
     # Separation fails when tiebreaker is insufficient OR no more tiebreakers
-    def orderStandings(self, conference: Conference, tbIdx = 0) -> bool:
-        conference.setStandings()
-        raise NotImplementedError
-        #TODO
+    def applyTiebreakers(self, teams: list[int], tbIdx: int = 0) -> list[list[int]]:
+        rules = self.twoTeamRules if len(teams) == 2 else self.multiTeamRules
+        if tbIdx >= len(rules): return [teams]
+        
+        rule, scope = rules[tbIdx]
+        self.scope = max(self.scope, scope)
+        groups = rule(teams)
+        if len(groups) < 2: return self.applyTiebreakers(teams, tbIdx + 1)
+        
+        result = []
+        for group in groups:
+            result.extend(self.breakTie(group))
+        return result
+    
+    # Game bitmasks (GROUP, TEAMS scope) for a canonical tied group
+    def masksFor(self, key: tuple[int, ...]) -> tuple[int, int]:
+        masks = self.groupMasks.get(key)
+        if masks is None:
+            groupMask = teamsMask = 0
+            for g in self.kernel.commonGames(list(key)): groupMask |= 1 << g
+            for t in key:
+                for g in self.kernel.teamGames[t]: teamsMask |= 1 << g
+            masks = self.groupMasks[key] = (groupMask, teamsMask)
+        return masks
+    
+    # Cache key for a tied group when the chain reads up to the given scope
+    def cacheKey(self, key: tuple[int, ...], scope: int) -> tuple:
+        groupMask, teamsMask = self.masksFor(key)
+        if scope == GROUP: return (key, GROUP, self.outcome & groupMask, self.decided & groupMask)
+        if scope == TEAMS: return (key, TEAMS, self.outcome & teamsMask, self.decided & teamsMask)
+        return (key, GLOBAL, self.outcome & teamsMask, self.decided & teamsMask, tuple(self.wins), tuple(self.gamesDecided))
+    
+    # A tied group's result only depends on what its rule chain read: the canonical team set plus the
+    # game results (or win totals) within the widest scope reached. A result computed reading only
+    # head-to-head games is reused for any outcome with the same head-to-head results, and so on.
+    def cachedBreakTie(self, teams: list[int]) -> list[list[int]]:
+        key = tuple(sorted(teams))
+        outerScope = self.scope
+        for scope in (GROUP, TEAMS, GLOBAL):
+            entry = self.cache.get(self.cacheKey(key, scope))
+            if entry is not None:
+                self.cache.hits += 1
+                self.scope = max(outerScope, scope)
+                return entry[0]
+        self.cache.misses += 1
+        
+        self.scope = GROUP
+        result = self.applyTiebreakers(list(key))
+        scope = self.scope
+        self.cache.put(self.cacheKey(key, scope), (result, scope))
+        self.scope = max(outerScope, scope)
+        return result
+    
+    # Title game shares for a full season outcome, see titleGameShares()
+    def titleGame(self, outcome: int = None, wins: list[int] = None) -> dict[int, float]:
+        return titleGameShares(self.titleGameGroups(outcome, wins))
+    
+    # Standings groups covering the two title game slots for a full season outcome
+    # Only the group straddling the second slot needs breaking; groups entirely inside or outside the top two do not
+    def titleGameGroups(self, outcome: int = None, wins: list[int] = None) -> list[list[int]]:
+        if outcome is None: self.setCurrent()
+        else: self.setOutcome(outcome, wins)
+        standings = []
+        slots = 2
+        for group in self.finishGroups:
+            if slots <= 0: break
+            standings.extend(self.breakTie(group) if len(group) > slots else [group])
+            slots -= len(group)
+        return standings
+    
+    # === RULE HELPERS ===
+    
+    # Wins and games of a team against a set of opponents under the current outcome
+    def recordAgainst(self, team: int, opponents: list[int]) -> tuple[int, int]:
+        wins = games = 0
+        for o in opponents:
+            for g in self.kernel.gamesBetween(team, o):
+                if not self.decided >> g & 1: continue
+                games += 1
+                wins += int(self.kernel.winner(self.outcome, g) == team)
+        return (wins, games)
+    
+    def winPct(self, team: int, opponents: list[int]) -> float:
+        wins, games = self.recordAgainst(team, opponents)
+        return wins / games if games else 0.0
+    
+    def groupByValue(self, values: dict[int, float]) -> list[list[int]]:
+        return groupDictKeysByValue(sortDictValuesDescending(values))
+    
+    # Decided games between any two teams of the group
+    def commonGames(self, teams: list[int]) -> list[int]:
+        return [g for g in self.kernel.commonGames(teams) if self.decided >> g & 1]
     
     # === TIEBREAKER DEFS ===
     
     # If two teams played, advantage winner
-    def HeadToHeadTwo(self, teams: list[Team]) -> list:
-        game: Game = teams[0].getGameByOpponent(teams[1])
+    def HeadToHeadTwo(self, teams: list[int]) -> list[list[int]]:
+        a, b = teams
+        wins, games = self.recordAgainst(a, [b])
         
-        if game is None:
+        if games == 0 or wins * 2 == games:
             return [teams]
-        elif teams[0] is game.winner:
-            return teams
+        elif wins * 2 > games:
+            return [[a], [b]]
         else:
-            return teams.reverse()
+            return [[b], [a]]
     
     # If all teams played each other ('round robin'), advantage in order of wins
     # If not all teams played, advantage team that defeated all other teams
     # No advantage otherwise
-    def HeadToHeadMulti(self, teams: list[Team]) -> list:
+    def HeadToHeadMulti(self, teams: list[int]) -> list[list[int]]:
         nTeams = len(teams)
-        games = getCommonGames(teams)
-        winTotals = { team: len([g for g in games if g.winner is team]) for team in teams }
-        winTotals = sortDictValuesDescending(winTotals)
+        games = self.commonGames(teams)
+        winTotals = { team: 0 for team in teams }
+        for g in games: winTotals[self.kernel.winner(self.outcome, g)] += 1
         
         # All games played ('round robin')
-        if len(games) == math.factorial(nTeams) / (2 * math.factorial(nTeams - 2)):
-            
-            return groupDictKeysByValue(winTotals)
+        if len(games) >= nTeams * (nTeams - 1) // 2:
+            return self.groupByValue(winTotals)
         # Not all games played
         else:
-            top = winTotals.items()[0]
+            top = max(teams, key = lambda t: winTotals[t])
             # If one team won against all opponents, advantage them
-            if top[1] == nTeams - 1:
-                return [top[0], winTotals.keys()[1:]]
+            if winTotals[top] == nTeams - 1:
+                return [[top], [t for t in teams if t != top]]
             # No team advantaged
             else:
                 return [teams]
     
     # If not all teams played each other, disadvantage team that lost to all others
-    def HeadToHeadLoserMulti(self, teams: list[Team]) -> list:
+    def HeadToHeadLoserMulti(self, teams: list[int]) -> list[list[int]]:
         nTeams = len(teams)
-        games = getCommonGames(teams)
-        winTotals = { team: len([g for g in games if g.winner is team]) for team in teams }
-        winTotals = sortDictValuesDescending(winTotals)
+        games = self.commonGames(teams)
+        if len(games) >= nTeams * (nTeams - 1) // 2: return [teams]
         
-        bottom = winTotals.items()[-1]
-        if bottom[1] == 0 and len([g for g in games if g.played(bottom[0])]) == nTeams - 1:
-            return [winTotals.keys()[:-1], bottom[0]]
+        for bottom in teams:
+            played = [g for g in games if bottom in (self.kernel.home[g], self.kernel.away[g])]
+            if len(played) == nTeams - 1 and all(self.kernel.loser(self.outcome, g) == bottom for g in played):
+                return [[t for t in teams if t != bottom], [bottom]]
+        return [teams]
     
     # Advantage to teams with the best record against common opponents
-    def CommonOpponents(self, teams: list[Team]) -> list:
-        commonOpponents = getCommonOpponents(teams)
-        winTotals = { team: len([w for w in [team.getGameByOpponent(o) for o in commonOpponents] if w is not None and w.winner == team]) for team in teams }
-        winTotals = sortDictValuesDescending(winTotals)
-        return groupDictKeysByValue(winTotals)
+    def CommonOpponents(self, teams: list[int]) -> list[list[int]]:
+        commonOpponents = self.kernel.commonOpponents(teams)
+        if not commonOpponents: return [teams]
+        return self.groupByValue({ team: self.winPct(team, commonOpponents) for team in teams })
     
-    def CommonOpponentsInOrder(self, teams: list[Team]) -> list:
-        commonOpponents = getCommonOpponents(teams)
-        commonOpponentsOrdered = [o for o in self.conference.standings if o in commonOpponents]
-        
-        # Some lower level opponents have not been tiebroken - tiebreaker fails
-        if len(commonOpponents) > len(commonOpponentsOrdered): return [teams]
+    # Compare records against common opponents from the top of the standings down, advantage the first better record
+    # Order of finish is by record; opponents tied on record are considered together
+    def CommonOpponentsInOrder(self, teams: list[int]) -> list[list[int]]:
+        commonOpponents = set(self.kernel.commonOpponents(teams))
         
-        #TODO
+        for finishGroup in self.finishGroups:
+            opponents = [o for o in finishGroup if o in commonOpponents]
+            if not opponents: continue
+            groups = self.groupByValue({ team: self.winPct(team, opponents) for team in teams })
+            if len(groups) > 1: return groups
+        return [teams]
     
-    def CommonOpponentsInOrderCollective(self, teams: list[Team]) -> list:
-        pass
+    # Advantage to the team whose conference opponents have the best combined conference winning percentage
+    def StrengthOfSchedule(self, teams: list[int]) -> list[list[int]]:
+        strength = {}
+        for team in teams:
+            opponentWins = opponentGames = 0
+            for g in self.kernel.teamGames[team]:
+                if not self.decided >> g & 1: continue
+                o = self.kernel.away[g] if self.kernel.home[g] == team else self.kernel.home[g]
+                opponentWins += self.wins[o]
+                opponentGames += self.gamesDecided[o]
+            strength[team] = opponentWins / opponentGames if opponentGames else 0.0
+        return self.groupByValue(strength)
     
-    def StrengthOfSchedule(self, teams: list[Team]) -> list:
-        pass
-    
-    def TotalWins(self, teams: list[Team]) -> list:
-        pass
+    # Advantage to the team with the most total wins (conference and non-conference)
+    def TotalWins(self, teams: list[int]) -> list[list[int]]:
+        return self.groupByValue({ team: self.wins[team] + self.kernel.nonConfWins[team] for team in teams })
+
+# Standings kept up to date one game result at a time
+# Teams are bucketed by winning percentage, and each bucket keeps its tiebroken order and the widest scope its rule
+# chain read. A changed result moves its two teams between buckets and re-runs tiebreakers only for buckets whose
+# membership changed or whose tiebreak read that game (or conference-wide win totals).
+# Defaults to current results; with an outcome, decided masks the games that count (default all)
+class LiveStandings:
+    def __init__(self, tiebreaker: Tiebreaker, outcome: int = None, decided: int = None) -> None:
+        self.tiebreaker = tiebreaker
+        kernel = tiebreaker.kernel
+        self.outcome = kernel.playedOutcome if outcome is None else outcome
+        if outcome is None: self.decided = kernel.playedMask
+        else: self.decided = kernel.allMask if decided is None else decided
+        
+        self.wins = [0] * kernel.nTeams
+        self.played = [0] * kernel.nTeams
+        for g in range(kernel.nGames):
+            if self.decided >> g & 1:
+                self.wins[kernel.winner(self.outcome, g)] += 1
+                self.played[kernel.home[g]] += 1
+                self.played[kernel.away[g]] += 1
+        
+        self.buckets: dict[float, list[int]] = {}
+        for team in range(kernel.nTeams):
+            self.buckets.setdefault(self.bucketKey(team), []).append(team)
+        self.resolved: dict[float, tuple[list[list[int]], int]] = {}
+        self.refresh(self.buckets.keys())
+        
+    def bucketKey(self, team: int) -> float:
+        return self.wins[team] / self.played[team] if self.played[team] else 0.0
+        
+    # Re-runs tiebreakers for the buckets with the given keys
+    def refresh(self, keys) -> None:
+        tiebreaker = self.tiebreaker
+        tiebreaker.setOutcome(self.outcome, self.wins, self.decided)
+        for key in list(keys):
+            if key not in self.buckets:
+                self.resolved.pop(key, None)
+                continue
+            tiebreaker.scope = GROUP
+            groups = tiebreaker.breakTie(self.buckets[key])
+            self.resolved[key] = (groups, tiebreaker.scope)
+            
+    # Whether a bucket's tiebreak read game g
+    def dependsOn(self, key: float, g: int) -> bool:
+        teams = self.buckets[key]
+        groups, scope = self.resolved[key]
+        if len(teams) < 2: return False
+        if scope == GLOBAL: return True
+        groupMask, teamsMask = self.tiebreaker.masksFor(tuple(sorted(teams)))
+        return bool((groupMask if scope == GROUP else teamsMask) >> g & 1)
     
-    def StrengthOfScheduleMulti(self, teams: list[Team]) -> list:
-        pass
+    # Sets the result of game g: winner is a team index, or None for unplayed
+    # Returns the bucket keys (winning percentages) that were re-tiebroken
+    def setResult(self, g: int, winner: int | None) -> list[float]:
+        kernel = self.tiebreaker.kernel
+        wasDecided = bool(self.decided >> g & 1)
+        oldWinner = kernel.winner(self.outcome, g) if wasDecided else None
+        if winner == oldWinner: return []
+        
+        teams = (kernel.home[g], kernel.away[g])
+        oldKeys = [self.bucketKey(team) for team in teams]
+        if oldWinner is not None: self.wins[oldWinner] -= 1
+        if winner is not None: self.wins[winner] += 1
+        if winner is None:
+            self.decided &= ~(1 << g)
+        else:
+            self.decided |= 1 << g
+            if winner == kernel.home[g]: self.outcome |= 1 << g
+            else: self.outcome &= ~(1 << g)
+        
+        changed = set()
+        for team, old in zip(teams, oldKeys):
+            self.played[team] += int(winner is not None) - int(wasDecided)
+            new = self.bucketKey(team)
+            if new == old: continue
+            self.buckets[old].remove(team)
+            if not self.buckets[old]: del self.buckets[old]
+            self.buckets.setdefault(new, []).append(team)
+            changed.update((old, new))
+        
+        changed.update(key for key in self.buckets if key not in changed and self.dependsOn(key, g))
+        self.refresh(changed)
+        return sorted(changed, reverse = True)
     
-    def TotalWinsMulti(self, teams: list[Team]) -> list:
-        pass
\ No newline at end of file
+    # Ordered groups of team indices, as Tiebreaker.orderStandings()
+    def standings(self) -> list[list[int]]:
+        return [group for key in sorted(self.buckets, reverse = True) for group in self.resolved[key][0]]